@@ -0,0 +1 @@
+"""Performance benchmarks for ``sql_metadata`` (``python -m benchmarks``)."""
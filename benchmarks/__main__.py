@@ -0,0 +1,81 @@
+"""Command line entry point: ``python -m benchmarks``.
+
+Run the whole suite and print the results::
+
+    python -m benchmarks
+
+Store a new baseline, or compare against the stored one (exits with
+status 1 when a case regressed beyond the tolerances)::
+
+    python -m benchmarks --save benchmarks/baseline.json
+    python -m benchmarks --compare benchmarks/baseline.json
+"""
+
+import argparse
+import sys
+from pathlib import Path
+
+from benchmarks.corpora import corpora
+from benchmarks.runner import (
+    DEFAULT_MEMORY_TOLERANCE,
+    DEFAULT_TIME_TOLERANCE,
+    PROPERTIES,
+    compare,
+    format_measurements,
+    format_report,
+    load_baseline,
+    run_suite,
+    save_baseline,
+)
+
+
+def _arguments(argv: list[str] | None) -> argparse.Namespace:
+    available = corpora()
+    parser = argparse.ArgumentParser(prog="python -m benchmarks")
+    parser.add_argument(
+        "--corpus", action="append", choices=sorted(available), help="repeatable"
+    )
+    parser.add_argument(
+        "--property", action="append", choices=PROPERTIES, help="repeatable"
+    )
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--save", type=Path, help="write results as a baseline")
+    parser.add_argument("--compare", type=Path, help="baseline to compare with")
+    parser.add_argument("--time-tolerance", type=float, default=DEFAULT_TIME_TOLERANCE)
+    parser.add_argument(
+        "--memory-tolerance", type=float, default=DEFAULT_MEMORY_TOLERANCE
+    )
+    return parser.parse_args(argv)
+
+
+def main(argv: list[str] | None = None) -> int:
+    """Run the suite; return ``1`` if a compared case regressed, else ``0``."""
+    args = _arguments(argv)
+    available = corpora()
+    selected = {name: available[name] for name in args.corpus or available}
+    measurements = run_suite(selected, args.property or PROPERTIES, args.repeat)
+    print(format_measurements(measurements))
+
+    if args.save:
+        save_baseline(args.save, measurements)
+        print(f"\nbaseline written to {args.save}")
+    if not args.compare:
+        return 0
+
+    rows = compare(
+        measurements,
+        load_baseline(args.compare),
+        args.time_tolerance,
+        args.memory_tolerance,
+    )
+    print()
+    print(format_report(rows))
+    regressed = [row.name for row in rows if row.regressed]
+    if regressed:
+        print(f"\n{len(regressed)} regressed: {', '.join(regressed)}")
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,118 @@
+"""Representative SQL workloads for the benchmark suite.
+
+Each corpus is a tuple of statements standing for one kind of traffic
+the parser sees in practice.  Generated corpora are deterministic, so
+timings stay comparable with the stored baseline.
+"""
+
+from pathlib import Path
+
+_TEST_SQL = Path(__file__).resolve().parent.parent / "test" / "test.sql"
+
+#: Short statements as issued by an OLTP application.
+OLTP = (
+    "SELECT id, name, email FROM users WHERE id = 42",
+    "SELECT u.id, o.total FROM users u JOIN orders o ON o.user_id = u.id "
+    "WHERE o.status = 'open' ORDER BY o.created_at DESC LIMIT 20",
+    "INSERT INTO sessions (user_id, token, expires_at) "
+    "VALUES (42, 'a1b2c3', '2026-01-01 00:00:00')",
+    "UPDATE users SET last_login = NOW(), login_count = login_count + 1 WHERE id = 42",
+    "DELETE FROM sessions WHERE expires_at < NOW()",
+    "SELECT COUNT(*) AS cnt FROM orders WHERE user_id IN (1, 2, 3) "
+    "GROUP BY status HAVING COUNT(*) > 1",
+)
+
+#: Hand-written MSSQL statements using square brackets and ``TOP``.
+MSSQL = (
+    "SELECT TOP 10 [o].[id], [c].[name] FROM [sales].[dbo].[orders] AS [o] "
+    "JOIN [sales].[dbo].[customers] AS [c] ON [c].[id] = [o].[customer_id] "
+    "WHERE [o].[total] > 100 ORDER BY [o].[total] DESC",
+    "UPDATE [dbo].[stock] SET [qty] = [qty] - 1 WHERE [sku] = 'X-1'",
+    "WITH cte_sales AS (SELECT [staff_id], COUNT(*) AS order_count "
+    "FROM [sales].[orders] WHERE YEAR([order_date]) = 2018 "
+    "GROUP BY [staff_id]) SELECT AVG(order_count) FROM cte_sales",
+)
+
+#: Hive statements exploding arrays with ``LATERAL VIEW``.
+HIVE = (
+    "SELECT event_day, action_type FROM events "
+    "LATERAL VIEW EXPLODE(ARRAY(1, 2)) lv AS action_type",
+    "SELECT event_day, cuid, MAX(SPLIT(category, '~')[2]) AS ch_4th_class "
+    "FROM logs.clicks LATERAL VIEW EXPLODE(tags) t AS tag "
+    "WHERE event_day = '20260101' GROUP BY event_day, cuid",
+)
+
+
+def warehouse() -> tuple[str, ...]:
+    """Return the large reporting query from ``test/test.sql``.
+
+    :rtype: tuple[str, ...]
+    """
+    return (_TEST_SQL.read_text(),)
+
+
+def nested_ctes(depth: int = 40) -> tuple[str, ...]:
+    """Return one statement chaining *depth* CTEs, each reading the previous.
+
+    :param depth: Number of CTEs in the chain.
+    :type depth: int
+    :rtype: tuple[str, ...]
+    """
+    ctes = ["c0 AS (SELECT id, amount, region FROM sales WHERE amount > 0)"]
+    for level in range(1, depth):
+        ctes.append(
+            f"c{level} AS (SELECT id, amount * 2 AS amount, region "
+            f"FROM c{level - 1} WHERE id > {level})"
+        )
+    last = depth - 1
+    return (
+        f"WITH {', '.join(ctes)} "
+        f"SELECT region, SUM(amount) AS total FROM c{last} GROUP BY region",
+    )
+
+
+def bulk_insert(rows: int = 2000) -> tuple[str, ...]:
+    """Return one ``INSERT`` statement with *rows* literal rows.
+
+    :param rows: Number of ``VALUES`` rows.
+    :type rows: int
+    :rtype: tuple[str, ...]
+    """
+    values = ", ".join(
+        f"({row}, 'name-{row}', {row * 1.5}, NULL)" for row in range(rows)
+    )
+    return (f"INSERT INTO measurements (id, label, reading, note) VALUES {values}",)
+
+
+def like_filters(clauses: int = 200, columns: int = 40) -> tuple[str, ...]:
+    """Return one query OR-ing *clauses* ``LIKE`` filters over *columns*.
+
+    Mimics the group lookups found in MediaWiki slow-query logs, which
+    ``generalize`` collapses clause by clause.
+
+    :param clauses: Number of ``LIKE`` filters.
+    :type clauses: int
+    :param columns: Number of distinct columns filtered on.
+    :type columns: int
+    :rtype: tuple[str, ...]
+    """
+    filters = " or ".join(
+        f"group_{i % columns} LIKE '%group-{i};%'" for i in range(clauses)
+    )
+    return (f"SELECT user_id FROM user_groups WHERE wiki_id = 7 AND ({filters})",)
+
+
+def corpora() -> dict[str, tuple[str, ...]]:
+    """Return all corpora keyed by name.
+
+    :rtype: dict[str, tuple[str, ...]]
+    """
+    return {
+        "oltp": OLTP,
+        "warehouse": warehouse(),
+        "nested_ctes": nested_ctes(),
+        "bulk_insert": bulk_insert(),
+        "mssql": MSSQL,
+        "hive": HIVE,
+        "like_filters": like_filters(),
+    }
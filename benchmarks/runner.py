@@ -0,0 +1,249 @@
+"""Measure per-property latency and peak memory, and compare with a baseline.
+
+Every measurement builds a fresh :class:`~sql_metadata.Parser` for each
+statement of a corpus and reads one property, so it covers everything the
+property needs — tokenizing, parsing and extraction.  Latency is taken
+over several repetitions after a warm-up run; peak memory is the
+``tracemalloc`` high-water mark of one extra run.
+
+Timings depend on the machine: regenerate the baseline (``--save``) on the
+machine that runs the comparison.
+"""
+
+import gc
+import json
+import platform
+import statistics
+import time
+import tracemalloc
+from collections.abc import Iterable, Sequence
+from pathlib import Path
+from typing import Any, NamedTuple
+
+import sqlglot
+
+from sql_metadata import Parser
+
+#: ``Parser`` properties measured for every corpus.
+PROPERTIES = ("tables", "columns", "generalize", "values")
+
+#: Allowed slowdown of the fastest run before a case counts as regressed.
+DEFAULT_TIME_TOLERANCE = 0.25
+
+#: Allowed growth of peak memory before a case counts as regressed.
+DEFAULT_MEMORY_TOLERANCE = 0.10
+
+
+class Measurement(NamedTuple):
+    """Latency and memory of reading one property over one corpus."""
+
+    name: str
+    median_ms: float
+    min_ms: float
+    peak_kib: float
+
+
+class Comparison(NamedTuple):
+    """A measurement next to its baseline; ratios are current / baseline."""
+
+    name: str
+    baseline_ms: float
+    current_ms: float
+    time_ratio: float
+    baseline_kib: float
+    current_kib: float
+    memory_ratio: float
+    regressed: bool
+
+
+def _run(statements: Sequence[str], prop: str) -> None:
+    for sql in statements:
+        getattr(Parser(sql), prop)
+
+
+def measure(
+    corpus: str, statements: Sequence[str], prop: str, repeat: int = 5
+) -> Measurement:
+    """Measure reading *prop* for every statement of a corpus.
+
+    :param corpus: Corpus name, used to label the measurement.
+    :type corpus: str
+    :param statements: The corpus statements.
+    :type statements: Sequence[str]
+    :param prop: ``Parser`` property to read.
+    :type prop: str
+    :param repeat: Number of timed runs.
+    :type repeat: int
+    :rtype: Measurement
+    """
+    _run(statements, prop)  # warm-up: imports, compiled regexes
+    timings = []
+    for _ in range(repeat):
+        gc.collect()
+        started = time.perf_counter()
+        _run(statements, prop)
+        timings.append((time.perf_counter() - started) * 1000)
+
+    gc.collect()
+    tracemalloc.start()
+    try:
+        _run(statements, prop)
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    return Measurement(
+        f"{corpus}.{prop}",
+        round(statistics.median(timings), 3),
+        round(min(timings), 3),
+        round(peak / 1024, 1),
+    )
+
+
+def run_suite(
+    corpora: dict[str, tuple[str, ...]],
+    properties: Iterable[str] = PROPERTIES,
+    repeat: int = 5,
+) -> list[Measurement]:
+    """Measure every property over every corpus.
+
+    :param corpora: Statements keyed by corpus name.
+    :type corpora: dict[str, tuple[str, ...]]
+    :param properties: ``Parser`` properties to read.
+    :type properties: Iterable[str]
+    :param repeat: Number of timed runs per case.
+    :type repeat: int
+    :rtype: list[Measurement]
+    """
+    properties = tuple(properties)
+    return [
+        measure(corpus, statements, prop, repeat)
+        for corpus, statements in corpora.items()
+        for prop in properties
+    ]
+
+
+# ---------------------------------------------------------------------------
+# Baseline files
+# ---------------------------------------------------------------------------
+
+
+def environment() -> dict[str, str]:
+    """Describe the interpreter and library versions behind a run.
+
+    :rtype: dict[str, str]
+    """
+    return {
+        "python": platform.python_version(),
+        "implementation": platform.python_implementation(),
+        "machine": platform.machine(),
+        "sqlglot": sqlglot.__version__,
+    }
+
+
+def save_baseline(path: Path, measurements: Iterable[Measurement]) -> None:
+    """Write *measurements* to *path* as a JSON baseline.
+
+    :param path: Target file.
+    :type path: Path
+    :param measurements: Results of :func:`run_suite`.
+    :type measurements: Iterable[Measurement]
+    """
+    document = {
+        "environment": environment(),
+        "results": {m.name: m._asdict() for m in measurements},
+    }
+    path.write_text(json.dumps(document, indent=2, sort_keys=True) + "\n")
+
+
+def load_baseline(path: Path) -> dict[str, Measurement]:
+    """Read a baseline written by :func:`save_baseline`.
+
+    :param path: Baseline file.
+    :type path: Path
+    :rtype: dict[str, Measurement]
+    """
+    document: dict[str, Any] = json.loads(path.read_text())
+    return {name: Measurement(**fields) for name, fields in document["results"].items()}
+
+
+# ---------------------------------------------------------------------------
+# Comparison
+# ---------------------------------------------------------------------------
+
+
+def compare(
+    measurements: Iterable[Measurement],
+    baseline: dict[str, Measurement],
+    time_tolerance: float = DEFAULT_TIME_TOLERANCE,
+    memory_tolerance: float = DEFAULT_MEMORY_TOLERANCE,
+) -> list[Comparison]:
+    """Compare *measurements* with *baseline*.
+
+    Latency is compared on the fastest run, which is the least sensitive
+    to background noise.  Cases missing from the baseline are skipped.
+
+    :param measurements: Results of :func:`run_suite`.
+    :type measurements: Iterable[Measurement]
+    :param baseline: Results loaded by :func:`load_baseline`.
+    :type baseline: dict[str, Measurement]
+    :param time_tolerance: Allowed relative slowdown, e.g. ``0.25``.
+    :type time_tolerance: float
+    :param memory_tolerance: Allowed relative growth of peak memory.
+    :type memory_tolerance: float
+    :rtype: list[Comparison]
+    """
+    rows = []
+    for current in measurements:
+        base = baseline.get(current.name)
+        if base is None:
+            continue
+        time_ratio = current.min_ms / base.min_ms if base.min_ms else 1.0
+        memory_ratio = current.peak_kib / base.peak_kib if base.peak_kib else 1.0
+        regressed = (
+            time_ratio > 1 + time_tolerance or memory_ratio > 1 + memory_tolerance
+        )
+        rows.append(
+            Comparison(
+                current.name,
+                base.min_ms,
+                current.min_ms,
+                round(time_ratio, 3),
+                base.peak_kib,
+                current.peak_kib,
+                round(memory_ratio, 3),
+                regressed,
+            )
+        )
+    return rows
+
+
+def format_measurements(measurements: Iterable[Measurement]) -> str:
+    """Render *measurements* as a plain-text table.
+
+    :rtype: str
+    """
+    lines = [f"{'case':<24} {'median ms':>10} {'min ms':>10} {'peak KiB':>10}"]
+    for m in measurements:
+        lines.append(
+            f"{m.name:<24} {m.median_ms:>10.3f} {m.min_ms:>10.3f} {m.peak_kib:>10.1f}"
+        )
+    return "\n".join(lines)
+
+
+def format_report(rows: Iterable[Comparison]) -> str:
+    """Render a comparison as a plain-text table, flagging regressions.
+
+    :rtype: str
+    """
+    lines = [
+        f"{'case':<24} {'base ms':>10} {'now ms':>10} {'x time':>7} "
+        f"{'base KiB':>10} {'now KiB':>10} {'x mem':>7}"
+    ]
+    for row in rows:
+        flag = "  REGRESSED" if row.regressed else ""
+        lines.append(
+            f"{row.name:<24} {row.baseline_ms:>10.3f} {row.current_ms:>10.3f} "
+            f"{row.time_ratio:>7.2f} {row.baseline_kib:>10.1f} "
+            f"{row.current_kib:>10.1f} {row.memory_ratio:>7.2f}{flag}"
+        )
+    return "\n".join(lines)
@@ -15,8 +15,39 @@ for AST construction and tokenization, with custom dialect handling for
 MSSQL, MySQL, Hive/Spark, and TSQL bracket notation.
 """
 
+from sql_metadata.batch import ParseResult, parse_many
+from sql_metadata.dialect_affinity import get_dialect_affinity
+from sql_metadata.dialect_parser import ProbeStrategy
+from sql_metadata.disk_cache import (
+    disable_disk_cache,
+    enable_disk_cache,
+    get_disk_cache,
+)
 from sql_metadata.exceptions import InvalidQueryDefinition
 from sql_metadata.keywords_lists import QueryType
+from sql_metadata.parse_cache import (
+    disable_parse_cache,
+    enable_parse_cache,
+    get_parse_cache,
+)
 from sql_metadata.parser import Parser
+from sql_metadata.result import QueryResult
+from sql_metadata.script_parser import ScriptParser
 
-__all__ = ["InvalidQueryDefinition", "Parser", "QueryType"]
+__all__ = [
+    "InvalidQueryDefinition",
+    "ParseResult",
+    "Parser",
+    "ProbeStrategy",
+    "QueryResult",
+    "QueryType",
+    "ScriptParser",
+    "disable_disk_cache",
+    "disable_parse_cache",
+    "enable_disk_cache",
+    "enable_parse_cache",
+    "get_dialect_affinity",
+    "get_disk_cache",
+    "get_parse_cache",
+    "parse_many",
+]
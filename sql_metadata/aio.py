@@ -0,0 +1,306 @@
+"""Parse SQL from asyncio code without blocking the event loop.
+
+Parsing a large query takes tens of milliseconds of CPU time, which would
+stall every other coroutine if done inline.  The functions here run
+:func:`~sql_metadata.batch.parse_one` in an executor — a shared thread
+pool by default, or any :class:`concurrent.futures.Executor` such as a
+``ProcessPoolExecutor`` — and return the same plain
+:class:`~sql_metadata.batch.ParseResult` records as
+:func:`~sql_metadata.batch.parse_many`::
+
+    from sql_metadata.aio import aparse, aparse_many
+
+    result = await aparse("SELECT a FROM t", fields=["tables"])
+
+    async for result in aparse_many(queries, concurrency=4, timeout=1.0):
+        print(result.index, result.error or result.metadata)
+
+:class:`AsyncParser` bounds the work in flight with a semaphore: a slot
+is taken before a statement is submitted and given back only when the
+executor has finished with it.  A statement that times out is reported
+as a ``TimeoutError`` record; if its parse had already started it keeps
+its slot until it completes, since running threads cannot be
+interrupted.  :func:`aparse` calls share one ``AsyncParser`` per
+executor and event loop, so together they keep to
+:data:`DEFAULT_CONCURRENCY`.
+"""
+
+import asyncio
+import os
+import threading
+import weakref
+from collections import deque
+from collections.abc import AsyncIterable, AsyncIterator, Iterable
+from concurrent.futures import Executor, Future, ThreadPoolExecutor
+from functools import partial
+
+from sql_metadata.batch import DEFAULT_FIELDS, ParseResult, parse_one
+from sql_metadata.extraction_plan import validate_fields
+
+#: Statements parsed at a time when no ``concurrency`` is given.
+DEFAULT_CONCURRENCY = 8
+
+_default_pool: ThreadPoolExecutor | None = None
+_default_pool_lock = threading.Lock()
+
+
+def _default_executor() -> ThreadPoolExecutor:
+    """Return the thread pool used when no executor is given."""
+    global _default_pool
+    with _default_pool_lock:
+        if _default_pool is None:
+            _default_pool = ThreadPoolExecutor(thread_name_prefix="sql-metadata-aio")
+        return _default_pool
+
+
+def _reset_default_executor() -> None:
+    """Drop the inherited pool in a forked child, whose copy has no threads."""
+    global _default_pool, _default_pool_lock
+    _default_pool = None
+    _default_pool_lock = threading.Lock()
+
+
+os.register_at_fork(after_in_child=_reset_default_executor)
+
+
+def _release(
+    loop: asyncio.AbstractEventLoop, slots: asyncio.Semaphore, _: Future[ParseResult]
+) -> None:
+    """Give a slot back from whichever thread finished the work."""
+    try:
+        loop.call_soon_threadsafe(slots.release)
+    except RuntimeError:  # the loop was closed in the meantime
+        pass
+
+
+async def _aiter(statements: Iterable[str] | AsyncIterable[str]) -> AsyncIterator[str]:
+    """Iterate over a plain or an asynchronous iterable alike."""
+    if isinstance(statements, AsyncIterable):
+        async for sql in statements:
+            yield sql
+    else:
+        for sql in statements:
+            yield sql
+
+
+class AsyncParser:
+    """Parse statements in an executor, at most *concurrency* at a time.
+
+    One instance can be shared by many coroutines of an event loop: the
+    limit applies to all their :meth:`parse` and :meth:`parse_many`
+    calls together.
+
+    :param executor: Where statements are parsed, by default a thread
+        pool shared by all instances.  With a ``ProcessPoolExecutor``
+        only the requested fields are sent back.
+    :type executor: Executor | None
+    :param concurrency: Maximum number of statements submitted to the
+        executor and not finished yet.
+    :type concurrency: int
+    :param timeout: Seconds to wait for one statement, ``None`` to wait
+        as long as it takes.
+    :type timeout: float | None
+    :raises ValueError: If *concurrency* is not positive.
+    """
+
+    def __init__(
+        self,
+        executor: Executor | None = None,
+        concurrency: int = DEFAULT_CONCURRENCY,
+        timeout: float | None = None,
+    ) -> None:
+        if concurrency < 1:
+            raise ValueError("concurrency must be positive")
+        self._executor = executor
+        self._concurrency = concurrency
+        self._timeout = timeout
+        self._slots: asyncio.Semaphore | None = None
+
+    async def parse(
+        self, sql: str, fields: Iterable[str] = DEFAULT_FIELDS, index: int = 0
+    ) -> ParseResult:
+        """Extract *fields* from *sql* without blocking the event loop.
+
+        Parse errors and timeouts are reported in
+        :attr:`ParseResult.error`, as in
+        :func:`~sql_metadata.batch.parse_many`.  Cancelling the call
+        withdraws the statement if its parse has not started yet.
+
+        :param sql: The SQL statement.
+        :type sql: str
+        :param fields: ``Parser`` property names to extract.
+        :type fields: Iterable[str]
+        :param index: Stored in :attr:`ParseResult.index`.
+        :type index: int
+        :rtype: ParseResult
+        :raises ValueError: If a field is unknown.
+        """
+        return await self._parse(index, sql, validate_fields(fields), self._timeout)
+
+    def parse_many(
+        self,
+        statements: Iterable[str] | AsyncIterable[str],
+        fields: Iterable[str] = DEFAULT_FIELDS,
+        ordered: bool = True,
+    ) -> AsyncIterator[ParseResult]:
+        """Parse *statements* concurrently, yielding :class:`ParseResult`.
+
+        The input is read only while fewer than ``concurrency`` results
+        are pending, so a slow consumer slows the reading down.  Closing
+        the iterator (e.g. leaving an ``async for`` early) cancels the
+        statements not started yet.
+
+        :param statements: SQL strings, from a plain or an asynchronous
+            iterable.
+        :type statements: Iterable[str] | AsyncIterable[str]
+        :param fields: ``Parser`` property names to extract.
+        :type fields: Iterable[str]
+        :param ordered: Yield results in input order.  When ``False``,
+            results are yielded as soon as they are ready; use
+            :attr:`ParseResult.index` to match them with the input.
+        :type ordered: bool
+        :rtype: AsyncIterator[ParseResult]
+        :raises ValueError: If a field is unknown.
+        """
+        return self._parse_many(statements, validate_fields(fields), ordered)
+
+    def _semaphore(self) -> asyncio.Semaphore:
+        # created on first use, inside the running event loop
+        if self._slots is None:
+            self._slots = asyncio.Semaphore(self._concurrency)
+        return self._slots
+
+    async def _parse(
+        self, index: int, sql: str, fields: tuple[str, ...], timeout: float | None
+    ) -> ParseResult:
+        slots = self._semaphore()
+        await slots.acquire()
+        try:
+            executor = self._executor or _default_executor()
+            work = executor.submit(parse_one, index, sql, fields)
+        except BaseException:
+            slots.release()
+            raise
+        work.add_done_callback(partial(_release, asyncio.get_running_loop(), slots))
+        try:
+            return await asyncio.wait_for(asyncio.wrap_future(work), timeout)
+        except asyncio.TimeoutError:
+            return ParseResult(
+                index, {}, f"TimeoutError: parsing took longer than {timeout} s"
+            )
+
+    async def _parse_many(
+        self,
+        statements: Iterable[str] | AsyncIterable[str],
+        fields: tuple[str, ...],
+        ordered: bool,
+    ) -> AsyncIterator[ParseResult]:
+        pending: deque[asyncio.Task[ParseResult]] = deque()
+        try:
+            index = 0
+            async for sql in _aiter(statements):
+                parse = self._parse(index, sql, fields, self._timeout)
+                pending.append(asyncio.ensure_future(parse))
+                index += 1
+                while len(pending) >= self._concurrency:
+                    yield await _next_done(pending, ordered)
+            while pending:
+                yield await _next_done(pending, ordered)
+        finally:
+            for task in pending:
+                task.cancel()
+            await asyncio.gather(*pending, return_exceptions=True)
+
+
+async def _next_done(
+    pending: deque["asyncio.Task[ParseResult]"], ordered: bool
+) -> ParseResult:
+    """Remove and return the next result to yield.
+
+    In ordered mode that is the oldest statement's; otherwise whichever
+    finishes first.
+    """
+    if ordered:
+        result = await pending[0]
+        pending.popleft()
+        return result
+    done, _ = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+    task = next(iter(done))
+    pending.remove(task)
+    return task.result()
+
+
+#: The ``AsyncParser`` of :func:`aparse` calls, per event loop (whose
+#: semaphores are bound to it) and executor.
+_shared_parsers: weakref.WeakKeyDictionary[
+    asyncio.AbstractEventLoop, dict[Executor | None, AsyncParser]
+] = weakref.WeakKeyDictionary()
+
+
+def _shared_parser(executor: Executor | None) -> AsyncParser:
+    """Return the ``AsyncParser`` shared by :func:`aparse` calls with
+    *executor* in the running event loop, creating it on first use."""
+    parsers = _shared_parsers.setdefault(asyncio.get_running_loop(), {})
+    parser = parsers.get(executor)
+    if parser is None:
+        parser = parsers[executor] = AsyncParser(executor, DEFAULT_CONCURRENCY)
+    return parser
+
+
+async def aparse(
+    sql: str,
+    fields: Iterable[str] = DEFAULT_FIELDS,
+    executor: Executor | None = None,
+    timeout: float | None = None,
+) -> ParseResult:
+    """Extract *fields* from *sql* in *executor*, see :meth:`AsyncParser.parse`.
+
+    Concurrent calls with the same executor share one ``AsyncParser``,
+    so at most :data:`DEFAULT_CONCURRENCY` of their statements are in
+    flight at a time.
+
+    :param sql: The SQL statement.
+    :type sql: str
+    :param fields: ``Parser`` property names to extract.
+    :type fields: Iterable[str]
+    :param executor: Where to parse, by default a shared thread pool.
+    :type executor: Executor | None
+    :param timeout: Seconds to wait, ``None`` for no limit.
+    :type timeout: float | None
+    :rtype: ParseResult
+    :raises ValueError: If a field is unknown.
+    """
+    fields = validate_fields(fields)
+    return await _shared_parser(executor)._parse(0, sql, fields, timeout)
+
+
+def aparse_many(
+    statements: Iterable[str] | AsyncIterable[str],
+    fields: Iterable[str] = DEFAULT_FIELDS,
+    executor: Executor | None = None,
+    concurrency: int = DEFAULT_CONCURRENCY,
+    timeout: float | None = None,
+    ordered: bool = True,
+) -> AsyncIterator[ParseResult]:
+    """Parse *statements* concurrently, see :meth:`AsyncParser.parse_many`.
+
+    :param statements: SQL strings, from a plain or an asynchronous
+        iterable.
+    :type statements: Iterable[str] | AsyncIterable[str]
+    :param fields: ``Parser`` property names to extract.
+    :type fields: Iterable[str]
+    :param executor: Where to parse, by default a shared thread pool.
+    :type executor: Executor | None
+    :param concurrency: Maximum number of statements in flight.
+    :type concurrency: int
+    :param timeout: Seconds to wait for each statement, ``None`` for no
+        limit.
+    :type timeout: float | None
+    :param ordered: Yield results in input order.
+    :type ordered: bool
+    :rtype: AsyncIterator[ParseResult]
+    :raises ValueError: If a field is unknown or *concurrency* is not
+        positive.
+    """
+    parser = AsyncParser(executor, concurrency, timeout)
+    return parser.parse_many(statements, fields, ordered)
@@ -0,0 +1,121 @@
+"""Fingerprint the structure of a sqlglot AST.
+
+:func:`structural_fingerprint` hashes a tree bottom-up (Merkle style):
+the digest of a node covers its type, its non-expression arguments (join
+sides, ``DISTINCT`` flags, ...) and the digests of its children, so two
+queries share a fingerprint when they parse to the same shape::
+
+    SELECT u.name FROM users u WHERE u.id = 5
+    select x.NAME   from users AS x /* c */ where x.id = 7
+
+Formatting, comments and identifier quoting are not part of the tree.
+On top of that, literal values are erased (only whether a literal is a
+string or a number is kept), unquoted identifiers are compared
+case-insensitively and the names a query gives to its own tables — table
+aliases, subquery aliases and CTE names — are replaced by their order of
+appearance.  Column aliases of a projection name the output columns and
+are kept, and so is the number of items in ``IN`` lists and ``VALUES``
+rows.
+
+Digests are 8-byte BLAKE2b hashes, so the fingerprint is stable across
+processes and can be stored.
+"""
+
+import hashlib
+
+from sqlglot import exp
+
+#: Size of a node digest in bytes.
+DIGEST_SIZE = 8
+
+#: Separators keeping argument keys and list items apart in a node digest.
+_KEY = b"\x00"
+_ITEM = b"\x01"
+
+
+def structural_fingerprint(root: exp.Expression) -> int:
+    """Return the 64-bit structural fingerprint of the tree under *root*.
+
+    The tree is walked once, iteratively, so deep trees are fine.
+
+    :param root: Root node of a parsed query.
+    :type root: exp.Expression
+    :returns: An integer in ``[0, 2**64)``.
+    :rtype: int
+    """
+    nodes: list[exp.Expression] = []
+    names: dict[str, str] = {}
+    ctes: set[str] = set()
+    stack = [root]
+    while stack:
+        node = stack.pop()
+        nodes.append(node)
+        if isinstance(node, exp.TableAlias) and node.name:
+            name = _identifier_key(node.args["this"])
+            names.setdefault(name, f"#{len(names)}")
+            if isinstance(node.parent, exp.CTE):
+                ctes.add(name)
+        stack.extend(reversed(list(node.iter_expressions())))
+    # a pre-order list reversed visits every child before its parent
+    digests: dict[int, bytes] = {}
+    for node in reversed(nodes):
+        digests[id(node)] = _node_digest(node, digests, names, ctes)
+    return int.from_bytes(digests[id(root)], "big")
+
+
+def _node_digest(
+    node: exp.Expression,
+    digests: dict[int, bytes],
+    names: dict[str, str],
+    ctes: set[str],
+) -> bytes:
+    """Hash *node* given the digests of its children."""
+    digest = hashlib.blake2b(type(node).__name__.encode(), digest_size=DIGEST_SIZE)
+    if isinstance(node, exp.Literal):
+        digest.update(b"string" if node.is_string else b"number")
+        return digest.digest()
+    if isinstance(node, exp.Identifier):
+        digest.update(_identifier_text(node, names, ctes).encode())
+        return digest.digest()
+    for key in node.arg_types:
+        value = node.args.get(key)
+        if value is None or value is False or value == []:
+            continue  # absent and default arguments hash alike
+        digest.update(key.encode() + _KEY)
+        for item in value if isinstance(value, list) else (value,):
+            if isinstance(item, exp.Expression):
+                digest.update(digests[id(item)])
+            else:
+                digest.update(repr(item).encode())
+            digest.update(_ITEM)
+    return digest.digest()
+
+
+def _identifier_key(node: exp.Expression) -> str:
+    """Return the name of an identifier, lowercased unless it is quoted."""
+    if isinstance(node, exp.Identifier) and node.quoted:
+        return node.name
+    return node.name.lower()
+
+
+def _identifier_text(
+    node: exp.Identifier, names: dict[str, str], ctes: set[str]
+) -> str:
+    """Return what an identifier contributes to its node's digest.
+
+    Definitions of and references to the query's own table names become
+    their ordinal; other identifiers contribute their name.
+    """
+    name = _identifier_key(node)
+    parent, key = node.parent, node.arg_key
+    own = (
+        isinstance(parent, exp.TableAlias)
+        and key == "this"
+        or isinstance(parent, exp.Column)
+        and key == "table"
+        or isinstance(parent, exp.Table)
+        and key == "this"
+        and name in ctes
+        and not parent.args.get("db")
+    )
+    return names.get(name, name) if own else name
@@ -0,0 +1,235 @@
+"""Index the nodes of a sqlglot AST by type in a single walk.
+
+Several consumers used to traverse the whole tree for one node type each
+— :class:`~sql_metadata.table_extractor.TableExtractor` for tables,
+:class:`~sql_metadata.column_extractor.ColumnExtractor` and
+:class:`~sql_metadata.nested_resolver.NestedResolver` for CTEs and
+subqueries, :meth:`DialectParser._has_parse_issues
+<sql_metadata.dialect_parser.DialectParser._has_parse_issues>` for tables
+and columns, :class:`~sql_metadata.parser.Parser` for ``VALUES`` and
+``SELECT``.  :class:`ASTIndex` walks the tree once and records every node
+of the indexed types together with its walk position, depth, enclosing
+clause and source position, so that each of them becomes a lookup::
+
+    index = ASTIndex(ast)
+    index.find_all(exp.Table)      # same nodes and order as ast.find_all
+    index.post_order(exp.Subquery) # innermost first
+    index.entries(exp.Column)[0].clause  # e.g. "select"
+
+The index holds references into the tree and, like the tree itself, must
+be treated as read-only.
+"""
+
+from collections.abc import Iterable
+from typing import NamedTuple, TypeVar, cast
+
+from sqlglot import exp
+
+# ---------------------------------------------------------------------------
+# Clause classification (pure functions, no state)
+# ---------------------------------------------------------------------------
+
+
+#: Simple key → clause-name lookup for most ``arg_types`` keys.
+_CLAUSE_MAP: dict[str, str] = {
+    "where": "where",
+    "group": "group_by",
+    "order": "order_by",
+    "having": "having",
+}
+
+#: Keys that map to the ``"join"`` clause section.
+_JOIN_KEYS = frozenset({"on", "using"})
+
+
+def _classify_expressions_clause(parent_type: type) -> str:
+    """Resolve the clause for an ``"expressions"`` key based on the parent node.
+
+    :param parent_type: The type of the parent AST node.
+    :returns: ``"update"``, ``"select"``, or ``""`` for other parents.
+    """
+    if parent_type is exp.Update:
+        return "update"
+    if parent_type is exp.Select:
+        return "select"
+    return ""
+
+
+def _classify_clause(key: str, parent_type: type) -> str:
+    """Map an ``arg_types`` key and parent node type to a ``columns_dict`` section.
+
+    :param key: The ``arg_types`` key through which the child was reached.
+    :param parent_type: The type of the parent AST node.
+    :returns: Section name string, or ``""`` if the key does not map.
+    """
+    if key == "expressions":
+        return _classify_expressions_clause(parent_type)
+    if key in _JOIN_KEYS:
+        return "join"
+    return _CLAUSE_MAP.get(key, "")
+
+
+# ---------------------------------------------------------------------------
+# Index
+# ---------------------------------------------------------------------------
+
+
+#: Node types recorded by default — those some extractor looks up.
+INDEXED_TYPES: tuple[type[exp.Expression], ...] = (
+    exp.Table,
+    exp.Column,
+    exp.CTE,
+    exp.Subquery,
+    exp.Values,
+    exp.Select,
+)
+
+_E = TypeVar("_E", bound=exp.Expression)
+
+#: ``args`` keys holding the identifiers that make up a node's name.
+_NAME_KEYS = ("catalog", "db", "table", "this")
+
+
+class IndexedNode(NamedTuple):
+    """A node recorded by :class:`ASTIndex`.
+
+    ``order`` is the node's pre-order position in the walk and ``end`` the
+    position of its last descendant, so ``order < other.order <= end``
+    tells whether *other* lies inside the node.  ``clause`` is the
+    innermost enclosing ``columns_dict`` section (``""`` if none) and
+    ``start`` the character offset of the node's name in the SQL, or
+    ``None`` for nodes without a positioned name identifier.
+    """
+
+    node: exp.Expression
+    order: int
+    end: int
+    depth: int
+    clause: str
+    start: int | None
+
+
+def _name_start(node: exp.Expression) -> int | None:
+    """Return the earliest tokenizer offset of *node*'s name identifiers.
+
+    sqlglot attaches ``meta['start']`` to every ``exp.Identifier`` it
+    parses; a qualified name like ``db.tbl`` has several of them.
+
+    :param node: An AST node.
+    :returns: The leftmost offset, or ``None`` if no identifier has one.
+    """
+    starts = [
+        ident.meta["start"]
+        for key in _NAME_KEYS
+        if isinstance((ident := node.args.get(key)), exp.Identifier)
+        and "start" in ident.meta
+    ]
+    return min(starts) if starts else None
+
+
+class ASTIndex:
+    """Nodes of one AST grouped by type, collected in a single walk.
+
+    The walk is an iterative depth-first traversal over
+    ``iter_expressions`` (so arbitrarily deep trees are fine).  Lookups
+    accept any of the indexed types and, as with ``isinstance``, include
+    instances of their subclasses.
+
+    :param root: Root node of the tree to index.
+    :type root: exp.Expression
+    :param types: Node types to record, defaults to :data:`INDEXED_TYPES`.
+    :type types: Iterable[type[exp.Expression]]
+    """
+
+    def __init__(
+        self,
+        root: exp.Expression,
+        types: Iterable[type[exp.Expression]] = INDEXED_TYPES,
+    ) -> None:
+        self.root = root
+        self._types = tuple(types)
+        self._entries: dict[type, list[IndexedNode]] = {t: [] for t in self._types}
+        self._kinds: dict[type, tuple[type, ...]] = {}
+        #: Total number of nodes in the tree.
+        self.size = self._walk()
+
+    def _kinds_of(self, cls: type) -> tuple[type, ...]:
+        """Return the indexed types *cls* is a (sub)class of, memoised."""
+        kinds = self._kinds.get(cls)
+        if kinds is None:
+            kinds = tuple(t for t in self._types if issubclass(cls, t))
+            self._kinds[cls] = kinds
+        return kinds
+
+    def _walk(self) -> int:
+        """Record the indexed nodes of the tree and return its node count."""
+        # items are (node, depth, clause), or an int marking the exit from
+        # the subtree of the pending entry with that index
+        stack: list[tuple[exp.Expression, int, str] | int] = [(self.root, 0, "")]
+        pending: list[tuple[tuple[type, ...], exp.Expression, int, int, str]] = []
+        order = 0
+        while stack:
+            item = stack.pop()
+            if isinstance(item, int):
+                kinds, node, start_order, depth, clause = pending[item]
+                entry = IndexedNode(
+                    node, start_order, order - 1, depth, clause, _name_start(node)
+                )
+                for kind in kinds:
+                    self._entries[kind].append(entry)
+                continue
+            node, depth, clause = item
+            kinds = self._kinds_of(type(node))
+            if kinds:
+                stack.append(len(pending))
+                pending.append((kinds, node, order, depth, clause))
+            order += 1
+            node_type = type(node)
+            for child in reversed(list(node.iter_expressions())):
+                key = child.arg_key or ""
+                child_clause = _classify_clause(key, node_type) or clause
+                stack.append((child, depth + 1, child_clause))
+        for entries in self._entries.values():
+            entries.sort(key=lambda entry: (entry.depth, entry.order))
+        return order
+
+    def entries(self, kind: type[exp.Expression]) -> list[IndexedNode]:
+        """Return the recorded nodes of type *kind* in breadth-first order.
+
+        Matches ``root.find_all(kind)``: nodes are ordered by depth and,
+        within one depth, left to right.
+
+        :param kind: One of the indexed types.
+        :rtype: list[IndexedNode]
+        :raises KeyError: If *kind* is not indexed.
+        """
+        return self._entries[kind]
+
+    def find_all(self, kind: type[_E]) -> list[_E]:
+        """Return the nodes of type *kind* in breadth-first order.
+
+        :param kind: One of the indexed types.
+        :rtype: list[exp.Expression]
+        """
+        return [cast(_E, entry.node) for entry in self._entries[kind]]
+
+    def find(self, kind: type[_E]) -> _E | None:
+        """Return the first node of type *kind* in breadth-first order.
+
+        :param kind: One of the indexed types.
+        :rtype: exp.Expression | None
+        """
+        entries = self._entries[kind]
+        return cast(_E, entries[0].node) if entries else None
+
+    def post_order(self, kind: type[_E]) -> list[_E]:
+        """Return the nodes of type *kind* children-first (post-order).
+
+        A node follows everything inside it, and precedes the nodes that
+        start after its subtree.
+
+        :param kind: One of the indexed types.
+        :rtype: list[exp.Expression]
+        """
+        entries = sorted(self._entries[kind], key=lambda e: (e.end, -e.order))
+        return [cast(_E, entry.node) for entry in entries]
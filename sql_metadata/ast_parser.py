@@ -7,11 +7,19 @@ always receive a clean ``sqlglot.exp.Expression`` tree (or ``None`` /
 ``ValueError``).
 """
 
+from collections.abc import Callable, Hashable
+
 from sqlglot import exp
 from sqlglot.dialects.dialect import DialectType
+from sqlglot.errors import TokenError
 
+from sql_metadata import parse_cache
+from sql_metadata.ast_index import ASTIndex
+from sql_metadata.dialect_affinity import get_dialect_affinity
 from sql_metadata.dialect_parser import DialectParser
+from sql_metadata.instrumentation import Profile, dialect_name, stage
 from sql_metadata.sql_cleaner import SqlCleaner
+from sql_metadata.token_stream import TokenStream
 
 
 class ASTParser:
@@ -24,16 +32,99 @@ class ASTParser:
 
     :param sql: Raw SQL query string.
     :type sql: str
+    :param stream: Token stream of *sql* shared with the owning
+        :class:`Parser`, reused for comment stripping and parsing.
+    :type stream: TokenStream | None
+    :param dialect_hint: Dialect to try before the detected candidates.
+    :type dialect_hint: DialectType
+    :param source: Key of the query's source; its learned dialect is tried
+        first (unless *dialect_hint* is given) and the winner is recorded.
+    :type source: Hashable | None
+    :param profile: Profile of the owning parser, which receives the
+        timings of the parse stages.
+    :type profile: Profile | None
     """
 
-    def __init__(self, sql: str) -> None:
+    def __init__(
+        self,
+        sql: str,
+        stream: TokenStream | None = None,
+        dialect_hint: DialectType = None,
+        source: Hashable | None = None,
+        profile: Profile | None = None,
+    ) -> None:
         self._raw_sql = sql
+        self._profile = profile
+        self._deferred_sql: Callable[[], str] | None = None
+        self._stream = stream
+        self._dialect_hint = dialect_hint
+        self._source = source
         self._ast: exp.Expression | None = None
+        self._index: ASTIndex | None = None
         self._dialect: DialectType = None
         self._parsed = False
         self._is_replace = False
         self._cte_name_map: dict[str, str] = {}
 
+    @classmethod
+    def from_expression(
+        cls,
+        ast: exp.Expression,
+        dialect: DialectType = None,
+        cte_name_map: dict[str, str] | None = None,
+    ) -> "ASTParser":
+        """Build an already-parsed instance around an existing AST.
+
+        Used for nested queries: the CTE/subquery body was parsed as part
+        of its parent statement, so the sub-parser reuses that subtree and
+        the parent's dialect instead of cleaning, dialect-probing and
+        parsing the body again.
+
+        :param ast: Root node of the (detached) subtree.
+        :param dialect: Dialect that produced the parent AST.
+        :param cte_name_map: The parent's placeholder-to-CTE-name map.
+        :returns: An instance whose :attr:`ast` is *ast*.
+        :rtype: ASTParser
+        """
+        instance = cls("")
+        instance._ast = ast
+        instance._dialect = dialect
+        instance._cte_name_map = cte_name_map or {}
+        instance._parsed = True
+        return instance
+
+    @classmethod
+    def deferred(
+        cls,
+        sql: Callable[[], str],
+        dialect_hint: DialectType = None,
+        source: Hashable | None = None,
+        profile: Profile | None = None,
+    ) -> "ASTParser":
+        """Build an instance whose SQL is only produced when it is parsed.
+
+        Used for the head of a streamed ``INSERT ... VALUES`` (see
+        :meth:`Parser.iter_values`), which is known only once the rows
+        were scanned.
+
+        :param sql: Returns the SQL to parse.
+        :param dialect_hint: Dialect to try before the detected candidates.
+        :param source: Key of the query's source.
+        :param profile: Profile of the owning parser.
+        :rtype: ASTParser
+        """
+        instance = cls("", dialect_hint=dialect_hint, source=source, profile=profile)
+        instance._deferred_sql = sql
+        return instance
+
+    @property
+    def is_parsed(self) -> bool:
+        """Whether the SQL was parsed already.
+
+        :rtype: bool
+        """
+        return self._parsed
+
     @property
     def ast(self) -> exp.Expression | None:
         """The sqlglot AST for the query, lazily parsed on first access.
@@ -45,9 +136,38 @@ class ASTParser:
         if self._parsed:
             return self._ast
         self._parsed = True
-        self._ast = self._parse(self._raw_sql)
+        if self._deferred_sql is not None:
+            self._raw_sql = self._deferred_sql()
+        with stage("parse", self._profile) as span:
+            self._ast = self._parse(self._raw_sql)
+            if span and self._ast is not None:
+                span.set("dialect", dialect_name(self._dialect))
+                span.set("nodes", self._index_of(self._ast).size)
         return self._ast
 
+    @property
+    def index(self) -> ASTIndex | None:
+        """Node index of :attr:`ast`, shared by all extractors.
+
+        Reuses the index built while checking the parse quality (or
+        stored in the parse cache) and otherwise walks the AST on first
+        access.
+
+        :returns: The index, or ``None`` when there is no AST.
+        :rtype: ASTIndex | None
+        :raises ValueError: If the SQL is malformed and cannot be parsed.
+        """
+        ast = self.ast
+        if ast is None:
+            return None
+        return self._index_of(ast)
+
+    def _index_of(self, ast: exp.Expression) -> ASTIndex:
+        """Return the index of *ast*, building it if the parse did not."""
+        if self._index is None:
+            self._index = ASTIndex(ast)
+        return self._index
+
     def _ensure_parsed(self) -> None:
         """Trigger lazy parsing so side-effect fields are populated."""
         _ = self.ast
@@ -95,7 +215,13 @@ class ASTParser:
         """Parse *sql* into a sqlglot AST.
 
         Delegates preprocessing to :class:`SqlCleaner` and dialect
-        detection / parsing to :class:`DialectParser`.
+        detection / parsing to :class:`DialectParser`, which tries the
+        dialect hint or the source's learned dialect (see
+        :mod:`~sql_metadata.dialect_affinity`) first.  When the
+        process-wide :mod:`~sql_metadata.parse_cache` is enabled, a
+        statement previously parsed with the same dialect hint is served
+        from it (the shared AST is read-only) and successful parses are
+        stored in it.
 
         :param sql: Raw SQL string (may include comments).
         :type sql: str
@@ -106,12 +232,91 @@ class ASTParser:
         if not sql or not sql.strip():
             return None
 
-        result = SqlCleaner.clean(sql)
+        cache = parse_cache.get_parse_cache()
+        if cache is not None:
+            cached = cache.get(sql, self._dialect_hint)
+            if cached is not None:
+                self._is_replace = cached.is_replace
+                self._cte_name_map = dict(cached.cte_name_map)
+                self._dialect = cached.dialect
+                self._index = cached.ast_index
+                return cached.ast
+
+        with stage("clean"):
+            result = SqlCleaner.clean(sql, self._stream)
         if result.sql is None:
             return None
 
         self._is_replace = result.is_replace
         self._cte_name_map = result.cte_name_map
 
-        ast, self._dialect = DialectParser().parse(result.sql)
+        ast, self._dialect = self._parse_with_affinity(result.sql)
+        if cache is not None:
+            if self._index is None:
+                self._index = ASTIndex(ast)
+            cache.put(
+                sql,
+                ast,
+                self._dialect,
+                self._is_replace,
+                self._cte_name_map,
+                self._index,
+                self._dialect_hint,
+            )
         return ast
+
+    def _parse_with_affinity(self, sql: str) -> tuple[exp.Expression, DialectType]:
+        """Parse cleaned *sql*, preferring the hinted or learned dialect.
+
+        An explicit hint is tried before everything else, while a source's
+        learned dialect only moves ahead among the detected candidates,
+        and only if that cannot change the result: the default dialect
+        leading them must fail to tokenize *sql* or tokenize it exactly
+        like the learned one (e.g. not for ``"a"``, an identifier by
+        default but a string in MySQL).  The winning dialect is recorded
+        for the source, if any.
+
+        :param sql: Cleaned SQL string.
+        :returns: 2-tuple of ``(ast_root_node, winning_dialect)``.
+        :raises ValueError: If the SQL is malformed.
+        """
+        preferred: list[DialectType] = []
+        if self._dialect_hint is not None:
+            preferred = [self._dialect_hint]
+        dialect_parser = DialectParser()
+        stream = TokenStream.of(sql, self._stream)
+        if self._source is None:
+            ast, dialect = dialect_parser.parse(sql, stream, preferred)
+        else:
+            affinity = get_dialect_affinity()
+            with stage("detect_dialects"):
+                candidates = DialectParser._detect_dialects(sql)
+            if not preferred:
+                preferred = affinity.preferred(self._source, candidates)
+                if preferred and not _tokenized_alike(stream, preferred[0]):
+                    preferred = []
+            ast, dialect = dialect_parser.parse(sql, stream, preferred)
+            affinity.record(self._source, dialect, candidates, preferred)
+        # reuse the index built by the quality checks, if any
+        self._index = dialect_parser.index
+        return ast, dialect
+
+
+def _tokenized_alike(stream: TokenStream, dialect: DialectType) -> bool:
+    """Tell whether *dialect* cannot parse *stream* unlike the default one.
+
+    True if the default dialect fails to tokenize the SQL — it could not
+    have won — or produces the same token types and texts as *dialect*.
+    """
+    try:
+        default = stream.tokenize()
+    except TokenError:
+        return True
+    try:
+        tokens = stream.tokenize(dialect)
+    except TokenError:
+        return False
+    return len(default) == len(tokens) and all(
+        (a.token_type, a.text) == (b.token_type, b.text)
+        for a, b in zip(default, tokens)
+    )
@@ -0,0 +1,294 @@
+"""Parse large streams of SQL statements across a process pool.
+
+:func:`parse_many` is meant for query-log processing where millions of
+statements go through :class:`~sql_metadata.parser.Parser`.  Input is
+consumed lazily in chunks, each chunk is parsed in a worker process and
+only the requested fields travel back — as plain lists, dicts and
+:class:`~sql_metadata.keywords_lists.QueryType` values wrapped in a
+:class:`ParseResult` — so neither sqlglot ASTs nor ``Parser`` objects
+cross the process boundary::
+
+    from sql_metadata import parse_many
+
+    with open("queries.log") as log:
+        for result in parse_many(log, workers=8, fields=["tables"]):
+            if result.error is None:
+                print(result.index, result.metadata["tables"])
+
+At most ``2 * workers`` chunks are in flight at a time, so memory stays
+flat however long the input is.
+"""
+
+import os
+from collections import deque
+from collections.abc import Callable, Iterable, Iterator
+from concurrent.futures import (
+    FIRST_COMPLETED,
+    Executor,
+    Future,
+    ProcessPoolExecutor,
+    ThreadPoolExecutor,
+    wait,
+)
+from dataclasses import dataclass
+from itertools import islice
+from typing import Any, TypeVar
+
+from sql_metadata.extraction_plan import DEFAULT_FIELDS, validate_fields
+from sql_metadata.instrumentation import entry_point, stage
+from sql_metadata.metrics import flush_metrics, metrics_directory, record_metrics
+from sql_metadata.parser import Parser
+from sql_metadata.tracing import current_trace_dir, flush_trace, record_trace
+
+#: Number of chunks kept in flight per worker.
+_IN_FLIGHT_PER_WORKER = 2
+
+#: Pools selectable with ``executor=``.  Threads share the process-wide
+#: caches and only run in parallel on free-threaded CPython builds.
+EXECUTORS: dict[str, Callable[..., Executor]] = {
+    "process": ProcessPoolExecutor,
+    "thread": ThreadPoolExecutor,
+}
+
+_R = TypeVar("_R")
+
+#: Unit of work of a worker: ``(start, chunk, *args)`` → one result per item.
+ChunkFunction = Callable[..., list[_R]]
+
+
+@dataclass(frozen=True)
+class ParseResult:
+    """Picklable outcome of parsing one statement.
+
+    :param index: Position of the statement in the input.
+    :param metadata: Requested field name → extracted value.  Holds the
+        fields extracted before the failure when *error* is set.
+    :param error: ``"<ExceptionType>: <message>"`` if extraction failed.
+    """
+
+    index: int
+    metadata: dict[str, Any]
+    error: str | None = None
+
+
+def _to_plain(value: Any) -> Any:
+    """Convert ``UniqueList`` (and dicts of them) to plain builtins."""
+    if isinstance(value, list):
+        return [_to_plain(item) for item in value]
+    if isinstance(value, dict):
+        return {key: _to_plain(item) for key, item in value.items()}
+    return value
+
+
+@entry_point
+def parse_one(index: int, sql: str, fields: tuple[str, ...]) -> ParseResult:
+    """Extract *fields* from *sql* into a :class:`ParseResult`.
+
+    Any exception raised by the parser is recorded in
+    :attr:`ParseResult.error` instead of being propagated, so a single
+    malformed statement does not abort a batch.
+
+    :param index: Position of *sql* in the input.
+    :type index: int
+    :param sql: The SQL statement.
+    :type sql: str
+    :param fields: ``Parser`` property names to extract.
+    :type fields: tuple[str, ...]
+    :rtype: ParseResult
+    """
+    parser = Parser(sql)
+    metadata: dict[str, Any] = {}
+    with stage("statement") as span:
+        span.set("index", index)
+        try:
+            for field in fields:
+                metadata[field] = _to_plain(getattr(parser, field))
+        except Exception as exc:  # reported per statement, never raised
+            span.set("error", type(exc).__name__)
+            span.set("message", str(exc))
+            return ParseResult(index, metadata, f"{type(exc).__name__}: {exc}")
+    return ParseResult(index, metadata)
+
+
+def _parse_chunk(
+    start: int, statements: list[str], fields: tuple[str, ...]
+) -> list[ParseResult]:
+    """Parse a chunk of consecutive statements (the unit of work of a worker)."""
+    return [
+        parse_one(start + offset, sql, fields) for offset, sql in enumerate(statements)
+    ]
+
+
+def _instrumented_parse_chunk(
+    start: int,
+    statements: list[str],
+    fields: tuple[str, ...],
+    trace_dir: str | None,
+    metrics_dir: str | None,
+) -> list[ParseResult]:
+    """Parse a chunk, reporting to the caller's trace and metrics directory."""
+    if trace_dir is not None:
+        record_trace(trace_dir)
+    if metrics_dir is not None:
+        record_metrics(metrics_dir)
+    try:
+        return _parse_chunk(start, statements, fields)
+    finally:
+        flush_trace()
+        flush_metrics()
+
+
+def _chunks(statements: Iterable[str], chunksize: int) -> Iterator[list[str]]:
+    """Lazily split *statements* into lists of at most *chunksize* items."""
+    iterator = iter(statements)
+    while chunk := list(islice(iterator, chunksize)):
+        yield chunk
+
+
+def parse_many(
+    statements: Iterable[str],
+    workers: int | None = None,
+    fields: Iterable[str] = DEFAULT_FIELDS,
+    chunksize: int = 256,
+    ordered: bool = True,
+    executor: str = "process",
+) -> Iterator[ParseResult]:
+    """Parse *statements* in a worker pool, yielding :class:`ParseResult`.
+
+    :param statements: Any iterable of SQL strings; consumed lazily.
+    :type statements: Iterable[str]
+    :param workers: Number of worker processes, defaults to
+        ``os.cpu_count()``.  ``1`` parses in the calling process.
+    :type workers: int | None
+    :param fields: ``Parser`` property names to extract, see
+        :data:`~sql_metadata.extraction_plan.FIELDS`.
+    :type fields: Iterable[str]
+    :param chunksize: Statements sent to a worker per task.
+    :type chunksize: int
+    :param ordered: Yield results in input order.  When ``False``, chunks
+        are yielded as soon as they complete; use
+        :attr:`ParseResult.index` to match results with the input.
+    :type ordered: bool
+    :param executor: ``"process"`` for a process pool or ``"thread"`` for
+        a thread pool, see :data:`EXECUTORS`.
+    :type executor: str
+    :rtype: Iterator[ParseResult]
+    :raises ValueError: If a field or the executor is unknown or a size
+        is not positive.
+    """
+    fields = validate_fields(fields)
+    workers = workers or os.cpu_count() or 1
+    trace_dir = current_trace_dir()
+    metrics_dir = metrics_directory()
+    if trace_dir is None and metrics_dir is None:
+        return map_chunks(
+            _parse_chunk, statements, workers, chunksize, ordered, executor, (fields,)
+        )
+    return map_chunks(
+        _instrumented_parse_chunk,
+        statements,
+        workers,
+        chunksize,
+        ordered,
+        executor,
+        (fields, trace_dir, metrics_dir),
+    )
+
+
+def map_chunks(
+    function: ChunkFunction[_R],
+    items: Iterable[str],
+    workers: int,
+    chunksize: int,
+    ordered: bool = True,
+    executor: str = "process",
+    args: tuple[Any, ...] = (),
+) -> Iterator[_R]:
+    """Apply *function* to consecutive chunks of *items*, lazily.
+
+    *function* is called as ``function(start, chunk, *args)``, where
+    *start* is the position of the chunk's first item in the input, and
+    returns one result per item.  With more than one worker the chunks
+    are processed in a pool; for a process pool *function* and *args*
+    must be picklable.
+
+    :param function: Module-level function processing one chunk.
+    :type function: Callable[..., list]
+    :param items: Input, consumed lazily.
+    :type items: Iterable[str]
+    :param workers: Number of worker processes; ``1`` processes the
+        chunks in the calling process.
+    :type workers: int
+    :param chunksize: Items sent to a worker per task.
+    :type chunksize: int
+    :param ordered: Yield results in input order.  When ``False``, chunks
+        are yielded as soon as they complete.
+    :type ordered: bool
+    :param executor: Kind of pool, a key of :data:`EXECUTORS`.
+    :type executor: str
+    :param args: Extra arguments passed to *function*.
+    :type args: tuple
+    :rtype: Iterator
+    :raises ValueError: If a size is not positive or the executor unknown.
+    """
+    if workers < 1 or chunksize < 1:
+        raise ValueError("workers and chunksize must be positive")
+    if executor not in EXECUTORS:
+        raise ValueError(f"Unknown executor: {executor}")
+    if workers == 1:
+        return _map_in_process(function, items, chunksize, args)
+    pool = EXECUTORS[executor]
+    return _map_in_pool(pool, function, items, workers, chunksize, ordered, args)
+
+
+def _map_in_process(
+    function: ChunkFunction[_R],
+    items: Iterable[str],
+    chunksize: int,
+    args: tuple[Any, ...],
+) -> Iterator[_R]:
+    """Generator behind :func:`map_chunks` for ``workers=1``."""
+    start = 0
+    for chunk in _chunks(items, chunksize):
+        yield from function(start, chunk, *args)
+        start += len(chunk)
+
+
+def _map_in_pool(
+    pool: Callable[..., Executor],
+    function: ChunkFunction[_R],
+    items: Iterable[str],
+    workers: int,
+    chunksize: int,
+    ordered: bool,
+    args: tuple[Any, ...],
+) -> Iterator[_R]:
+    """Generator behind :func:`map_chunks` for ``workers > 1``."""
+    executor = pool(max_workers=workers)
+    pending: deque[Future[list[_R]]] = deque()
+    max_pending = workers * _IN_FLIGHT_PER_WORKER
+    try:
+        start = 0
+        for chunk in _chunks(items, chunksize):
+            pending.append(executor.submit(function, start, chunk, *args))
+            start += len(chunk)
+            while len(pending) >= max_pending:
+                yield from _next_done(pending, ordered)
+        while pending:
+            yield from _next_done(pending, ordered)
+    finally:
+        executor.shutdown(wait=True, cancel_futures=True)
+
+
+def _next_done(pending: deque[Future[list[_R]]], ordered: bool) -> list[_R]:
+    """Remove and return the results of the next chunk to yield.
+
+    In ordered mode that is the oldest chunk; otherwise whichever chunk
+    completes first.
+    """
+    if ordered:
+        return pending.popleft().result()
+    done, _ = wait(pending, return_when=FIRST_COMPLETED)
+    future = next(iter(done))
+    pending.remove(future)
+    return future.result()
@@ -16,6 +16,7 @@ from typing import Any
 
 from sqlglot import exp
 
+from sql_metadata.ast_index import ASTIndex, _classify_clause
 from sql_metadata.exceptions import InvalidQueryDefinition
 from sql_metadata.utils import UniqueList, last_segment
 
@@ -43,50 +44,6 @@ class ExtractionResult:
     output_columns: list[str]
 
 
-# ---------------------------------------------------------------------------
-# Clause classification (pure functions, no state)
-# ---------------------------------------------------------------------------
-
-
-#: Simple key → clause-name lookup for most ``arg_types`` keys.
-_CLAUSE_MAP: dict[str, str] = {
-    "where": "where",
-    "group": "group_by",
-    "order": "order_by",
-    "having": "having",
-}
-
-#: Keys that map to the ``"join"`` clause section.
-_JOIN_KEYS = frozenset({"on", "using"})
-
-
-def _classify_expressions_clause(parent_type: type) -> str:
-    """Resolve the clause for an ``"expressions"`` key based on the parent node.
-
-    :param parent_type: The type of the parent AST node.
-    :returns: ``"update"``, ``"select"``, or ``""`` for other parents.
-    """
-    if parent_type is exp.Update:
-        return "update"
-    if parent_type is exp.Select:
-        return "select"
-    return ""
-
-
-def _classify_clause(key: str, parent_type: type) -> str:
-    """Map an ``arg_types`` key and parent node type to a ``columns_dict`` section.
-
-    :param key: The ``arg_types`` key through which the child was reached.
-    :param parent_type: The type of the parent AST node.
-    :returns: Section name string, or ``""`` if the key does not map.
-    """
-    if key == "expressions":
-        return _classify_expressions_clause(parent_type)
-    if key in _JOIN_KEYS:
-        return "join"
-    return _CLAUSE_MAP.get(key, "")
-
-
 # ---------------------------------------------------------------------------
 # Pure helpers (no state)
 # ---------------------------------------------------------------------------
@@ -240,6 +197,8 @@ class ColumnExtractor:
     :param cte_name_map: Optional mapping of placeholder CTE names
         (produced by :class:`SqlCleaner`) back to the original qualified
         CTE names.
+    :param index: Node index of *ast* to look CTEs up in; built on demand
+        when not given.
     """
 
     def __init__(
@@ -247,8 +206,10 @@ class ColumnExtractor:
         ast: exp.Expression,
         table_aliases: dict[str, str],
         cte_name_map: dict[str, str] | None = None,
+        index: ASTIndex | None = None,
     ):
         self._ast = ast
+        self._index = index
         self._table_aliases = table_aliases
         self._cte_name_map = cte_name_map or {}
         self._collector = _Collector()
@@ -312,7 +273,7 @@ class ColumnExtractor:
     def _seed_cte_names(self) -> None:
         """Pre-populate CTE names in the collector before the main walk.
 
-        Scans the AST for all ``CTE`` nodes and records their alias
+        Looks up all ``CTE`` nodes in the AST index and records their alias
         names.  This allows :meth:`_handle_column` to recognize
         references like ``cte_name.col`` as CTE column-alias references
         rather than regular columns.
@@ -324,7 +285,8 @@ class ColumnExtractor:
         The seed step records ``"sales"`` so that ``sales.id`` in the
         outer SELECT can be identified as a CTE-qualified reference.
         """
-        for cte in self._ast.find_all(exp.CTE):
+        index = self._index or ASTIndex(self._ast)
+        for cte in index.find_all(exp.CTE):
             alias = cte.alias
             if alias:
                 self._collector.cte_names.append(
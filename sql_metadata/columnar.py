@@ -0,0 +1,99 @@
+"""Collect INSERT values column by column in compact buffers.
+
+Backs :attr:`Parser.values_columnar
+<sql_metadata.parser.Parser.values_columnar>`.  A column holding only
+integers is stored in an ``array.array("q")`` and one holding only numbers
+in an ``array.array("d")``, eight bytes per value instead of a Python
+object each, which NumPy (``numpy.frombuffer``) and pandas can wrap
+without copying.  Any other column is a plain list.
+"""
+
+from array import array
+from collections.abc import Iterable, Sequence
+from typing import Any, TypeAlias
+
+#: A column: an ``array.array`` of numbers or a list of other values.
+ColumnData: TypeAlias = "array[Any] | list[Any]"
+
+#: Range of the signed 64-bit integers an ``array("q")`` holds.
+_INT64_MIN = -(2**63)
+_INT64_MAX = 2**63 - 1
+
+#: Largest magnitude up to which every integer is exact as a double.
+_EXACT_FLOAT_INT = 2**53
+
+
+class ColumnBuffer:
+    """One column, kept in the most compact form that holds it exactly.
+
+    Starts as an ``array("q")``, becomes an ``array("d")`` when a float
+    arrives (integers convert exactly up to 2**53) and a list for any
+    other value.  A float buffer remembers which of its values were
+    integers, so turning it into a list restores them.
+    """
+
+    __slots__ = ("data", "_ints")
+
+    def __init__(self) -> None:
+        self.data: ColumnData = array("q")
+        #: Per value of an ``array("d")``, whether it was an integer.
+        self._ints = bytearray()
+
+    def append(self, value: Any) -> None:
+        """Add *value*, widening the buffer if it does not fit.
+
+        :param value: A converted value (``int``, ``float`` or ``str``).
+        :type value: Any
+        """
+        data = self.data
+        kind = type(value)
+        if isinstance(data, list):
+            data.append(value)
+        elif kind is int and data.typecode == "q" and _fits_int64(value):
+            data.append(value)
+        elif kind is float or (kind is int and abs(value) <= _EXACT_FLOAT_INT):
+            if data.typecode == "q":
+                self._ints = bytearray(b"\x01") * len(data)
+                self.data = data = array("d", data)
+            data.append(value)
+            self._ints.append(kind is int)
+        else:
+            self._to_list().append(value)
+
+    def _to_list(self) -> list[Any]:
+        data = self.data
+        assert isinstance(data, array)
+        if data.typecode == "q":
+            values = list(data)
+        else:
+            values = [
+                int(number) if is_int else number
+                for number, is_int in zip(data, self._ints)
+            ]
+        self._ints = bytearray()
+        self.data = values
+        return values
+
+
+def _fits_int64(value: int) -> bool:
+    return _INT64_MIN <= value <= _INT64_MAX
+
+
+def transpose(rows: Iterable[Sequence[Any]]) -> list[ColumnData]:
+    """Turn *rows* into column buffers.
+
+    The first row sets the number of columns; like ``zip``, values past
+    it are dropped and a shorter row leaves the remaining columns short.
+
+    :param rows: The rows, consumed one at a time.
+    :type rows: Iterable[Sequence[Any]]
+    :returns: One ``array.array`` or list per column.
+    :rtype: list[array | list]
+    """
+    buffers: list[ColumnBuffer] | None = None
+    for row in rows:
+        if buffers is None:
+            buffers = [ColumnBuffer() for _ in row]
+        for buffer, value in zip(buffers, row):
+            buffer.append(value)
+    return [buffer.data for buffer in buffers or ()]
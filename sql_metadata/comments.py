@@ -16,37 +16,41 @@ Two public entry points exist:
 A third, internal variant :func:`strip_comments_for_parsing` is consumed
 by :mod:`_ast` before handing SQL to ``sqlglot.parse()``; it always uses
 the MySQL tokenizer so that ``#``-style comments are reliably stripped.
+
+Each function accepts an optional :class:`~sql_metadata.token_stream.TokenStream`
+so that a :class:`Parser` tokenizes its query once per tokenizer flavour.
 """
 
 import re
 from typing import Any
 
 from sqlglot.errors import TokenError
-from sqlglot.tokens import Tokenizer
+
+from sql_metadata.token_stream import TokenStream
 
 
-def _choose_tokenizer(sql: str) -> Tokenizer:
-    """Select the appropriate sqlglot tokenizer for *sql*.
+def _tokenizer_dialect(sql: str) -> str | None:
+    """Select the sqlglot dialect whose tokenizer suits *sql*.
 
     The default sqlglot tokenizer does **not** treat ``#`` as a comment
     delimiter, but MySQL does.  When ``#`` appears in the SQL and is used
     as a comment (not as a variable/template prefix), we switch to the
     MySQL tokenizer so that ``#``-style comments are properly skipped.
 
+    Tokenizing through the ``"mysql"`` dialect (rather than a bare
+    ``MySQL.Tokenizer()``) matters: sqlglot >=30.7.0 caches the
+    ``TokenizerCore`` per class, and priming it from the default dialect
+    makes later mysql parses misclassify e.g. ``0020_big_table`` as
+    NUMBER + VAR.
+
     :param sql: Raw SQL string to inspect.
     :type sql: str
-    :returns: An instantiated tokenizer (MySQL or default).
-    :rtype: sqlglot.tokens.Tokenizer
+    :returns: ``"mysql"`` or ``None`` (default dialect).
+    :rtype: str | None
     """
     if "#" in sql and not _has_hash_variables(sql):
-        from sqlglot.dialects.mysql import MySQL
-
-        # Pass dialect="mysql" so the cached TokenizerCore (sqlglot >=30.7.0
-        # caches per-class) is built with MySQL identifier semantics — without
-        # it the cache is primed from the default dialect and later mysql
-        # parses misclassify e.g. ``0020_big_table`` as NUMBER + VAR.
-        return MySQL.Tokenizer(dialect="mysql")
-    return Tokenizer()
+        return "mysql"
+    return None
 
 
 def _has_hash_variables(sql: str) -> bool:
@@ -54,8 +58,8 @@ def _has_hash_variables(sql: str) -> bool:
 
     MSSQL uses ``#table`` for temporary tables and some template engines
     use ``#VAR#`` placeholders.  This function distinguishes those from
-    MySQL-style ``# comment`` lines so that :func:`_choose_tokenizer`
-    picks the right dialect.
+    MySQL-style ``# comment`` lines so that :func:`_tokenizer_dialect`
+    picks the right tokenizer.
 
     Heuristics (checked via regex):
 
@@ -76,7 +80,34 @@ def _has_hash_variables(sql: str) -> bool:
     return False
 
 
-def extract_comments(sql: str) -> list[str]:
+def _literal_dialect(sql: str) -> str | None:
+    """Return the dialect needed to read the literals of *sql*, if any.
+
+    ``X'AB'``, ``0x1F`` and ``b'01'`` are single literals for MySQL, but
+    the default sqlglot tokenizer reads ``X'AB'`` as the identifier ``X``
+    followed by the string ``'AB'`` and ``0x1F`` as ``0 AS x1F``.  The
+    same happens to Postgres ``E'...'`` escape strings, whose escapes
+    only Postgres decodes.  The first such literal decides.
+
+    Strings, quoted identifiers and comments are skipped, so
+    ``'see 0x1F'`` holds no literal.
+
+    :param sql: Raw SQL string.
+    :type sql: str
+    :returns: ``"mysql"``, ``"postgres"`` or ``None``.
+    :rtype: str | None
+    """
+    if "'" not in sql and "0x" not in sql:
+        return None
+    for match in _DIALECT_LITERAL_RE.finditer(sql):
+        if match["binary"]:
+            return "mysql"
+        if match["escape"]:
+            return "postgres"
+    return None
+
+
+def extract_comments(sql: str, stream: TokenStream | None = None) -> list[str]:
     """Return all comments found in *sql*, with delimiters preserved.
 
     Tokenizes the SQL, then scans every gap between consecutive token
@@ -88,13 +119,15 @@ def extract_comments(sql: str) -> list[str]:
 
     :param sql: Raw SQL string.
     :type sql: str
+    :param stream: Token stream of *sql* to reuse, if any.
+    :type stream: TokenStream | None
     :returns: List of comment strings in source order.
     :rtype: List[str]
     """
     if not sql:
         return []
     try:
-        tokens = list(_choose_tokenizer(sql).tokenize(sql))
+        tokens = TokenStream.of(sql, stream).tokenize(_tokenizer_dialect(sql))
     except TokenError:
         return []
     comments: list[str] = []
@@ -106,6 +139,16 @@ def extract_comments(sql: str) -> list[str]:
     return comments
 
 
+#: Hex and bit literals (group ``binary``) and ``E'...'`` escape strings
+#: (group ``escape``), found after skipping quoted text and comments,
+#: which may contain anything.
+_DIALECT_LITERAL_RE = re.compile(
+    r"""'(?:[^'\\]|\\.)*'|"[^"]*"|`[^`]*`|--[^\n]*|/\*.*?\*/"""
+    r"|(?<![\w'])(?:(?P<binary>[xXbB]'[0-9a-fA-F]*'|0x[0-9a-fA-F]+\b)"
+    r"|(?P<escape>[eE]'(?:[^'\\]|\\.)*'))",
+    re.DOTALL,
+)
+
 #: Matches all three SQL comment styles in a single pass:
 #: ``/* ... */`` (block, possibly unterminated), ``-- ...``, and ``# ...``.
 _COMMENT_RE = re.compile(r"/\*.*?\*/|/\*.*$|--[^\n]*\n?|#[^\n]*\n?", re.DOTALL)
@@ -146,7 +189,7 @@ def _reconstruct_from_tokens(sql: str, tokens: list[Any]) -> str:
     return "".join(parts).strip()
 
 
-def strip_comments_for_parsing(sql: str) -> str:
+def strip_comments_for_parsing(sql: str, stream: TokenStream | None = None) -> str:
     """Strip **all** comments — including ``#`` lines — for sqlglot parsing.
 
     Unlike :func:`strip_comments`, this always uses the MySQL tokenizer
@@ -159,6 +202,8 @@ def strip_comments_for_parsing(sql: str) -> str:
 
     :param sql: Raw SQL string.
     :type sql: str
+    :param stream: Token stream of *sql* to reuse, if any.
+    :type stream: TokenStream | None
     :returns: SQL with all comments removed and whitespace collapsed.
     :rtype: str
     """
@@ -167,27 +212,23 @@ def strip_comments_for_parsing(sql: str) -> str:
     # Skip MySQL tokenizer when # is used as variable (not comment)
     upper = sql.strip().upper()
     if upper.startswith("CREATE FUNCTION") or _has_hash_variables(sql):
-        tokenizer = Tokenizer()
+        dialect: str | None = None
     else:
-        from sqlglot.dialects.mysql import MySQL
-
-        # See _choose_tokenizer — the explicit dialect prevents the
-        # sqlglot >=30.7.0 TokenizerCore cache from being primed with
-        # default-dialect semantics.
-        tokenizer = MySQL.Tokenizer(dialect="mysql")
+        # See _tokenizer_dialect for why the "mysql" dialect is used.
+        dialect = "mysql"
     try:
-        tokens = list(tokenizer.tokenize(sql))
+        tokens = TokenStream.of(sql, stream).tokenize(dialect)
     except TokenError:
         return sql.strip()
     return _reconstruct_from_tokens(sql, tokens)
 
 
-def strip_comments(sql: str) -> str:
+def strip_comments(sql: str, stream: TokenStream | None = None) -> str:
     """Remove comments and normalise whitespace, preserving ``#VAR`` references.
 
     Reconstructs the SQL from its token spans, inserting a single space
     wherever a gap (comment or extra whitespace) existed between two
-    tokens.  Uses :func:`_choose_tokenizer` so that ``#VAR`` template
+    tokens.  Uses :func:`_tokenizer_dialect` so that ``#VAR`` template
     variables in MSSQL queries are kept intact.
 
     Called by :attr:`Parser.without_comments` and
@@ -195,13 +236,15 @@ def strip_comments(sql: str) -> str:
 
     :param sql: Raw SQL string.
     :type sql: str
+    :param stream: Token stream of *sql* to reuse, if any.
+    :type stream: TokenStream | None
     :returns: SQL with comments removed and whitespace normalised.
     :rtype: str
     """
     if not sql:
         return sql or ""
     try:
-        tokens = list(_choose_tokenizer(sql).tokenize(sql))
+        tokens = TokenStream.of(sql, stream).tokenize(_tokenizer_dialect(sql))
     except TokenError:
         return sql.strip()
     return _reconstruct_from_tokens(sql, tokens)
@@ -0,0 +1,158 @@
+"""Learn which sqlglot dialect each query source uses.
+
+Queries coming from one source (an MSSQL application, a Hive ETL job, a
+MySQL OLTP service) are consistently written in one dialect, yet
+:meth:`DialectParser.parse <sql_metadata.dialect_parser.DialectParser.parse>`
+infers the candidate dialects from each statement alone — often parsing
+it with the default dialect first, only to discard a degraded result.
+
+:class:`DialectAffinity` records the winning dialect per caller-supplied
+source key and tells the parser which of the candidate dialects detected
+for a statement to try first::
+
+    from sql_metadata import Parser, get_dialect_affinity
+
+    Parser("SELECT `a` FROM t", source="oltp").tables
+    Parser("INSERT IGNORE INTO t VALUES (1)", source="oltp").tables
+    get_dialect_affinity().stats()
+    # AffinityStats(sources=1, hinted=1, hits=1, fallbacks_avoided=1)
+
+Only the detected candidates of statements without dialect markers are
+reordered — a learned dialect never overrides markers such as back-ticks
+— and only when the default dialect tokenizes the statement like the
+learned one (or not at all), so the reordering never changes the
+result.  The preferred dialect is still subject to the degradation
+checks, so a wrong guess only costs one extra parse attempt.
+"""
+
+import threading
+from collections import Counter, OrderedDict
+from collections.abc import Hashable, Sequence
+from typing import Any, NamedTuple
+
+from sqlglot.dialects.dialect import DialectType
+
+#: Default number of sources tracked by :class:`DialectAffinity`.
+DEFAULT_MAX_SOURCES = 1024
+
+
+class AffinityStats(NamedTuple):
+    """Snapshot of :class:`DialectAffinity` counters.
+
+    ``hinted`` counts parses started with a preferred dialect, ``hits``
+    those the preferred dialect won, and ``fallbacks_avoided`` the
+    candidates ranked ahead of the winner in the detected order, which
+    the parses skipped.
+    """
+
+    sources: int
+    hinted: int
+    hits: int
+    fallbacks_avoided: int
+
+
+class DialectAffinity:
+    """Thread-safe per-source tally of winning dialects.
+
+    The preferred dialect of a source is the candidate that won most of
+    its parses.  The least recently used sources are forgotten once more than
+    *max_sources* are tracked.
+
+    :param max_sources: Maximum number of tracked source keys.
+    :type max_sources: int
+    :raises ValueError: If *max_sources* is not positive.
+    """
+
+    def __init__(self, max_sources: int = DEFAULT_MAX_SOURCES) -> None:
+        if max_sources <= 0:
+            raise ValueError("max_sources must be positive")
+        self.max_sources = max_sources
+        self._wins: OrderedDict[Hashable, Counter[Any]] = OrderedDict()
+        self._lock = threading.Lock()
+        self._hinted = self._hits = self._avoided = 0
+
+    def preferred(
+        self, source: Hashable, candidates: Sequence[DialectType]
+    ) -> list[DialectType]:
+        """Return the candidate to try first for a query from *source*.
+
+        Only statements led by the default dialect are reordered: when a
+        marker (back-ticks, ``#VAR``, brackets, ``LATERAL VIEW``) put a
+        specific dialect first, a fallback must not jump ahead of it, as
+        it may parse the statement wrongly without looking degraded.
+
+        :param source: Caller-supplied source key.
+        :param candidates: The dialects detected for the query.
+        :returns: ``[dialect]`` with the candidate that won most often for
+            the source, or ``[]`` if none of them ever won.
+        :rtype: list[DialectType]
+        """
+        if not candidates or candidates[0] is not None:
+            return []
+        with self._lock:
+            wins = self._wins.get(source)
+            if wins is None:
+                return []
+            self._wins.move_to_end(source)
+            for dialect, _ in wins.most_common():
+                if dialect in candidates:
+                    return [dialect]
+            return []
+
+    def record(
+        self,
+        source: Hashable,
+        dialect: DialectType,
+        candidates: Sequence[DialectType],
+        preferred: Sequence[DialectType] = (),
+    ) -> None:
+        """Record that *dialect* won a parse of a query from *source*.
+
+        :param source: Caller-supplied source key.
+        :param dialect: The dialect that produced the AST.
+        :param candidates: The detected candidate dialects, in the order
+            they would have been tried without a preference.
+        :param preferred: The dialects that were tried first.
+        """
+        with self._lock:
+            if preferred:
+                self._hinted += 1
+                if dialect == preferred[0] and dialect in candidates:
+                    self._hits += 1
+                    self._avoided += list(candidates).index(dialect)
+            wins = self._wins.setdefault(source, Counter())
+            wins[dialect] += 1
+            self._wins.move_to_end(source)
+            if len(self._wins) > self.max_sources:
+                self._wins.popitem(last=False)
+
+    def clear(self) -> None:
+        """Forget all sources and reset the counters."""
+        with self._lock:
+            self._wins.clear()
+            self._hinted = self._hits = self._avoided = 0
+
+    def stats(self) -> AffinityStats:
+        """Return a consistent snapshot of the counters.
+
+        :rtype: AffinityStats
+        """
+        with self._lock:
+            return AffinityStats(
+                len(self._wins), self._hinted, self._hits, self._avoided
+            )
+
+
+# ---------------------------------------------------------------------------
+# Process-wide instance
+# ---------------------------------------------------------------------------
+
+_dialect_affinity = DialectAffinity()
+
+
+def get_dialect_affinity() -> DialectAffinity:
+    """Return the process-wide tracker used for ``Parser(..., source=...)``.
+
+    :rtype: DialectAffinity
+    """
+    return _dialect_affinity
@@ -3,9 +3,20 @@
 Combines dialect heuristics (which sqlglot dialect to try), the actual
 ``sqlglot.parse()`` call, and degraded-result detection into a single
 class so that callers only need to call :meth:`DialectParser.parse`.
+
+How candidate dialects are worked through is selected by
+:class:`ProbeStrategy`: cheap token-level prechecks can reject dialects
+before a full parse, and the remaining ones can be parsed concurrently.
 """
 
 import logging
+import os
+import threading
+from collections.abc import Callable, Iterator, Sequence
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+from enum import Enum
+from functools import partial
 from typing import Any
 
 import sqlglot
@@ -15,10 +26,14 @@ from sqlglot.dialects.redshift import Redshift
 from sqlglot.dialects.tsql import TSQL
 from sqlglot.errors import ParseError, TokenError
 from sqlglot.parsers.redshift import RedshiftParser
+from sqlglot.tokens import Token, TokenType
 from sqlglot.tokens import Tokenizer as BaseTokenizer
 
-from sql_metadata.comments import _has_hash_variables
+from sql_metadata.ast_index import ASTIndex
+from sql_metadata.comments import _has_hash_variables, _literal_dialect
 from sql_metadata.exceptions import InvalidQueryDefinition
+from sql_metadata.instrumentation import dialect_name, stage
+from sql_metadata.token_stream import TokenStream, get_dialect
 
 #: Table names that indicate a degraded parse result.
 _BAD_TABLE_NAMES = frozenset({"IGNORE", ""})
@@ -100,6 +115,170 @@ class BracketedTableDialect(TSQL):
     """
 
 
+# ---------------------------------------------------------------------------
+# Probing strategies
+# ---------------------------------------------------------------------------
+
+
+class ProbeStrategy(str, Enum):
+    """How :class:`DialectParser` works through its candidate dialects.
+
+    Inherits from :class:`str` so that ``DialectParser(strategy="precheck")``
+    works as well.
+
+    * ``SEQUENTIAL`` — fully parse each candidate in turn.
+    * ``PRECHECK`` — like ``SEQUENTIAL``, but first drop candidates whose
+      tokens already show the parse would be degraded.
+    * ``CONCURRENT`` — prechecks, then parse the remaining candidates in a
+      thread pool at once and take the highest-priority good result.
+    """
+
+    SEQUENTIAL = "sequential"
+    PRECHECK = "precheck"
+    CONCURRENT = "concurrent"
+
+
+def _starts_as_command(tokens: list[Token], dialect: Dialect) -> bool:
+    """Return ``True`` when the statement will parse as an opaque ``Command``.
+
+    sqlglot turns a statement starting with one of the tokenizer's
+    ``COMMANDS`` (and not handled by ``STATEMENT_PARSERS``) into
+    ``exp.Command``, which :meth:`DialectParser._is_degraded` rejects.
+
+    Example SQL::
+
+        SHOW TABLES  -- a Command in the default dialect, Show in mysql
+    """
+    first = tokens[0].token_type
+    return (
+        first not in dialect.parser_class.STATEMENT_PARSERS
+        and first in dialect.tokenizer_class.COMMANDS
+    )
+
+
+def _has_ignore_table(tokens: list[Token], dialect: Dialect) -> bool:
+    """Return ``True`` when ``INSERT IGNORE`` will yield a table named IGNORE.
+
+    Dialects without an ``IGNORE`` keyword lex it as a plain ``VAR``, which
+    the parser then takes for the target table name.
+
+    Example SQL::
+
+        INSERT IGNORE INTO t VALUES (1)
+    """
+    return (
+        len(tokens) > 1
+        and tokens[0].token_type == TokenType.INSERT
+        and tokens[1].token_type == TokenType.VAR
+        and tokens[1].text.upper() == "IGNORE"
+    )
+
+
+def _has_unique_column(tokens: list[Token], dialect: Dialect) -> bool:
+    """Return ``True`` when ``SELECT UNIQUE`` will yield a column named UNIQUE.
+
+    Only dialects listing ``UNIQUE`` in ``DISTINCT_TOKENS`` (Oracle) read
+    it as ``DISTINCT``; the others parse it as a bare column.
+
+    Example SQL::
+
+        SELECT UNIQUE col FROM t
+    """
+    if TokenType.UNIQUE in dialect.parser_class.DISTINCT_TOKENS:
+        return False
+    return any(
+        prev.token_type == TokenType.SELECT and tok.token_type == TokenType.UNIQUE
+        for prev, tok in zip(tokens, tokens[1:])
+    )
+
+
+#: Token-level checks that each predict a degraded parse result.
+_DEGRADATION_PRECHECKS = (_starts_as_command, _has_ignore_table, _has_unique_column)
+
+
+def _predicts_degraded(stream: TokenStream, dialect: DialectType) -> bool:
+    """Return ``True`` if *dialect*'s tokens show its parse would be degraded.
+
+    Only uses the (memoised) tokens, so rejecting a dialect here costs a
+    fraction of a full parse.  Un-tokenizable SQL is left to the parse
+    attempt, which reports the error.
+
+    :param stream: Token stream of the preprocessed SQL string.
+    :param dialect: Candidate dialect.
+    :rtype: bool
+    """
+    try:
+        tokens = stream.tokenize(dialect)
+    except TokenError:
+        return False
+    if not tokens:
+        return False
+    instance = get_dialect(dialect)
+    return any(check(tokens, instance) for check in _DEGRADATION_PRECHECKS)
+
+
+#: Upper bound on parallel dialect attempts (no query has more candidates).
+_PROBE_WORKERS = 3
+
+_probe_pool: ThreadPoolExecutor | None = None
+_probe_pool_lock = threading.Lock()
+
+
+def _probe_executor() -> ThreadPoolExecutor:
+    """Return the thread pool shared by all concurrent dialect probes."""
+    global _probe_pool
+    with _probe_pool_lock:
+        if _probe_pool is None:
+            _probe_pool = ThreadPoolExecutor(
+                max_workers=_PROBE_WORKERS, thread_name_prefix="sql-metadata-probe"
+            )
+        return _probe_pool
+
+
+def _reset_probe_executor() -> None:
+    """Drop the inherited pool in a forked child, whose copy has no threads."""
+    global _probe_pool, _probe_pool_lock
+    _probe_pool = None
+    _probe_pool_lock = threading.Lock()
+
+
+os.register_at_fork(after_in_child=_reset_probe_executor)
+
+
+#: Per-thread nesting depth of :func:`_quiet_sqlglot`.
+_quiet = threading.local()
+
+
+class _QuietFilter(logging.Filter):
+    """Drop sqlglot records logged by threads inside :func:`_quiet_sqlglot`."""
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        return not getattr(_quiet, "depth", 0)
+
+
+# installed once: silencing a parse must not change the shared logger
+logging.getLogger("sqlglot").addFilter(_QuietFilter())
+
+
+@contextmanager
+def _quiet_sqlglot() -> Iterator[None]:
+    """Silence the sqlglot logger for the current thread while probing.
+
+    ``ErrorLevel.WARN`` emits noisy warnings for every token a dialect
+    cannot handle.  Since :meth:`DialectParser._try_dialects` intentionally
+    tries multiple dialects expecting some to produce degraded results,
+    those warnings are expected and would mislead end-users if left
+    visible.  Records are dropped by a filter keyed on a thread-local
+    flag rather than by raising the logger's level, so parses running in
+    other threads neither race on the level nor lose their own warnings.
+    """
+    _quiet.depth = getattr(_quiet, "depth", 0) + 1
+    try:
+        yield
+    finally:
+        _quiet.depth -= 1
+
+
 # ---------------------------------------------------------------------------
 # DialectParser
 # ---------------------------------------------------------------------------
@@ -114,9 +293,27 @@ class DialectParser:
     class first inspects the raw SQL for dialect markers, then tries
     candidate dialects in order and picks the first result that passes
     quality checks.
+
+    :param strategy: How candidates are tried, see :class:`ProbeStrategy`.
+        Defaults to :attr:`default_strategy`.
+    :type strategy: ProbeStrategy | str | None
     """
 
-    def parse(self, clean_sql: str) -> tuple[exp.Expression, DialectType]:
+    #: Strategy used when none is passed to the constructor.
+    default_strategy: ProbeStrategy = ProbeStrategy.PRECHECK
+
+    def __init__(self, strategy: ProbeStrategy | str | None = None) -> None:
+        self.strategy = ProbeStrategy(strategy or self.default_strategy)
+        #: Node index of the AST last returned by :meth:`parse`, if the
+        #: quality checks built one (they are skipped for the last dialect).
+        self.index: ASTIndex | None = None
+
+    def parse(
+        self,
+        clean_sql: str,
+        stream: TokenStream | None = None,
+        preferred: Sequence[DialectType] = (),
+    ) -> tuple[exp.Expression, DialectType]:
         """Parse *clean_sql* into a sqlglot AST, returning ``(ast, dialect)``.
 
         Entry point for the two-phase process: first
@@ -128,12 +325,21 @@ class DialectParser:
         :param clean_sql: Preprocessed SQL string produced by
             :class:`~sql_metadata.sql_cleaner.SqlCleaner` (comments
             stripped, outer parentheses removed, CTE names normalised).
+        :param stream: Token stream to reuse when it tokenizes
+            *clean_sql* (i.e. cleaning left the raw query unchanged);
+            each dialect's tokenizer then runs at most once per query.
+        :param preferred: Dialects to try before the detected candidates,
+            e.g. a caller's hint or a source's learned dialect (see
+            :mod:`~sql_metadata.dialect_affinity`).
         :returns: 2-tuple of ``(ast_root_node, winning_dialect)``.
         :raises InvalidQueryDefinition: If every candidate dialect
             fails to produce a usable AST.
         """
-        dialects = self._detect_dialects(clean_sql)
-        return self._try_dialects(clean_sql, dialects)
+        dialects = list(preferred)
+        with stage("detect_dialects"):
+            detected = self._detect_dialects(clean_sql)
+        dialects += [d for d in detected if d not in dialects]
+        return self._try_dialects(TokenStream.of(clean_sql, stream), dialects)
 
     # -- dialect detection --------------------------------------------------
 
@@ -151,6 +357,9 @@ class DialectParser:
         * ``#WORD`` patterns → :class:`HashVarDialect` (MSSQL ``#temp``
           tables or ``#VAR#`` template placeholders).
         * Back-tick quoting → ``"mysql"`` (MySQL-style identifiers).
+        * Hex or bit literals (``X'AB'``, ``0x1F``, ``b'01'``) →
+          ``"mysql"``, ``E'...'`` escape strings → ``"postgres"``; the
+          default tokenizer splits them up.
         * ``LATERAL VIEW`` → ``"spark"`` (Hive/Spark explode syntax).
         * Square brackets or ``TOP`` keyword →
           :class:`BracketedTableDialect` (TSQL bracket-quoted names).
@@ -167,8 +376,9 @@ class DialectParser:
         upper = sql.upper()
         if _has_hash_variables(sql):
             return [HashVarDialect, None, "mysql"]
-        if "`" in sql:
-            return ["mysql", None]
+        literal_dialect = "mysql" if "`" in sql else _literal_dialect(sql)
+        if literal_dialect:
+            return [literal_dialect, None]
         if "LATERAL VIEW" in upper:
             return ["spark", None, "mysql"]
         if "[" in sql or " TOP " in upper:
@@ -182,75 +392,115 @@ class DialectParser:
     # -- parsing ------------------------------------------------------------
 
     def _try_dialects(
-        self, clean_sql: str, dialects: list[Any]
+        self, stream: TokenStream, dialects: list[Any]
     ) -> tuple[exp.Expression, DialectType]:
         """Try each candidate dialect in order and return the first good result.
 
-        Iterates over *dialects*, calling :meth:`_parse_with_dialect` for
-        each.  A result is accepted immediately if it is the last dialect
-        in the list (best-effort) or if :meth:`_is_degraded` reports no
-        quality issues.  Degraded results from non-last dialects are
-        skipped so the next candidate gets a chance.
+        Iterates over the attempts produced by :meth:`_attempts`.  A result
+        is accepted immediately if it is the last dialect in the list
+        (best-effort) or if :meth:`_is_degraded` reports no quality
+        issues.  Degraded results from non-last dialects are skipped so
+        the next candidate gets a chance.
 
-        :param clean_sql: Preprocessed SQL string.
+        :param stream: Token stream of the preprocessed SQL string.
         :param dialects: Priority-ordered list from :meth:`_detect_dialects`.
         :returns: 2-tuple of ``(ast_root_node, winning_dialect)``.
         :raises InvalidQueryDefinition: If the last dialect raises a
             parse error, or if no dialect produces a usable AST.
         """
-        for dialect in dialects:
-            try:
-                result = self._parse_with_dialect(clean_sql, dialect)
-                if result is None:
+        for dialect, outcome in self._attempts(stream, dialects):
+            with stage("parse_attempt") as span:
+                span.set("dialect", dialect_name(dialect))
+                try:
+                    result = outcome()
+                except (ParseError, TokenError):
+                    span.set("outcome", "error")
+                    if dialect is not None and dialect == dialects[-1]:
+                        raise InvalidQueryDefinition(
+                            "Query could not be parsed — SQL syntax error"
+                        )
                     continue
-                is_last = dialect == dialects[-1]
-                if not is_last and self._is_degraded(result, clean_sql):
+                if result is None:
+                    span.set("outcome", "empty")
                     continue
+                self.index = None
+                if dialect != dialects[-1]:
+                    with stage("quality_check"):
+                        self.index = ASTIndex(result)
+                        degraded = self._is_degraded(self.index, stream.sql)
+                    if degraded:
+                        span.set("outcome", "degraded")
+                        continue
+                span.set("outcome", "accepted")
                 return result, dialect
-            except (ParseError, TokenError):
-                if dialect is not None and dialect == dialects[-1]:
-                    raise InvalidQueryDefinition(
-                        "Query could not be parsed — SQL syntax error"
-                    )
-                continue
 
         raise InvalidQueryDefinition(
             "Query could not be parsed — no dialect could handle this SQL"
         )
 
+    def _attempts(
+        self, stream: TokenStream, dialects: list[Any]
+    ) -> Iterator[tuple[Any, Callable[[], exp.Expression | None]]]:
+        """Yield ``(dialect, parse)`` pairs in priority order per the strategy.
+
+        With :attr:`ProbeStrategy.PRECHECK` and
+        :attr:`ProbeStrategy.CONCURRENT`, non-last dialects whose tokens
+        already show that the parse would be degraded are dropped (see
+        :func:`_predicts_degraded`).  In concurrent mode all remaining
+        parses are submitted to a thread pool up front, and attempts that
+        are no longer needed are cancelled once the caller stops iterating.
+
+        :param stream: Token stream of the preprocessed SQL string.
+        :param dialects: Priority-ordered list from :meth:`_detect_dialects`.
+        """
+        candidates = dialects
+        if self.strategy != ProbeStrategy.SEQUENTIAL:
+            candidates = [
+                d
+                for d in dialects
+                if d == dialects[-1] or not _predicts_degraded(stream, d)
+            ]
+        if self.strategy != ProbeStrategy.CONCURRENT or len(candidates) < 2:
+            for dialect in candidates:
+                yield dialect, partial(self._parse_with_dialect, stream, dialect)
+            return
+        executor = _probe_executor()
+        futures = [
+            executor.submit(self._parse_with_dialect, stream, d) for d in candidates
+        ]
+        try:
+            yield from zip(candidates, (f.result for f in futures))
+        finally:
+            for future in futures:
+                future.cancel()
+
     @staticmethod
-    def _parse_with_dialect(clean_sql: str, dialect: Any) -> exp.Expression | None:
-        """Parse *clean_sql* with a single sqlglot dialect.
+    def _parse_with_dialect(stream: TokenStream, dialect: Any) -> exp.Expression | None:
+        """Parse the SQL of *stream* with a single sqlglot dialect.
+
+        The dialect's parser is fed the tokens memoised by *stream*, so
+        dialects sharing a tokenizer with an earlier attempt (or with the
+        comment stripping done by :class:`SqlCleaner`) skip tokenization.
 
         Uses ``ErrorLevel.WARN`` so that sqlglot returns a best-effort
         AST instead of raising on the first syntax problem — the caller
         decides whether the result is good enough via
-        :meth:`_is_degraded`.
-
-        The sqlglot logger is temporarily raised to ``CRITICAL`` during
-        the parse call because ``WARN`` mode emits noisy warnings for
-        every token it cannot handle.  Since :meth:`_try_dialects`
-        intentionally tries multiple dialects expecting some to produce
-        degraded results, those warnings are expected and would mislead
-        end-users if left visible.
+        :meth:`_is_degraded`.  The resulting warnings are silenced by
+        :func:`_quiet_sqlglot` in the thread running the parse, which is a
+        probe pool thread in concurrent mode.
 
-        :param clean_sql: Preprocessed SQL string.
+        :param stream: Token stream of the preprocessed SQL string.
         :param dialect: A sqlglot dialect identifier, class, or ``None``
             for the default dialect.
         :returns: The root AST node, or ``None`` if sqlglot could not
             produce any result.
         """
-        logger = logging.getLogger("sqlglot")
-        old_level = logger.level
-        logger.setLevel(logging.CRITICAL)
-        try:
-            results = sqlglot.parse(
-                clean_sql,
-                dialect=dialect,
-                error_level=sqlglot.ErrorLevel.WARN,
+        with _quiet_sqlglot():
+            results = (
+                get_dialect(dialect)
+                .parser(error_level=sqlglot.ErrorLevel.WARN)
+                .parse(stream.tokenize(dialect), stream.sql)
             )
-        finally:
-            logger.setLevel(old_level)
 
         if not results or results[0] is None:
             return None
@@ -258,7 +508,7 @@ class DialectParser:
 
     # -- quality checks -----------------------------------------------------
 
-    def _is_degraded(self, result: exp.Expression, clean_sql: str) -> bool:
+    def _is_degraded(self, index: ASTIndex, clean_sql: str) -> bool:
         """Return ``True`` when the parse result is low quality.
 
         A degraded result means the dialect parsed the SQL without
@@ -268,15 +518,16 @@ class DialectParser:
         or column names.  When ``True``, :meth:`_try_dialects` skips
         this dialect and moves on to the next candidate.
 
-        :param result: Root AST node from :meth:`_parse_with_dialect`.
+        :param index: Node index of the AST from :meth:`_parse_with_dialect`.
         :param clean_sql: Original cleaned SQL (needed to check whether
             ``exp.Command`` is expected).
         :returns: ``True`` if the result should be discarded in favour
             of the next dialect.
         """
+        result = index.root
         if isinstance(result, exp.Command) and not self._is_expected_command(clean_sql):
             return True
-        return self._has_parse_issues(result)
+        return self._has_parse_issues(index)
 
     @staticmethod
     def _is_expected_command(sql: str) -> bool:
@@ -295,8 +546,8 @@ class DialectParser:
         return upper.startswith("CREATE FUNCTION")
 
     @staticmethod
-    def _has_parse_issues(ast: exp.Expression) -> bool:
-        """Walk the AST looking for signs of a degraded or incorrect parse.
+    def _has_parse_issues(index: ASTIndex) -> bool:
+        """Scan the AST index for signs of a degraded or incorrect parse.
 
         When sqlglot misinterprets a query it often places SQL keywords
         (``UNIQUE``, ``DISTINCT``, etc.) into column or table name
@@ -304,13 +555,13 @@ class DialectParser:
         method scans all :class:`~sqlglot.exp.Table` and
         :class:`~sqlglot.exp.Column` nodes for those telltale patterns.
 
-        :param ast: Root AST node to inspect.
+        :param index: Node index of the AST to inspect.
         :returns: ``True`` if suspicious nodes were found.
         """
-        for table in ast.find_all(exp.Table):
+        for table in index.find_all(exp.Table):
             if table.name in _BAD_TABLE_NAMES:
                 return True
-        for col in ast.find_all(exp.Column):
+        for col in index.find_all(exp.Column):
             if col.name.upper() in _BAD_COLUMN_NAMES and not col.table:
                 return True
         return False
@@ -0,0 +1,318 @@
+"""Persistent cache of extracted metadata, shared across processes and restarts.
+
+The in-memory caches (:mod:`~sql_metadata.parse_cache`,
+:mod:`~sql_metadata.metadata_cache`) start empty in every new process, so
+after a deploy every worker parses its hot queries again.
+:class:`DiskCache` stores the literal-independent metadata of a query — a
+:class:`~sql_metadata.metadata_cache.MetadataSnapshot` — in an SQLite
+database, where the next process finds it::
+
+    from sql_metadata import Parser, enable_disk_cache
+
+    enable_disk_cache("/var/cache/app/sql-metadata.sqlite", ttl=7 * 86400)
+    Parser.cached("SELECT a FROM t WHERE id = 5").columns  # parsed once
+
+Entries are keyed by a BLAKE2b hash of the raw SQL, the sql-metadata and
+sqlglot versions and the storage format, so upgrading either library
+never returns stale results.  The database runs in WAL mode, so any
+number of processes can read it while one of them writes.  The cache is
+bounded by *max_entries* (oldest entries are evicted first) and entries
+older than *ttl* seconds are ignored and purged.
+
+SQLite is used rather than :mod:`dbm`, whose implementations are not
+safe for concurrent writers and cannot evict by age.
+"""
+
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+from importlib.metadata import PackageNotFoundError, version
+from typing import TYPE_CHECKING, Any
+
+import sqlglot
+
+from sql_metadata.keywords_lists import QueryType
+from sql_metadata.metadata_cache import MetadataSnapshot
+from sql_metadata.parse_cache import CacheStats
+from sql_metadata.utils import UniqueList
+
+if TYPE_CHECKING:
+    from sql_metadata.parser import Parser
+
+#: Default number of entries kept by :class:`DiskCache`.
+DEFAULT_MAX_ENTRIES = 100_000
+
+#: Seconds a connection waits for another process holding the write lock.
+DEFAULT_TIMEOUT = 5.0
+
+#: Version of the stored payload, part of every key.
+_FORMAT = 1
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS entries (
+    id INTEGER PRIMARY KEY,
+    key BLOB NOT NULL UNIQUE,
+    created REAL NOT NULL,
+    payload TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS entries_created ON entries (created);
+"""
+
+
+def _library_version() -> str:
+    """Return the installed sql-metadata version, ``"dev"`` in a checkout."""
+    try:
+        return version("sql-metadata")
+    except PackageNotFoundError:
+        return "dev"
+
+
+def cache_key(sql: str) -> bytes:
+    """Return the key under which the metadata of *sql* is stored.
+
+    :param sql: Raw SQL string.
+    :type sql: str
+    :returns: A 16-byte digest, stable across processes.
+    :rtype: bytes
+    """
+    digest = hashlib.blake2b(digest_size=16)
+    prefix = f"{_FORMAT}\0{_library_version()}\0{sqlglot.__version__}\0"
+    digest.update(prefix.encode())
+    digest.update(sql.encode("utf-8", "surrogatepass"))
+    return digest.digest()
+
+
+def _encode(snapshot: MetadataSnapshot) -> str:
+    """Serialise *snapshot* to JSON (``QueryType`` is a ``str`` enum)."""
+    return json.dumps(snapshot._asdict(), separators=(",", ":"))
+
+
+def _decode(payload: str) -> MetadataSnapshot:
+    """Rebuild a :class:`MetadataSnapshot` written by :func:`_encode`."""
+    data: dict[str, Any] = json.loads(payload)
+    query_type = data["query_type"]
+    return MetadataSnapshot(
+        query_type=QueryType(query_type) if query_type else None,
+        tables=UniqueList(data["tables"]),
+        tables_aliases=data["tables_aliases"],
+        columns=UniqueList(data["columns"]),
+        columns_dict=_unique_values(data["columns_dict"]),
+        columns_aliases=data["columns_aliases"],
+        columns_aliases_dict=_unique_values(data["columns_aliases_dict"]),
+        columns_aliases_names=UniqueList(data["columns_aliases_names"]),
+        with_names=UniqueList(data["with_names"]),
+        subqueries_names=UniqueList(data["subqueries_names"]),
+    )
+
+
+def _unique_values(mapping: dict[str, list[str]]) -> dict[str, UniqueList]:
+    return {key: UniqueList(value) for key, value in mapping.items()}
+
+
+class DiskCache:
+    """SQLite-backed cache of :class:`MetadataSnapshot` by :func:`cache_key`.
+
+    Each thread (and each forked process) opens its own connection.
+    Database errors, e.g. a lock held longer than *timeout*, are treated
+    as misses: the query is parsed as if the cache were not there.
+
+    :param path: Database file, created if missing.
+    :type path: str | os.PathLike[str]
+    :param max_entries: Maximum number of cached queries.
+    :type max_entries: int
+    :param ttl: Seconds after which an entry expires, ``None`` to keep
+        entries until they are evicted.
+    :type ttl: float | None
+    :param timeout: Seconds to wait for a lock held by another process.
+    :type timeout: float
+    """
+
+    def __init__(
+        self,
+        path: str | os.PathLike[str],
+        max_entries: int = DEFAULT_MAX_ENTRIES,
+        ttl: float | None = None,
+        timeout: float = DEFAULT_TIMEOUT,
+    ) -> None:
+        if max_entries < 1 or (ttl is not None and ttl <= 0):
+            raise ValueError("Cache limits must be positive")
+        self.path = os.fspath(path)
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self.timeout = timeout
+        self._local = threading.local()
+        self._lock = threading.Lock()
+        self._hits = 0
+        self._misses = 0
+        self._evictions = 0
+        self._connection().executescript(_SCHEMA)
+
+    def _connection(self) -> sqlite3.Connection:
+        """Return this thread's connection, opening it on first use."""
+        connection: sqlite3.Connection | None = getattr(self._local, "db", None)
+        if connection is None or self._local.pid != os.getpid():
+            # a connection must not be used across fork
+            connection = sqlite3.connect(
+                self.path, timeout=self.timeout, isolation_level=None
+            )
+            connection.execute("PRAGMA journal_mode=WAL")
+            connection.execute("PRAGMA synchronous=NORMAL")
+            self._local.db = connection
+            self._local.pid = os.getpid()
+        return connection
+
+    def get(self, sql: str) -> MetadataSnapshot | None:
+        """Return the snapshot stored for *sql*, if any and not expired.
+
+        :param sql: Raw SQL string.
+        :type sql: str
+        :rtype: MetadataSnapshot | None
+        """
+        try:
+            row = (
+                self._connection()
+                .execute(
+                    "SELECT payload FROM entries WHERE key = ? AND created >= ?",
+                    (cache_key(sql), self._oldest()),
+                )
+                .fetchone()
+            )
+        except sqlite3.Error:
+            row = None
+        with self._lock:
+            if row is None:
+                self._misses += 1
+                return None
+            self._hits += 1
+        return _decode(row[0])
+
+    def put(self, sql: str, snapshot: MetadataSnapshot) -> None:
+        """Store *snapshot* for *sql*, evicting old and expired entries.
+
+        :param sql: Raw SQL string.
+        :type sql: str
+        :param snapshot: Metadata extracted from *sql*.
+        :type snapshot: MetadataSnapshot
+        """
+        try:
+            with self._connection() as db:
+                db.execute("BEGIN IMMEDIATE")
+                db.execute(
+                    "INSERT OR REPLACE INTO entries (key, created, payload)"
+                    " VALUES (?, ?, ?)",
+                    (cache_key(sql), time.time(), _encode(snapshot)),
+                )
+                # ids grow with every insert, so this keeps the newest entries
+                evicted = db.execute(
+                    "DELETE FROM entries WHERE id <= (SELECT MAX(id) FROM entries) - ?"
+                    " OR created < ?",
+                    (self.max_entries, self._oldest()),
+                ).rowcount
+        except sqlite3.Error:
+            return
+        with self._lock:
+            self._evictions += evicted
+
+    def parser(self, sql: str) -> "Parser":
+        """Return a :class:`Parser` for *sql*, seeded from the cache.
+
+        On a hit the parser answers the cached fields without parsing;
+        on a miss the query is fully extracted up front and stored.
+        Queries that fail to parse are not cached.
+
+        :param sql: Raw SQL string.
+        :type sql: str
+        :rtype: Parser
+        """
+        from sql_metadata.parser import Parser
+
+        parser = Parser(sql)
+        snapshot = self.get(sql)
+        if snapshot is not None:
+            snapshot.seed(parser)
+            return parser
+        try:
+            snapshot = MetadataSnapshot.from_parser(parser)
+        except Exception:  # the lazy parser raises it again on access
+            return parser
+        self.put(sql, snapshot)
+        return parser
+
+    def clear(self) -> None:
+        """Delete all entries and reset the counters."""
+        with self._connection() as db:
+            db.execute("DELETE FROM entries")
+        with self._lock:
+            self._hits = self._misses = self._evictions = 0
+
+    def stats(self) -> CacheStats:
+        """Return the counters of this instance and the database size.
+
+        ``hits``, ``misses`` and ``evictions`` count this process's calls;
+        ``entries`` and ``size`` (in bytes) describe the shared database.
+
+        :rtype: CacheStats
+        """
+        db = self._connection()
+        (entries,) = db.execute("SELECT COUNT(*) FROM entries").fetchone()
+        (pages,) = db.execute("PRAGMA page_count").fetchone()
+        (page_size,) = db.execute("PRAGMA page_size").fetchone()
+        with self._lock:
+            return CacheStats(
+                self._hits, self._misses, self._evictions, entries, pages * page_size
+            )
+
+    def close(self) -> None:
+        """Close the calling thread's connection."""
+        connection = getattr(self._local, "db", None)
+        if connection is not None:
+            connection.close()
+            self._local.db = None
+
+    def _oldest(self) -> float:
+        """Return the creation time of the oldest entry still valid."""
+        return time.time() - self.ttl if self.ttl is not None else 0.0
+
+
+# ---------------------------------------------------------------------------
+# Process-wide instance
+# ---------------------------------------------------------------------------
+
+_disk_cache: DiskCache | None = None
+
+
+def enable_disk_cache(
+    path: str | os.PathLike[str],
+    max_entries: int = DEFAULT_MAX_ENTRIES,
+    ttl: float | None = None,
+) -> DiskCache:
+    """Install a process-wide :class:`DiskCache` used by :meth:`Parser.cached`.
+
+    :param path: Database file, created if missing.
+    :type path: str | os.PathLike[str]
+    :param max_entries: Maximum number of cached queries.
+    :type max_entries: int
+    :param ttl: Seconds after which an entry expires.
+    :type ttl: float | None
+    :rtype: DiskCache
+    """
+    global _disk_cache
+    _disk_cache = DiskCache(path, max_entries, ttl)
+    return _disk_cache
+
+
+def disable_disk_cache() -> None:
+    """Stop consulting the disk cache; the database file is kept."""
+    global _disk_cache
+    _disk_cache = None
+
+
+def get_disk_cache() -> DiskCache | None:
+    """Return the process-wide disk cache, or ``None`` when disabled.
+
+    :rtype: DiskCache | None
+    """
+    return _disk_cache
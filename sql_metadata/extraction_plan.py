@@ -0,0 +1,97 @@
+"""Plan which :class:`~sql_metadata.parser.Parser` properties a request needs.
+
+Every ``Parser`` property is computed lazily and may build on others —
+``columns`` needs the table aliases, which need the tables, which need
+the query type and the CTE names.  :data:`FIELD_DEPENDENCIES` spells those
+prerequisites out, and :func:`extraction_plan` turns a set of requested
+fields into the minimal, ordered list of properties to compute::
+
+    from sql_metadata.extraction_plan import extraction_plan
+
+    extraction_plan({"columns"})
+    # ('query_type', 'with_names', 'tables', 'tables_aliases', 'columns')
+
+Anything outside the plan is never computed: e.g. CTE and subquery bodies
+are only rendered for ``with_queries`` / ``subqueries``, and the
+per-clause resolution behind ``columns_dict`` only runs when that field
+(or one built on it) is requested.  :meth:`Parser.extract
+<sql_metadata.parser.Parser.extract>` evaluates a plan and returns the
+requested fields.
+"""
+
+from collections.abc import Iterable
+
+#: Direct prerequisites of each ``Parser`` property that can be extracted.
+FIELD_DEPENDENCIES: dict[str, tuple[str, ...]] = {
+    "query_type": (),
+    "tokens": (),
+    "with_names": (),
+    "with_queries": (),
+    "subqueries": (),
+    "subqueries_names": (),
+    "tables": ("query_type", "with_names"),
+    "tables_aliases": ("tables",),
+    "columns": ("tables_aliases",),
+    "columns_dict": ("columns",),
+    "columns_aliases": ("columns",),
+    "columns_aliases_dict": ("columns",),
+    "columns_aliases_names": ("columns",),
+    "output_columns": ("columns",),
+    "limit_and_offset": (),
+    "values": (),
+    "values_dict": ("values", "columns"),
+    # streams the rows before reading ``columns``, which then only need
+    # the statement head, so ``columns`` must not be computed first
+    "values_columnar": (),
+    "comments": (),
+    "without_comments": (),
+    "generalize": (),
+    "structural_fingerprint": ("query_type",),
+}
+
+#: Names of all fields that can be extracted.
+FIELDS = frozenset(FIELD_DEPENDENCIES)
+
+#: Fields extracted when none are given.
+DEFAULT_FIELDS = ("query_type", "tables", "columns")
+
+
+def validate_fields(fields: Iterable[str]) -> tuple[str, ...]:
+    """Return *fields* as a tuple, rejecting unknown names.
+
+    :param fields: Requested ``Parser`` property names.
+    :type fields: Iterable[str]
+    :rtype: tuple[str, ...]
+    :raises ValueError: If a field is not in :data:`FIELDS`.
+    """
+    fields = tuple(fields)
+    unknown = sorted(set(fields) - FIELDS)
+    if unknown:
+        raise ValueError(f"Unknown fields: {', '.join(unknown)}")
+    return fields
+
+
+def extraction_plan(fields: Iterable[str]) -> tuple[str, ...]:
+    """Return the properties to compute for *fields*, prerequisites first.
+
+    The plan holds each requested field and, transitively, everything it
+    depends on — and nothing else.  Fields keep their requested order
+    wherever their dependencies allow.
+
+    :param fields: Requested ``Parser`` property names.
+    :type fields: Iterable[str]
+    :rtype: tuple[str, ...]
+    :raises ValueError: If a field is not in :data:`FIELDS`.
+    """
+    plan: dict[str, None] = {}
+
+    def visit(field: str) -> None:
+        if field in plan:
+            return
+        for dependency in FIELD_DEPENDENCIES[field]:
+            visit(dependency)
+        plan[field] = None
+
+    for field in validate_fields(fields):
+        visit(field)
+    return tuple(plan)
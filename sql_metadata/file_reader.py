@@ -0,0 +1,148 @@
+"""Read SQL statements from large dump and log files.
+
+:func:`iter_file_statements` extracts the statements of a ``.sql`` file
+without reading it into one string: plain files are memory-mapped and
+compressed ones (gzip, bzip2, xz — detected from their magic bytes) are
+decompressed as a stream.  Lines go through the
+:class:`~sql_metadata.script_parser.StatementSplitter`, so only the
+statement being scanned is held in memory, and each statement carries its
+byte offset and length in the (decompressed) file::
+
+    from sql_metadata import Parser
+
+    for statement, parser in Parser.iter_file("dump.sql.gz", dialect_hint="mysql"):
+        print(statement.offset, parser.tables)
+
+Offsets are exact for any ASCII-compatible encoding: bytes that do not
+decode are kept as lone surrogates (``surrogateescape``) rather than
+replaced.
+"""
+
+import bz2
+import gzip
+import lzma
+import mmap
+import os
+from collections import deque
+from collections.abc import Callable, Iterator
+from contextlib import contextmanager
+from io import BufferedIOBase
+from typing import BinaryIO, NamedTuple
+
+from sqlglot.dialects.dialect import DialectType
+
+from sql_metadata.script_parser import (
+    DEFAULT_DELIMITER,
+    ScriptStatement,
+    StatementSplitter,
+)
+
+#: Magic bytes and readers of the supported compression formats.
+_COMPRESSED: tuple[tuple[bytes, Callable[[BinaryIO], BufferedIOBase]], ...] = (
+    (b"\x1f\x8b", lambda raw: gzip.GzipFile(fileobj=raw)),
+    (b"BZh", bz2.BZ2File),
+    (b"\xfd7zXZ\x00", lzma.LZMAFile),
+)
+
+
+class FileStatement(NamedTuple):
+    """A statement read from a file.
+
+    ``offset`` and ``length`` locate the statement text in bytes, within
+    the decompressed content for compressed files.
+    """
+
+    offset: int
+    length: int
+    sql: str
+
+
+@contextmanager
+def open_lines(path: str | os.PathLike[str]) -> Iterator[Iterator[bytes]]:
+    """Open *path* and yield an iterator over its lines, as bytes.
+
+    Plain files are memory-mapped; gzip, bzip2 and xz files are
+    decompressed on the fly.
+
+    :param path: File to read.
+    :type path: str | os.PathLike[str]
+    :rtype: Iterator[Iterator[bytes]]
+    """
+    with open(path, "rb") as raw:
+        magic = raw.read(6)
+        raw.seek(0)
+        for prefix, opener in _COMPRESSED:
+            if magic.startswith(prefix):
+                with opener(raw) as stream:
+                    yield iter(stream)
+                return
+        if os.fstat(raw.fileno()).st_size == 0:
+            yield iter(())  # empty files cannot be mapped
+            return
+        with mmap.mmap(raw.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+            yield iter(mapped.readline, b"")
+
+
+class _ByteOffsets:
+    """Decode lines and map character offsets back to byte offsets.
+
+    Lines are kept until a later offset is looked up, which the splitter
+    guarantees to happen in increasing order.
+    """
+
+    def __init__(self, encoding: str) -> None:
+        self._encoding = encoding
+        #: ``(char offset, byte offset, text, is ASCII)`` of kept lines.
+        self._lines: deque[tuple[int, int, str, bool]] = deque()
+        self._chars = self._bytes = 0
+
+    def decode(self, line: bytes) -> str:
+        text = line.decode(self._encoding, "surrogateescape")
+        self._lines.append((self._chars, self._bytes, text, len(text) == len(line)))
+        self._chars += len(text)
+        self._bytes += len(line)
+        return text
+
+    def byte_offset(self, char_offset: int) -> int:
+        lines = self._lines
+        while len(lines) > 1 and lines[1][0] <= char_offset:
+            lines.popleft()
+        chars, bytes_, text, ascii_only = lines[0]
+        if ascii_only:
+            return bytes_ + char_offset - chars
+        head = text[: char_offset - chars]
+        return bytes_ + len(head.encode(self._encoding, "surrogateescape"))
+
+    def locate(self, statement: ScriptStatement) -> FileStatement:
+        start = self.byte_offset(statement.offset)
+        end = self.byte_offset(statement.offset + len(statement.sql))
+        return FileStatement(start, end - start, statement.sql)
+
+
+def iter_file_statements(
+    path: str | os.PathLike[str],
+    delimiter: str = DEFAULT_DELIMITER,
+    dialect: DialectType = None,
+    encoding: str = "utf-8",
+) -> Iterator[FileStatement]:
+    """Yield the statements of a SQL file with their byte offsets.
+
+    :param path: Plain, gzip, bzip2 or xz compressed SQL file.
+    :type path: str | os.PathLike[str]
+    :param delimiter: Statement delimiter.
+    :type delimiter: str
+    :param dialect: Tokenizer dialect for splitting, see
+        :class:`~sql_metadata.script_parser.StatementSplitter`.
+    :type dialect: DialectType
+    :param encoding: An ASCII-compatible text encoding.
+    :type encoding: str
+    :rtype: Iterator[FileStatement]
+    """
+    splitter = StatementSplitter(delimiter, dialect)
+    offsets = _ByteOffsets(encoding)
+    with open_lines(path) as lines:
+        for line in lines:
+            for statement in splitter.feed(offsets.decode(line)):
+                yield offsets.locate(statement)
+    for statement in splitter.close():
+        yield offsets.locate(statement)
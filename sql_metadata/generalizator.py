@@ -5,11 +5,341 @@ multi-value ``IN (...)`` / ``VALUES (...)`` lists with ``(XYZ)`` so
 that structurally identical queries can be grouped for analysis
 (e.g. slow-query log aggregation).  Based on MediaWiki's
 ``DatabaseBase::generalizeSQL``.
+
+The query is generalised in a single pass over its tokens, found with
+one compiled regular expression (see :class:`_Renderer`), rather than
+with the sqlglot tokenizer followed by a cascade of substitutions over
+the whole text.  Queries whose quoting the single pass does not mirror
+exactly — backslash escapes, unterminated literals or comments, stray
+quote characters — are generalised with that original cascade, so the
+output does not depend on which path was taken.  Each step of the
+cascade is a linear scan of the text as well.
 """
 
+import hashlib
 import re
+from collections.abc import Iterable, Iterator
+
+from sql_metadata.comments import _tokenizer_dialect, strip_comments
+from sql_metadata.token_stream import TokenStream
+
+
+def _token_pattern(mysql: bool, words: bool) -> re.Pattern[str]:
+    """Compile a tokenizer for :class:`_Renderer`.
+
+    Mirrors the comment and quoting rules of the sqlglot tokenizer picked
+    by :func:`_tokenizer_dialect`: MySQL's also knows ``#`` comments and
+    back-tick quoted identifiers.  Unquoted text is split into words when
+    ``LIKE`` clauses have to be found, and otherwise taken in runs up to
+    the next literal or comment.
+    """
+    hash_comment = r"|\#[^\n]*" if mysql else ""
+    backticks = r"|`[^`]*(?:``[^`]*)*`" if mysql else ""
+    special = "'\"`#/\\-" if mysql else "'\"/\\-"
+    spaces = "\\s" if words else ""
+    return re.compile(
+        rf"""
+        (?P<gap>\s+|--[^\n]*{hash_comment})
+        |(?P<comment>/\*.*?\*/)
+        |(?P<plain>[^{spaces}{special}]+|-|/(?!\*))
+        |(?P<string>'[^']*(?:''[^']*)*')
+        |(?P<quoted>"[^"]*(?:""[^"]*)*"{backticks})
+        |(?P<unsupported>.)
+        """,
+        re.VERBOSE | re.DOTALL,
+    )
+
+
+#: Tokenizers keyed by MySQL flavour and whether words are needed.
+_TOKENS = {
+    (mysql, words): _token_pattern(mysql, words)
+    for mysql in (False, True)
+    for words in (False, True)
+}
+
+#: Prefixes of MySQL hex (``x'1F'``) and bit (``b'01'``) strings.
+_BINARY_PREFIXES = ("x", "X", "b", "B")
+
+_LIKE_WORD = re.compile("like", re.IGNORECASE)
+_NUMBER = re.compile(r"-?[0-9]+")
+_WHITESPACE = re.compile(r"\s+")
+_ODD_SPACE = re.compile(r"\s\s|[^\S ]")
+_LIST_START = re.compile(r" (IN|VALUES)\s*\(", re.IGNORECASE)
+_LIKE_STRING = re.compile(r"LIKE '[^\']+'")
+#: A run of one ``or/and <column> LIKE X`` clause; the repeats must match
+#: the first one exactly, while the first one is found in any case.
+_LIKE_CLAUSES = re.compile(r"\s?((?i:(?:or|and) [^\s]+ LIKE X))(?:\s?\1)*")
+
+#: Size of :attr:`Generalizator.fingerprint` in bytes.
+FINGERPRINT_SIZE = 8
+
+
+class _Unsupported(Exception):
+    """The query needs the substitution cascade to be generalised."""
+
+
+class _Run:
+    """Pieces between two gaps — a ``[^\\s]+`` match of the legacy cascade."""
+
+    __slots__ = ("start", "key", "spaced")
+
+    def __init__(self, start: int, key: str) -> None:
+        #: Index of the first piece in the output.
+        self.start = start
+        #: The text as the cascade sees it when collapsing ``LIKE`` clauses.
+        self.key = key
+        #: Whether a string literal of the run holds whitespace.
+        self.spaced = False
+
+
+class _Renderer:
+    """Generalise a query in one pass over its tokens.
+
+    Each token is rendered as it is found: string literals become ``X``,
+    quotes are dropped from identifiers and whitespace and comments
+    become a single space.  Runs of identical ``or/and <column> LIKE X``
+    clauses are collapsed on the fly.  Numbers and ``IN (...)`` lists are
+    then replaced in the rendered text, each in one linear scan.
+
+    :param sql: The query.
+    :type sql: str
+    """
 
-from sql_metadata.comments import strip_comments
+    def __init__(self, sql: str) -> None:
+        self._sql = sql
+        self._mysql = _tokenizer_dialect(sql) == "mysql"
+        self._out: list[str] = []
+        self._gap = True
+        #: Whether percent signs alone follow a gap.
+        self._percent = False
+        #: Set when rendering left runs of whitespace to collapse.
+        self._spaced = False
+        #: ``LIKE`` clauses are only tracked when the query has any.
+        self._likes: list[_Run] | None = [] if _LIKE_WORD.search(sql) else None
+        #: Key and end of the last collapsed ``LIKE`` clause.
+        self._clause: tuple[str, int] = ("", -1)
+
+    def parts(self) -> Iterator[str]:
+        """Return the generalised query as consecutive pieces of text.
+
+        :raises _Unsupported: If only the substitution cascade reproduces
+            the original output for this query.
+        :rtype: Iterator[str]
+        """
+        if "\\" in self._sql:
+            raise _Unsupported
+        tokens = _TOKENS[self._mysql, self._likes is not None]
+        for match in tokens.finditer(self._sql):
+            kind = match.lastgroup
+            text = match.group()
+            if kind == "plain":
+                self._plain(text)
+            elif kind == "string":
+                self._string(text)
+            elif kind == "gap" or kind == "comment":
+                self._space(text)
+            elif kind == "quoted":
+                self._quoted(text)
+            else:
+                raise _Unsupported  # unterminated quote or comment
+        return self._finish("".join(self._out))
+
+    # -- pieces -------------------------------------------------------------
+
+    def _plain(self, text: str) -> None:
+        if "%" in text:
+            text = text.replace("%", "")
+            self._spaced = True  # "a % b" leaves two spaces
+        if _ODD_SPACE.search(text):
+            text = _WHITESPACE.sub(" ", text)
+        self._word(text)
+
+    def _space(self, text: str) -> None:
+        if not self._mysql and text.startswith("/*") and "/*" in text[2:]:
+            raise _Unsupported  # nested comments
+        if self._percent:
+            # two spaces in a row for the cascade: no LIKE clause spans them
+            self._percent = False
+            if self._likes is not None:
+                self._track("")
+            self._out.append("")
+            self._gap = False
+            self._spaced = True
+        if not self._gap and not self._out[-1].endswith(" "):
+            self._out.append(" ")
+        self._gap = True
+
+    def _piece(self, text: str, key: str) -> None:
+        """Add a piece rendered as *text*; *key* is its text for ``LIKE``."""
+        if not text:
+            # only percent signs, dropped by the cascade after collapsing
+            # spaces: they only count when followed by whitespace
+            self._percent = self._gap
+            self._leading_space()
+            return
+        self._percent = False
+        if self._likes is not None:
+            self._track(key)
+        self._out.append(text)
+        self._gap = False
+
+    def _quoted(self, text: str) -> None:
+        if "'" in text:
+            raise _Unsupported  # would pair up with string quotes
+        text = text.replace('"', "")
+        if not text:
+            # the cascade drops double quotes before anything else
+            self._leading_space()
+            return
+        if _WHITESPACE.search(text):
+            if self._likes is not None:
+                raise _Unsupported  # the cascade matches LIKE clauses inside
+            self._spaced = True
+        self._word(text.replace("%", ""))
+
+    def _word(self, text: str) -> None:
+        """Add a word, or a quoted identifier without its double quotes."""
+        likes = self._likes
+        if likes and self._gap and text[:1] in ("x", "X"):
+            if likes[-1].key.lower() == "like":
+                raise _Unsupported  # the cascade would take it for LIKE X
+        self._piece(text, text)
+
+    def _leading_space(self) -> None:
+        """Keep the space left by an empty first piece (for ``IN (...)``)."""
+        if not self._out:
+            self._out.append(" ")
+
+    def _string(self, text: str) -> None:
+        """Render a string literal as one ``X`` per quoted part."""
+        if self._mysql and not self._gap and self._out[-1].endswith(_BINARY_PREFIXES):
+            raise _Unsupported  # MySQL validates hex and bit strings
+        rendered = "X" * (text.count("'") // 2)
+        likes = self._likes
+        if likes is None:
+            self._piece(rendered, "")
+            return
+        if "LIKE" in text:
+            raise _Unsupported  # the cascade may match LIKE '...' across quotes
+        content = text[1:-1].replace("%", "").replace('"', "")
+        after_like = bool(likes) and likes[-1].key.endswith("LIKE")
+        if after_like and "'" in content:
+            raise _Unsupported  # the cascade replaces up to the inner quote
+        replaced = self._gap and content and "'" not in content
+        if replaced and self._like_clause():
+            self._collapse(rendered)
+            return
+        if replaced and after_like:
+            key = "X"  # the cascade replaces LIKE '...' first
+        else:
+            key = _WHITESPACE.sub(" ", text.replace("%", "").replace('"', ""))
+        self._piece(rendered, key)
+        if _WHITESPACE.search(text):
+            likes[-1].spaced = True
+
+    # -- LIKE clauses -------------------------------------------------------
+
+    def _track(self, key: str) -> None:
+        """Extend the current run, or start one after a gap."""
+        likes = self._likes
+        assert likes is not None
+        if not self._gap:
+            likes[-1].key += key
+            return
+        likes.append(_Run(len(self._out), key))
+        del likes[:-3]
+
+    def _like_clause(self) -> bool:
+        """Tell whether the string completes an ``or/and <run> LIKE`` clause."""
+        likes = self._likes
+        assert likes is not None
+        if not likes or likes[-1].key != "LIKE":
+            return False
+        if any(run.spaced for run in likes):
+            raise _Unsupported  # the cascade may match a clause across quotes
+        if len(likes) < 3:
+            return False
+        operator, column = likes[-3], likes[-2]
+        word = operator.key.lower()
+        if word in ("or", "and"):
+            return bool(column.key)
+        if word.endswith(("or", "and")):
+            raise _Unsupported  # the cascade matches inside words
+        return False
+
+    def _collapse(self, rendered: str) -> None:
+        """Add the string ending a ``LIKE`` clause, merging repeated ones."""
+        likes = self._likes
+        assert likes is not None
+        operator, column = likes[-3], likes[-2]
+        key = f"{operator.key} {column.key} LIKE X"
+        out = self._out
+        if self._clause == (key, operator.start - 1):
+            del out[operator.start - 1 :]
+        else:
+            out.append(rendered)
+            out.append(" ...")
+        self._clause = (key, len(out))
+        likes.clear()
+        likes.append(_Run(len(out), "X"))
+        self._gap = self._percent = False
+
+    # -- whole text ---------------------------------------------------------
+
+    def _finish(self, sql: str) -> Iterator[str]:
+        if self._spaced:
+            sql = _WHITESPACE.sub(" ", sql)
+        sql = _NUMBER.sub("N", sql)
+        # no list ends in trailing whitespace: stripping it first is safe
+        return _lstrip_parts(_collapse_lists(sql.rstrip()))
+
+
+def _lstrip_parts(parts: Iterable[str]) -> Iterator[str]:
+    """Yield *parts* without the whitespace their concatenation starts with."""
+    leading = True
+    for part in parts:
+        if leading:
+            part = part.lstrip()
+            leading = not part
+        yield part
+
+
+def _collapse_lists(sql: str) -> list[str]:
+    """Replace ``IN (...)`` / ``VALUES (...)`` lists with ``(XYZ)``.
+
+    Matches what ``re.sub(r" (IN|VALUES)\\s*\\([^,]+,[^)]+\\)", ...)``
+    does, with the first comma and the first closing parenthesis after
+    it looked up once, not again for each list.  A match runs from
+    ``IN (`` to the first ``)`` after the next comma, so only the first
+    row of a multi-row ``VALUES`` is collapsed, a single-item list is
+    merged with the list after it (``IN (N) AND b IN (N, N)`` becomes
+    ``IN (XYZ)``) or kept if none follows, and lists whose first or last
+    item is empty (``(,N)``, ``(N,)``) are left alone.
+
+    :returns: The pieces of the resulting text.
+    """
+    parts: list[str] = []
+    position = 0
+    comma = closing = -1
+    for match in _LIST_START.finditer(sql):
+        if match.start() < position:
+            continue
+        body = match.end()
+        if comma < body:
+            comma = sql.find(",", body)
+            if comma < 0:
+                break
+        if closing <= comma:
+            closing = sql.find(")", comma + 1)
+            if closing < 0:
+                break
+        if comma == body or closing == comma + 1:
+            continue
+        parts.append(sql[position : match.start()])
+        parts.append(f" {match.group(1)} (XYZ)")
+        position = closing + 1
+    parts.append(sql[position:])
+    return parts
 
 
 class Generalizator:
@@ -25,15 +355,20 @@ class Generalizator:
 
     :param sql: Raw SQL query string to generalise.
     :type sql: str
+    :param stream: Token stream of *sql* to reuse for comment stripping.
+    :type stream: TokenStream | None
     """
 
-    def __init__(self, sql: str = ""):
+    def __init__(self, sql: str = "", stream: TokenStream | None = None):
         """Initialise with the raw SQL string.
 
         :param sql: SQL query to generalise.
         :type sql: str
+        :param stream: Token stream of *sql*, if already available.
+        :type stream: TokenStream | None
         """
         self._raw_query = sql
+        self._stream = stream
 
     # SQL queries normalization (#16)
     @staticmethod
@@ -42,7 +377,8 @@ class Generalizator:
 
         Strips ``%`` wildcards, replaces ``LIKE '...'`` with ``LIKE X``,
         and collapses consecutive ``or/and ... LIKE X`` clauses into a
-        single instance with ``...`` suffix.
+        single instance with ``...`` suffix, in one scan of the text
+        rather than one per distinct clause.
 
         :param sql: SQL string with LIKE clauses.
         :type sql: str
@@ -52,19 +388,10 @@ class Generalizator:
         sql = sql.replace("%", "")
 
         # LIKE '%bot'
-        sql = re.sub(r"LIKE '[^\']+'", "LIKE X", sql)
+        sql = _LIKE_STRING.sub("LIKE X", sql)
 
         # or all_groups LIKE X or all_groups LIKE X
-        found = re.finditer(r"(or|and) [^\s]+ LIKE X", sql, flags=re.IGNORECASE)
-        like_matches = [m.group(0) for m in found]
-
-        if like_matches:
-            for match in set(like_matches):
-                sql = re.sub(
-                    r"(\s?" + re.escape(match) + ")+", " " + match + " ...", sql
-                )
-
-        return sql
+        return _LIKE_CLAUSES.sub(lambda match: f" {match.group(1)} ...", sql)
 
     @property
     def without_comments(self) -> str:
@@ -75,12 +402,108 @@ class Generalizator:
         :returns: Comment-free SQL string.
         :rtype: str
         """
-        return strip_comments(self._raw_query)
+        return strip_comments(self._raw_query, self._stream)
 
     @property
     def generalize(self) -> str:
         """Return a generalised version of the SQL query.
 
+        Comments are dropped, string literals become ``X``, numbers
+        ``N`` and ``IN (...)`` / ``VALUES (...)`` lists ``(XYZ)``;
+        repeated ``or/and <column> LIKE '...'`` clauses are collapsed
+        into one followed by ``...``.  Rendered in one pass over the
+        tokens, with the substitution cascade of :meth:`_generalize_cascade`
+        as the fallback for queries the single pass does not handle.
+
+        :returns: Generalised SQL string, or ``""`` for empty input.
+        :rtype: str
+        """
+        return "".join(self._generalized_parts())
+
+    @property
+    def fingerprint(self) -> int:
+        """Return a 64-bit digest of the generalised query.
+
+        The digest is BLAKE2b with an 8-byte output over the UTF-8 bytes
+        of :attr:`generalize` (lone surrogates encoded as with
+        ``surrogatepass``), read as an unsigned big-endian integer.  It
+        changes only when the generalised text does, so it can be stored
+        as an aggregation key.
+
+        The text is not hashed while it is rendered: numbers and lists are
+        replaced in the joined output, whose matches may span rendered
+        pieces, and collapsing ``LIKE`` clauses rewrites pieces already
+        rendered.  Only the pieces of the final list scan skip the join.
+
+        :returns: An integer in ``[0, 2**64)``.
+        :rtype: int
+        """
+        return int.from_bytes(self._digest().digest(), "big")
+
+    @property
+    def fingerprint_hex(self) -> str:
+        """Return :attr:`fingerprint` as 16 lowercase hex digits.
+
+        :rtype: str
+        """
+        return self._digest().hexdigest()
+
+    @staticmethod
+    def generalize_many(
+        statements: Iterable[str],
+        workers: int = 1,
+        chunksize: int = 256,
+        executor: str = "process",
+    ) -> Iterator[str]:
+        """Generalise *statements*, yielding the results in input order.
+
+        Meant for log pipelines: no :class:`~sql_metadata.parser.Parser`
+        is built per statement, and the compiled tokenizer patterns and
+        sqlglot dialects are shared by all of them.  Input is consumed
+        lazily, one chunk at a time, optionally in a process pool (see
+        :func:`~sql_metadata.batch.map_chunks`)::
+
+            with open("queries.log") as log:
+                for generalized in Generalizator.generalize_many(log, workers=8):
+                    ...
+
+        :param statements: Any iterable of SQL strings.
+        :type statements: Iterable[str]
+        :param workers: Number of worker processes; ``1`` generalises in
+            the calling process.
+        :type workers: int
+        :param chunksize: Statements sent to a worker per task.
+        :type chunksize: int
+        :param executor: ``"process"`` or ``"thread"`` pool, see
+            :data:`~sql_metadata.batch.EXECUTORS`.
+        :type executor: str
+        :rtype: Iterator[str]
+        :raises ValueError: If a size is not positive or the executor
+            unknown.
+        """
+        from sql_metadata.batch import map_chunks
+
+        return map_chunks(
+            _generalize_chunk, statements, workers, chunksize, True, executor
+        )
+
+    def _digest(self) -> "hashlib.blake2b":
+        digest = hashlib.blake2b(digest_size=FINGERPRINT_SIZE)
+        for part in self._generalized_parts():
+            digest.update(part.encode("utf-8", "surrogatepass"))
+        return digest
+
+    def _generalized_parts(self) -> Iterable[str]:
+        if self._raw_query == "":
+            return ()
+        try:
+            return _Renderer(self._raw_query).parts()
+        except _Unsupported:
+            return (self._generalize_cascade(),)
+
+    def _generalize_cascade(self) -> str:
+        """Generalise the query with the original substitution cascade.
+
         Applies the following transformations in order:
 
         1. Strip comments.
@@ -93,12 +516,9 @@ class Generalizator:
         8. Replace numbers with ``N``.
         9. Collapse ``IN (...)`` / ``VALUES (...)`` lists to ``(XYZ)``.
 
-        :returns: Generalised SQL string, or ``""`` for empty input.
+        :returns: Generalised SQL string.
         :rtype: str
         """
-        if self._raw_query == "":
-            return ""
-
         # MW comments
         # e.g. /* CategoryDataService::getMostVisited N.N.N.N */
         sql = self.without_comments
@@ -128,3 +548,8 @@ class Generalizator:
         )
 
         return sql.strip()
+
+
+def _generalize_chunk(start: int, statements: list[str]) -> list[str]:
+    """Generalise a chunk of statements (the unit of work of a worker)."""
+    return [Generalizator(sql).generalize for sql in statements]
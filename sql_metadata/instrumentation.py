@@ -0,0 +1,327 @@
+"""Time the stages of the parse pipeline.
+
+A slow query may spend its time cleaning the SQL, probing dialects, in
+the quality checks of a parse attempt, in one of the extractors or in
+the resolution of nested queries.  Each of these stages runs inside
+:func:`stage`, which does nothing unless someone is listening:
+
+* a :class:`Profile`, requested with ``Parser(sql, profile=True)``,
+  collects the breakdown for one query (and its nested sub-parsers)::
+
+      parser = Parser(sql, profile=True)
+      parser.columns
+      parser.profile.stages["extract_columns"]
+      # StageStats(calls=1, wall=0.00041, cpu=0.00040)
+      parser.profile.dialect_attempts, parser.profile.dialect
+      # (2, 'mysql')
+
+* observers registered with :func:`add_observer` receive a
+  :class:`StageEvent` for every stage of every query in the process,
+  and a ``failure`` event for every exception leaving a public
+  :class:`~sql_metadata.parser.Parser` property (see
+  :func:`entry_point`).
+
+Stages nest — ``parse`` contains ``clean``, ``detect_dialects`` and the
+``parse_attempt`` stages, which contain ``quality_check`` — so their
+durations overlap.  The stages are listed in :data:`STAGES`.
+
+When there is neither a profile nor an observer, :func:`stage` returns a
+shared no-op context manager, so instrumentation costs a function call
+per stage.
+"""
+
+import functools
+import threading
+import time
+from collections.abc import Callable
+from contextvars import ContextVar
+from types import TracebackType
+from typing import Any, NamedTuple, TypeVar, cast
+
+#: Stage names, with the work each one times.
+STAGES = {
+    "parse": "building the AST, from the raw SQL or the parse cache",
+    "clean": "SqlCleaner.clean",
+    "detect_dialects": "DialectParser._detect_dialects",
+    "parse_attempt": "parsing with one candidate dialect",
+    "quality_check": "DialectParser._is_degraded on a non-last attempt",
+    "extract_query_type": "QueryTypeExtractor.extract on a parsed query",
+    "extract_tables": "TableExtractor.extract",
+    "extract_columns": "ColumnExtractor.extract",
+    "resolve_nested": "NestedResolver column resolution through CTEs/subqueries",
+    "sub_parser": "building a sub-parser for a CTE or subquery body",
+    "statement": "extracting the fields of one statement in parse_one",
+    "failure": "a public Parser property, up to the exception leaving it",
+}
+
+
+class StageEvent(NamedTuple):
+    """One finished stage, as passed to observers."""
+
+    #: Stage name, see :data:`STAGES`.
+    name: str
+    #: ``time.perf_counter_ns()`` when the stage started.
+    start_ns: int
+    #: Wall-clock duration in nanoseconds.
+    wall_ns: int
+    #: CPU time of the running thread in nanoseconds.
+    cpu_ns: int
+    #: Number of enclosing stages.
+    depth: int
+    #: Stage details, e.g. ``dialect`` and ``outcome`` of a parse attempt.
+    attributes: dict[str, Any]
+
+
+class StageStats(NamedTuple):
+    """Accumulated durations of one stage, in seconds."""
+
+    calls: int
+    wall: float
+    cpu: float
+
+
+class Profile:
+    """Per-query breakdown filled by the stages run for one parser.
+
+    Sub-parsers of CTE and subquery bodies share their parent's profile.
+    """
+
+    def __init__(self) -> None:
+        #: Stage name → accumulated durations, in order of first use.
+        self.stages: dict[str, StageStats] = {}
+        #: Number of dialects the query was parsed with.
+        self.dialect_attempts = 0
+        #: Name of the dialect that produced the AST.
+        self.dialect: str | None = None
+        #: Number of nodes of the AST.
+        self.ast_nodes = 0
+        #: Number of sub-parsers built for CTE and subquery bodies.
+        self.sub_parsers = 0
+
+    def record(self, event: StageEvent) -> None:
+        """Add *event* to the breakdown.
+
+        :param event: A finished stage.
+        :type event: StageEvent
+        """
+        calls, wall, cpu = self.stages.get(event.name, (0, 0.0, 0.0))
+        self.stages[event.name] = StageStats(
+            calls + 1, wall + event.wall_ns / 1e9, cpu + event.cpu_ns / 1e9
+        )
+        if event.name == "parse_attempt":
+            self.dialect_attempts += 1
+        elif event.name == "sub_parser":
+            self.sub_parsers += 1
+        elif event.name == "parse" and "dialect" in event.attributes:
+            self.dialect = event.attributes["dialect"]
+            self.ast_nodes = event.attributes["nodes"]
+
+    def __repr__(self) -> str:
+        stages = ", ".join(
+            f"{name}={stats.wall * 1e3:.3f}ms" for name, stats in self.stages.items()
+        )
+        return (
+            f"Profile({stages}; dialect={self.dialect!r}, "
+            f"attempts={self.dialect_attempts}, nodes={self.ast_nodes}, "
+            f"sub_parsers={self.sub_parsers})"
+        )
+
+
+Observer = Callable[[StageEvent], None]
+
+_observers: tuple[Observer, ...] = ()
+_observers_lock = threading.Lock()
+
+#: Profile of the parser whose stage is running in this context.
+_active: ContextVar[Profile | None] = ContextVar("_active", default=None)
+_depth: ContextVar[int] = ContextVar("_depth", default=0)
+#: Whether an :func:`entry_point` is running in this context.
+_entered: ContextVar[bool] = ContextVar("_entered", default=False)
+
+F = TypeVar("F", bound=Callable[..., Any])
+
+
+def add_observer(observer: Observer) -> None:
+    """Call *observer* with a :class:`StageEvent` after every stage.
+
+    Observers run in the thread that ran the stage and must not raise.
+
+    :param observer: Callback taking a :class:`StageEvent`.
+    :type observer: Callable[[StageEvent], None]
+    """
+    global _observers
+    with _observers_lock:
+        _observers = (*_observers, observer)
+
+
+def remove_observer(observer: Observer) -> None:
+    """Stop calling *observer*.
+
+    :param observer: A callback passed to :func:`add_observer`.
+    :type observer: Callable[[StageEvent], None]
+    :raises ValueError: If *observer* is not registered.
+    """
+    global _observers
+    with _observers_lock:
+        observers = list(_observers)
+        observers.remove(observer)
+        _observers = tuple(observers)
+
+
+class _NullStage:
+    """Stand-in for :class:`_Stage` when nothing is listening."""
+
+    __slots__ = ()
+
+    def __bool__(self) -> bool:
+        return False
+
+    def __enter__(self) -> "_NullStage":
+        return self
+
+    def __exit__(self, *exc_info: object) -> None:
+        return None
+
+    def set(self, key: str, value: Any) -> None:
+        """Ignore a stage attribute."""
+
+
+_NULL_STAGE = _NullStage()
+
+
+class _Stage:
+    """Time one stage and report it to the profile and the observers."""
+
+    __slots__ = (
+        "_name",
+        "_profile",
+        "_attributes",
+        "_start",
+        "_cpu",
+        "_active_token",
+        "_depth_token",
+    )
+
+    def __init__(self, name: str, profile: Profile | None) -> None:
+        self._name = name
+        self._profile = profile
+        self._attributes: dict[str, Any] = {}
+
+    def __bool__(self) -> bool:
+        return True
+
+    def set(self, key: str, value: Any) -> None:
+        """Attach *value* to the event of this stage.
+
+        :param key: Attribute name.
+        :type key: str
+        :param value: Attribute value.
+        :type value: Any
+        """
+        self._attributes[key] = value
+
+    def __enter__(self) -> "_Stage":
+        self._active_token = _active.set(self._profile)
+        self._depth_token = _depth.set(_depth.get() + 1)
+        self._cpu = time.thread_time_ns()
+        self._start = time.perf_counter_ns()
+        return self
+
+    def __exit__(
+        self,
+        exc_type: type[BaseException] | None,
+        exc: BaseException | None,
+        traceback: TracebackType | None,
+    ) -> None:
+        wall = time.perf_counter_ns() - self._start
+        cpu = time.thread_time_ns() - self._cpu
+        _depth.reset(self._depth_token)
+        _active.reset(self._active_token)
+        if exc_type is not None:
+            self._attributes.setdefault("error", exc_type.__name__)
+            self._attributes.setdefault("message", str(exc))
+        event = StageEvent(
+            self._name, self._start, wall, cpu, _depth.get(), self._attributes
+        )
+        if self._profile is not None:
+            self._profile.record(event)
+        for observer in _observers:
+            observer(event)
+
+
+def stage(name: str, profile: Profile | None = None) -> _Stage | _NullStage:
+    """Return a context manager timing the stage *name*.
+
+    The stage is reported to *profile* — by default the profile of the
+    enclosing stage — and to the registered observers.  Use the returned
+    object's ``set(key, value)`` to attach details to the event; it is
+    falsy when nothing is listening.
+
+    :param name: Stage name, see :data:`STAGES`.
+    :type name: str
+    :param profile: Profile of the parser running the stage.
+    :type profile: Profile | None
+    :rtype: _Stage | _NullStage
+    """
+    if profile is None:
+        profile = _active.get()
+    if profile is None and not _observers:
+        return _NULL_STAGE
+    return _Stage(name, profile)
+
+
+def entry_point(function: F) -> F:
+    """Report the exceptions leaving the public API function *function*.
+
+    An exception raised out of the outermost entry point of a call is
+    reported to the observers as a ``failure`` event with ``error`` and
+    ``message`` attributes, timed from the call.  Entry points called by
+    another one report nothing, as the outer one may handle their
+    exceptions — as :attr:`Parser.columns
+    <sql_metadata.parser.Parser.columns>` does for malformed SQL, or
+    :func:`~sql_metadata.batch.parse_one`, which reports the exceptions
+    of a statement on its ``statement`` stage instead.
+
+    :param function: A public property getter or function.
+    :rtype: Callable
+    """
+
+    @functools.wraps(function)
+    def wrapper(*args: Any, **kwargs: Any) -> Any:
+        if not _observers or _entered.get():
+            return function(*args, **kwargs)
+        token = _entered.set(True)
+        cpu = time.thread_time_ns()
+        start = time.perf_counter_ns()
+        try:
+            return function(*args, **kwargs)
+        except Exception as exc:
+            event = StageEvent(
+                "failure",
+                start,
+                time.perf_counter_ns() - start,
+                time.thread_time_ns() - cpu,
+                _depth.get(),
+                {"error": type(exc).__name__, "message": str(exc)},
+            )
+            for observer in _observers:
+                observer(event)
+            raise
+        finally:
+            _entered.reset(token)
+
+    return cast(F, wrapper)
+
+
+def dialect_name(dialect: Any) -> str:
+    """Return a printable name for a sqlglot dialect identifier.
+
+    :param dialect: ``None`` (default dialect), a name or a dialect class.
+    :type dialect: Any
+    :rtype: str
+    """
+    if dialect is None:
+        return "default"
+    if isinstance(dialect, str):
+        return dialect
+    return getattr(dialect, "__name__", type(dialect).__name__)
@@ -0,0 +1,351 @@
+"""Cache extracted metadata across queries that differ only in literals.
+
+Tables, columns, aliases, CTE names and the query type of
+``SELECT ... WHERE id = 5`` are the same as those of
+``SELECT ... WHERE id = 7``.  :class:`MetadataCache` keys the extracted
+metadata on a literal-insensitive token key (see :func:`literal_key`) so
+that a literal-only variant of an already seen query gets a
+:class:`~sql_metadata.parser.Parser` pre-seeded with those fields.  The
+literal-dependent properties — ``values``, ``values_dict``,
+``limit_and_offset``, ``output_columns`` and the rendered
+``with_queries`` / ``subqueries`` bodies — are still extracted from the
+query itself, lazily, when first accessed::
+
+    from sql_metadata import Parser
+
+    Parser.cached("SELECT a FROM t WHERE id = 5").columns  # parsed
+    parser = Parser.cached("SELECT a FROM t WHERE id = 7")
+    parser.columns           # from the cache
+    parser.limit_and_offset  # extracted from this query
+
+Unlike :class:`~sql_metadata.generalizator.Generalizator`, the key is
+built from sqlglot tokens, so digits inside identifiers (``table_2``) and
+the number of items in ``IN (...)`` / ``VALUES (...)`` lists are kept.
+"""
+
+import threading
+from collections import OrderedDict
+from typing import TYPE_CHECKING, Any, NamedTuple
+
+from sqlglot.errors import TokenError
+from sqlglot.tokens import Token, TokenType
+
+from sql_metadata.comments import _tokenizer_dialect
+from sql_metadata.keywords_lists import QueryType
+from sql_metadata.parse_cache import CacheStats
+from sql_metadata.token_stream import TokenStream
+from sql_metadata.utils import UniqueList
+
+if TYPE_CHECKING:
+    from sql_metadata.parser import Parser
+
+#: Token types whose text is a literal value and is left out of the key.
+LITERAL_TOKENS = frozenset(
+    {
+        TokenType.STRING,
+        TokenType.NUMBER,
+        TokenType.BIT_STRING,
+        TokenType.HEX_STRING,
+        TokenType.BYTE_STRING,
+        TokenType.NATIONAL_STRING,
+        TokenType.RAW_STRING,
+        TokenType.HEREDOC_STRING,
+        TokenType.UNICODE_STRING,
+    }
+)
+
+#: Token types after which a literal is a value: a projection, an
+#: operand, an item of an ``IN`` list or ``VALUES`` row, a ``LIMIT`` or
+#: ``OFFSET``.
+VALUE_CONTEXT = frozenset(
+    {
+        TokenType.SELECT,
+        TokenType.DISTINCT,
+        TokenType.WHERE,
+        TokenType.HAVING,
+        TokenType.ON,
+        TokenType.EQ,
+        TokenType.NEQ,
+        TokenType.NULLSAFE_EQ,
+        TokenType.LT,
+        TokenType.LTE,
+        TokenType.GT,
+        TokenType.GTE,
+        TokenType.PLUS,
+        TokenType.DASH,
+        TokenType.STAR,
+        TokenType.SLASH,
+        TokenType.MOD,
+        TokenType.DPIPE,
+        TokenType.COMMA,
+        TokenType.L_PAREN,
+        TokenType.LIKE,
+        TokenType.ILIKE,
+        TokenType.BETWEEN,
+        TokenType.AND,
+        TokenType.OR,
+        TokenType.NOT,
+        TokenType.IS,
+        TokenType.CASE,
+        TokenType.WHEN,
+        TokenType.THEN,
+        TokenType.ELSE,
+        TokenType.LIMIT,
+        TokenType.OFFSET,
+    }
+)
+
+#: Keywords opening a clause that names tables, where a literal may be
+#: a (quoted) table name.
+TABLE_CLAUSES = frozenset(
+    {
+        TokenType.FROM,
+        TokenType.JOIN,
+        TokenType.INTO,
+        TokenType.UPDATE,
+        TokenType.TABLE,
+    }
+)
+
+#: Keywords closing such a clause.
+EXPRESSION_CLAUSES = frozenset(
+    {
+        TokenType.SELECT,
+        TokenType.WHERE,
+        TokenType.ON,
+        TokenType.USING,
+        TokenType.SET,
+        TokenType.VALUES,
+        TokenType.GROUP_BY,
+        TokenType.HAVING,
+        TokenType.ORDER_BY,
+        TokenType.LIMIT,
+    }
+)
+
+#: Default number of entries kept by :class:`MetadataCache`.
+DEFAULT_MAX_ENTRIES = 4096
+
+LiteralKey = tuple[tuple[TokenType, str | None], ...]
+
+
+def literal_key(sql: str, stream: TokenStream | None = None) -> LiteralKey | None:
+    """Return a key of *sql* that ignores literal values and comments.
+
+    Each token contributes its type and text, except literals in a value
+    position (see :data:`VALUE_CONTEXT`), which contribute their type
+    only.  Other literals keep their text: the default tokenizer reads
+    ``2023_sales`` as a number followed by a name, and a quoted string
+    after ``FROM`` may be a table name.
+
+    Example SQL::
+
+        SELECT a FROM t WHERE id = 5  -- same key as ``id = 7``
+
+    :param sql: Raw SQL string.
+    :type sql: str
+    :param stream: Token stream of *sql* to reuse, if any.
+    :type stream: TokenStream | None
+    :returns: The key, or ``None`` when *sql* cannot be tokenized.
+    :rtype: LiteralKey | None
+    """
+    try:
+        tokens = TokenStream.of(sql, stream).tokenize(_tokenizer_dialect(sql))
+    except TokenError:
+        return None
+    key = []
+    in_tables = False
+    previous = None
+    for position, tok in enumerate(tokens):
+        if tok.token_type in TABLE_CLAUSES:
+            in_tables = True
+        elif tok.token_type in EXPRESSION_CLAUSES:
+            in_tables = False
+        value = not in_tables and _is_value(tokens, position, previous)
+        key.append((tok.token_type, None if value else tok.text))
+        previous = tok.token_type
+    return tuple(key)
+
+
+def _is_value(tokens: list[Token], position: int, previous: TokenType | None) -> bool:
+    """Tell whether the token at *position* is a literal in a value position."""
+    tok = tokens[position]
+    if tok.token_type not in LITERAL_TOKENS or previous not in VALUE_CONTEXT:
+        return False
+    following = tokens[position + 1] if position + 1 < len(tokens) else None
+    # a number glued to a name is the start of an identifier, e.g. 2023_sales
+    return not (
+        following is not None
+        and following.start == tok.end + 1
+        and following.token_type in (TokenType.VAR, TokenType.NUMBER)
+    )
+
+
+def _copy_values(mapping: dict[str, Any]) -> dict[str, Any]:
+    """Copy *mapping*, copying list values so callers cannot alias them."""
+    return {
+        key: type(value)(value) if isinstance(value, list) else value
+        for key, value in mapping.items()
+    }
+
+
+class MetadataSnapshot(NamedTuple):
+    """Literal-independent metadata extracted from one query."""
+
+    query_type: QueryType | None
+    tables: UniqueList
+    tables_aliases: dict[str, str]
+    columns: UniqueList
+    columns_dict: dict[str, UniqueList]
+    columns_aliases: dict[str, str | list[str]]
+    columns_aliases_dict: dict[str, UniqueList]
+    columns_aliases_names: UniqueList
+    with_names: UniqueList
+    subqueries_names: UniqueList
+
+    @classmethod
+    def from_parser(cls, parser: "Parser") -> "MetadataSnapshot":
+        """Extract every literal-independent field from *parser*.
+
+        :param parser: Parser for the query to snapshot.
+        :type parser: Parser
+        :rtype: MetadataSnapshot
+        :raises ValueError: If the query cannot be parsed.
+        """
+        columns_dict = parser.columns_dict
+        return cls(
+            query_type=parser.query_type,
+            tables=UniqueList(parser.tables),
+            tables_aliases=dict(parser.tables_aliases),
+            columns=UniqueList(parser.columns),
+            columns_dict=_copy_values(columns_dict),
+            columns_aliases=_copy_values(parser.columns_aliases),
+            columns_aliases_dict=_copy_values(parser.columns_aliases_dict),
+            columns_aliases_names=UniqueList(parser.columns_aliases_names),
+            with_names=UniqueList(parser.with_names),
+            subqueries_names=UniqueList(parser.subqueries_names),
+        )
+
+    def seed(self, parser: "Parser") -> None:
+        """Pre-populate *parser*'s cached properties with copies of this snapshot.
+
+        :param parser: A fresh parser for a literal-only variant.
+        :type parser: Parser
+        """
+        parser._query_type = self.query_type
+        parser._tables = UniqueList(self.tables)
+        parser._table_aliases = dict(self.tables_aliases)
+        parser._columns_extracted = True
+        parser._columns = UniqueList(self.columns)
+        parser._columns_dict = _copy_values(self.columns_dict)
+        parser._columns_dict_resolved = True
+        parser._columns_aliases = _copy_values(self.columns_aliases)
+        parser._columns_aliases_dict = _copy_values(self.columns_aliases_dict)
+        parser._columns_aliases_names = UniqueList(self.columns_aliases_names)
+        # output columns render unaliased expressions, literals included
+        parser._output_columns = None
+        parser._with_names = UniqueList(self.with_names)
+        parser._subqueries_names = UniqueList(self.subqueries_names)
+
+
+class MetadataCache:
+    """Thread-safe LRU cache of :class:`MetadataSnapshot` by :func:`literal_key`.
+
+    :param max_entries: Maximum number of cached query shapes.
+    :type max_entries: int
+    """
+
+    def __init__(self, max_entries: int = DEFAULT_MAX_ENTRIES) -> None:
+        if max_entries < 1:
+            raise ValueError("Cache limits must be positive")
+        self.max_entries = max_entries
+        self._entries: OrderedDict[LiteralKey, MetadataSnapshot] = OrderedDict()
+        self._lock = threading.Lock()
+        self._hits = 0
+        self._misses = 0
+        self._evictions = 0
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def parser(self, sql: str) -> "Parser":
+        """Return a :class:`Parser` for *sql*, reusing cached metadata.
+
+        On a miss the query is looked up in the disk cache, if one is
+        enabled (see :func:`~sql_metadata.disk_cache.enable_disk_cache`),
+        and otherwise fully extracted up front and its snapshot stored;
+        queries that fail to parse are not cached and the returned parser
+        raises as usual when the failing property is accessed.
+
+        :param sql: Raw SQL string.
+        :type sql: str
+        :rtype: Parser
+        """
+        from sql_metadata.disk_cache import get_disk_cache
+        from sql_metadata.parser import Parser
+
+        parser = Parser(sql)
+        key = literal_key(sql, parser._stream)
+        if key is None:
+            return parser
+        with self._lock:
+            snapshot = self._entries.get(key)
+            if snapshot is not None:
+                self._entries.move_to_end(key)
+                self._hits += 1
+            else:
+                self._misses += 1
+        if snapshot is not None:
+            snapshot.seed(parser)
+            return parser
+        disk = get_disk_cache()
+        snapshot = disk.get(sql) if disk is not None else None
+        if snapshot is not None:
+            snapshot.seed(parser)
+        else:
+            try:
+                snapshot = MetadataSnapshot.from_parser(parser)
+            except Exception:  # the lazy parser raises it again on access
+                return parser
+            if disk is not None:
+                disk.put(sql, snapshot)
+        self._store(key, snapshot)
+        return parser
+
+    def _store(self, key: LiteralKey, snapshot: MetadataSnapshot) -> None:
+        """Insert *snapshot* under *key*, evicting the oldest entries."""
+        with self._lock:
+            self._entries[key] = snapshot
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self._evictions += 1
+
+    def clear(self) -> None:
+        """Drop all entries and reset the counters."""
+        with self._lock:
+            self._entries.clear()
+            self._hits = self._misses = self._evictions = 0
+
+    def stats(self) -> CacheStats:
+        """Return a snapshot of the cache counters.
+
+        ``size`` is always ``0`` — the cache is bounded by entry count only.
+
+        :rtype: CacheStats
+        """
+        with self._lock:
+            return CacheStats(
+                self._hits, self._misses, self._evictions, len(self._entries), 0
+            )
+
+
+_metadata_cache = MetadataCache()
+
+
+def get_metadata_cache() -> MetadataCache:
+    """Return the process-wide cache used by :meth:`Parser.cached`.
+
+    :rtype: MetadataCache
+    """
+    return _metadata_cache
@@ -0,0 +1,466 @@
+"""Prometheus metrics for the parser and its caches.
+
+:class:`MetricsRegistry` observes the stages reported by
+:mod:`~sql_metadata.instrumentation` and counts parses, failures (the
+exceptions raised out of a ``Parser`` property or reported by
+``parse_one``, by exception type and message class, see
+:func:`failure_reason`), the
+dialect attempts of :meth:`DialectParser._try_dialects
+<sql_metadata.dialect_parser.DialectParser._try_dialects>` — wins,
+attempts rejected in favour of the next dialect and results rejected as
+degraded — and the cache hits and misses, with a latency histogram per
+stage.
+:meth:`MetricsRegistry.render` returns the OpenMetrics text format, so a
+service can expose it without a Prometheus client library::
+
+    from sql_metadata.metrics import CONTENT_TYPE, enable_metrics
+
+    registry = enable_metrics()
+
+    def metrics_view(request):
+        return Response(registry.render(), content_type=CONTENT_TYPE)
+
+Updates take a lock, so any number of threads can parse at once.  When
+several processes parse — a pre-forking server, ``parse_many`` workers —
+pass a *directory*: each process writes its counters to ``<pid>.json``
+there at most every *flush_interval* seconds (and after every
+``parse_many`` chunk), and :meth:`~MetricsRegistry.render` adds up the
+files of all processes.  Forked children start counting from zero.  The
+files of exited processes are kept so their counts are not lost; start
+each deployment with an empty directory.
+"""
+
+import atexit
+import json
+import os
+import sqlite3
+import threading
+import time
+import weakref
+from bisect import bisect_left
+from typing import Any, NamedTuple
+
+from sql_metadata.disk_cache import DiskCache, get_disk_cache
+from sql_metadata.instrumentation import StageEvent, add_observer, remove_observer
+from sql_metadata.metadata_cache import MetadataCache, get_metadata_cache
+from sql_metadata.parse_cache import ParseCache, get_parse_cache
+
+#: HTTP ``Content-Type`` of :meth:`MetricsRegistry.render`.
+CONTENT_TYPE = "application/openmetrics-text; version=1.0.0; charset=utf-8"
+
+#: Upper bounds, in seconds, of the stage duration histogram buckets.
+BUCKETS = (
+    0.0001,
+    0.00025,
+    0.0005,
+    0.001,
+    0.0025,
+    0.005,
+    0.01,
+    0.025,
+    0.05,
+    0.1,
+    0.25,
+    0.5,
+    1.0,
+    2.5,
+)
+
+#: Metric families rendered by :meth:`MetricsRegistry.render`: name →
+#: (type, help).
+FAMILIES = {
+    "sql_metadata_parses": (
+        "counter",
+        "SQL strings parsed into an AST, including failed parses",
+    ),
+    "sql_metadata_failures": (
+        "counter",
+        "Exceptions escaping a parser call, by type and message class",
+    ),
+    "sql_metadata_dialect_wins": (
+        "counter",
+        "Parse attempts accepted, by dialect",
+    ),
+    "sql_metadata_dialect_fallbacks": (
+        "counter",
+        "Parse attempts rejected, by dialect and outcome",
+    ),
+    "sql_metadata_degraded_results": (
+        "counter",
+        "Parse attempts rejected by the quality check, by dialect",
+    ),
+    "sql_metadata_cache_hits": ("counter", "Cache lookups answered, by cache"),
+    "sql_metadata_cache_misses": ("counter", "Cache lookups not answered, by cache"),
+    "sql_metadata_cache_evictions": ("counter", "Cache entries evicted, by cache"),
+    "sql_metadata_stage_duration_seconds": (
+        "histogram",
+        "Wall-clock time of the pipeline stages",
+    ),
+}
+
+#: Message fragment → failure class, checked in order.
+_REASONS = (
+    ("could not be parsed", "syntax_error"),
+    ("could not parse", "syntax_error"),
+    ("not supported query type", "unsupported_query_type"),
+    ("empty queries", "empty_query"),
+    ("without a main statement", "incomplete_with"),
+    ("malformed with clause", "malformed_with"),
+    ("require an alias", "cte_without_alias"),
+)
+
+_CACHE_COUNTERS = (
+    "sql_metadata_cache_hits",
+    "sql_metadata_cache_misses",
+    "sql_metadata_cache_evictions",
+)
+
+Labels = tuple[tuple[str, str], ...]
+
+
+class MetricsSnapshot(NamedTuple):
+    """Metric values of one process, or of several added up."""
+
+    #: (family, labels) → value.
+    counters: dict[tuple[str, Labels], int]
+    #: Stage → observations per bucket, the last one above every bound.
+    buckets: dict[str, list[int]]
+    #: Stage → total seconds observed.
+    sums: dict[str, float]
+
+
+def failure_reason(message: str) -> str:
+    """Return the class of an :class:`InvalidQueryDefinition` message.
+
+    :param message: Exception message.
+    :type message: str
+    :returns: E.g. ``"syntax_error"``, ``"other"`` for unknown messages.
+    :rtype: str
+    """
+    message = message.lower()
+    for fragment, reason in _REASONS:
+        if fragment in message:
+            return reason
+    return "other"
+
+
+def _cache_counters() -> dict[str, tuple[int, int, int]]:
+    """Return (hits, misses, evictions) of every enabled cache."""
+    caches: dict[str, ParseCache | MetadataCache | DiskCache | None] = {
+        "parse": get_parse_cache(),
+        "metadata": get_metadata_cache(),
+        "disk": get_disk_cache(),
+    }
+    counters = {}
+    for name, cache in caches.items():
+        if cache is None:
+            continue
+        try:
+            hits, misses, evictions, _, _ = cache.stats()
+        except sqlite3.Error:
+            continue
+        counters[name] = (hits, misses, evictions)
+    return counters
+
+
+def _merge(into: MetricsSnapshot, other: MetricsSnapshot) -> None:
+    """Add the values of *other* to *into*."""
+    for key, value in other.counters.items():
+        into.counters[key] = into.counters.get(key, 0) + value
+    for name, counts in other.buckets.items():
+        total = into.buckets.setdefault(name, [0] * (len(BUCKETS) + 1))
+        into.buckets[name] = [a + b for a, b in zip(total, counts)]
+        into.sums[name] = into.sums.get(name, 0.0) + other.sums[name]
+
+
+def _dump(snapshot: MetricsSnapshot) -> str:
+    counters = [
+        [name, labels, value] for (name, labels), value in snapshot.counters.items()
+    ]
+    return json.dumps(
+        {"counters": counters, "buckets": snapshot.buckets, "sums": snapshot.sums}
+    )
+
+
+def _load(text: str) -> MetricsSnapshot:
+    data: dict[str, Any] = json.loads(text)
+    counters = {
+        (name, tuple((key, value) for key, value in labels)): count
+        for name, labels, count in data["counters"]
+    }
+    return MetricsSnapshot(counters, data["buckets"], data["sums"])
+
+
+class MetricsRegistry:
+    """Observer aggregating the stage events of this process.
+
+    Register it with :func:`~sql_metadata.instrumentation.add_observer`,
+    or use :func:`enable_metrics`.
+
+    :param directory: Directory shared by the processes reporting to one
+        endpoint, ``None`` for this process only.
+    :type directory: str | os.PathLike[str] | None
+    :param flush_interval: Minimum seconds between two writes of this
+        process's file.
+    :type flush_interval: float
+    """
+
+    def __init__(
+        self,
+        directory: str | os.PathLike[str] | None = None,
+        flush_interval: float = 1.0,
+    ) -> None:
+        self.directory = os.fspath(directory) if directory is not None else None
+        self.flush_interval = flush_interval
+        if self.directory is not None:
+            os.makedirs(self.directory, exist_ok=True)
+        self._start({})
+        _registries.add(self)
+
+    def _start(self, cache_base: dict[str, tuple[int, int, int]]) -> None:
+        """Start counting from zero, e.g. in a forked child."""
+        self._lock = threading.Lock()
+        self._pid = os.getpid()
+        self._flushed = time.monotonic()
+        self._counters: dict[tuple[str, Labels], int] = {("sql_metadata_parses", ()): 0}
+        self._buckets: dict[str, list[int]] = {}
+        self._sums: dict[str, float] = {}
+        # cache counters inherited through fork belong to the parent
+        self._cache_base = cache_base
+
+    def __call__(self, event: StageEvent) -> None:
+        seconds = event.wall_ns / 1e9
+        with self._lock:
+            buckets = self._buckets.get(event.name)
+            if buckets is None:
+                buckets = self._buckets[event.name] = [0] * (len(BUCKETS) + 1)
+            buckets[bisect_left(BUCKETS, seconds)] += 1
+            self._sums[event.name] = self._sums.get(event.name, 0.0) + seconds
+            self._count(event)
+        if (
+            self.directory is not None
+            and event.depth == 0
+            and time.monotonic() - self._flushed >= self.flush_interval
+        ):
+            self.flush()
+
+    def _count(self, event: StageEvent) -> None:
+        """Update the counters derived from *event*; the lock is held."""
+        attributes = event.attributes
+        if event.name == "parse":
+            self._inc("sql_metadata_parses")
+        elif event.name == "parse_attempt" and "error" not in attributes:
+            dialect = attributes["dialect"]
+            outcome = attributes["outcome"]
+            if outcome == "accepted":
+                self._inc("sql_metadata_dialect_wins", dialect=dialect)
+            else:
+                self._inc(
+                    "sql_metadata_dialect_fallbacks", dialect=dialect, outcome=outcome
+                )
+            if outcome == "degraded":
+                self._inc("sql_metadata_degraded_results", dialect=dialect)
+        elif event.name in ("failure", "statement") and "error" in attributes:
+            # counted where the caller gets it: raised out of a Parser
+            # property, or recorded in the result of parse_one
+            self._inc(
+                "sql_metadata_failures",
+                error=attributes["error"],
+                reason=failure_reason(attributes.get("message", "")),
+            )
+
+    def _inc(self, family: str, **labels: str) -> None:
+        key = (family, tuple(sorted(labels.items())))
+        self._counters[key] = self._counters.get(key, 0) + 1
+
+    def snapshot(self) -> MetricsSnapshot:
+        """Return the values counted by this process.
+
+        :rtype: MetricsSnapshot
+        """
+        with self._lock:
+            snapshot = MetricsSnapshot(
+                dict(self._counters),
+                {name: list(counts) for name, counts in self._buckets.items()},
+                dict(self._sums),
+            )
+        for cache, values in _cache_counters().items():
+            base = self._cache_base.get(cache, (0, 0, 0))
+            for family, value, start in zip(_CACHE_COUNTERS, values, base):
+                # a cache cleared or replaced since the fork restarts at zero
+                count = value - start if value >= start else value
+                snapshot.counters[(family, (("cache", cache),))] = count
+        return snapshot
+
+    def flush(self) -> None:
+        """Write this process's values to ``<directory>/<pid>.json``.
+
+        Does nothing without a directory.
+        """
+        if self.directory is None:
+            return
+        self._flushed = time.monotonic()
+        path = os.path.join(self.directory, f"{self._pid}.json")
+        temporary = f"{path}.{threading.get_ident()}.tmp"
+        with open(temporary, "w", encoding="utf-8") as output:
+            output.write(_dump(self.snapshot()))
+        os.replace(temporary, path)
+
+    def collect(self) -> MetricsSnapshot:
+        """Return the values of this process plus those of the directory.
+
+        :rtype: MetricsSnapshot
+        """
+        total = self.snapshot()
+        if self.directory is None:
+            return total
+        own = f"{self._pid}.json"
+        for name in sorted(os.listdir(self.directory)):
+            if not name.endswith(".json") or name == own:
+                continue
+            try:
+                with open(os.path.join(self.directory, name), encoding="utf-8") as part:
+                    other = _load(part.read())
+            except (OSError, ValueError):
+                continue  # removed meanwhile, or not a metrics file
+            _merge(total, other)
+        return total
+
+    def render(self) -> str:
+        """Return all the metrics in the OpenMetrics text format.
+
+        :rtype: str
+        """
+        snapshot = self.collect()
+        lines = []
+        for family, (kind, description) in FAMILIES.items():
+            lines.append(f"# TYPE {family} {kind}")
+            if kind == "histogram":
+                lines.append(f"# UNIT {family} seconds")
+            lines.append(f"# HELP {family} {description}.")
+            if kind == "histogram":
+                lines.extend(_histogram_lines(family, snapshot))
+            else:
+                lines.extend(_counter_lines(family, snapshot))
+        lines.append("# EOF")
+        return "\n".join(lines) + "\n"
+
+
+def _label_text(labels: Labels) -> str:
+    if not labels:
+        return ""
+    pairs = ",".join(f'{key}="{_escape(value)}"' for key, value in labels)
+    return "{" + pairs + "}"
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _counter_lines(family: str, snapshot: MetricsSnapshot) -> list[str]:
+    return [
+        f"{family}_total{_label_text(labels)} {value}"
+        for (name, labels), value in sorted(snapshot.counters.items())
+        if name == family
+    ]
+
+
+def _histogram_lines(family: str, snapshot: MetricsSnapshot) -> list[str]:
+    lines = []
+    for name in sorted(snapshot.buckets):
+        counts = snapshot.buckets[name]
+        label = f'stage="{_escape(name)}"'
+        cumulative = 0
+        for bound, count in zip((*BUCKETS, "+Inf"), counts):
+            cumulative += count
+            lines.append(f'{family}_bucket{{{label},le="{bound}"}} {cumulative}')
+        lines.append(f"{family}_count{{{label}}} {cumulative}")
+        lines.append(f"{family}_sum{{{label}}} {snapshot.sums[name]!r}")
+    return lines
+
+
+# ---------------------------------------------------------------------------
+# Process-wide instance
+# ---------------------------------------------------------------------------
+
+_registries: "weakref.WeakSet[MetricsRegistry]" = weakref.WeakSet()
+_registry: MetricsRegistry | None = None
+
+
+def enable_metrics(
+    directory: str | os.PathLike[str] | None = None, flush_interval: float = 1.0
+) -> MetricsRegistry:
+    """Install a process-wide :class:`MetricsRegistry`, replacing any other.
+
+    :param directory: Directory shared by the processes reporting to one
+        endpoint, ``None`` for this process only.
+    :type directory: str | os.PathLike[str] | None
+    :param flush_interval: Minimum seconds between two writes of this
+        process's file.
+    :type flush_interval: float
+    :rtype: MetricsRegistry
+    """
+    global _registry
+    disable_metrics()
+    _registry = MetricsRegistry(directory, flush_interval)
+    add_observer(_registry)
+    return _registry
+
+
+def disable_metrics() -> None:
+    """Stop counting; this process's file, if any, is written one last time."""
+    global _registry
+    registry, _registry = _registry, None
+    if registry is not None:
+        remove_observer(registry)
+        registry.flush()
+
+
+def get_metrics() -> MetricsRegistry | None:
+    """Return the process-wide registry, or ``None`` when disabled.
+
+    :rtype: MetricsRegistry | None
+    """
+    return _registry
+
+
+def metrics_directory() -> str | None:
+    """Return the directory of the process-wide registry, if any.
+
+    :rtype: str | None
+    """
+    return _registry.directory if _registry is not None else None
+
+
+def record_metrics(directory: str) -> None:
+    """Report to *directory* unless this process already counts.
+
+    Called by ``parse_many`` workers, which may have been started
+    without the parent's registry.
+
+    :param directory: Directory of the parent's registry.
+    :type directory: str
+    """
+    if _registry is None:
+        enable_metrics(directory)
+
+
+def flush_metrics() -> None:
+    """Write the values of the process-wide registry to its directory."""
+    registry = _registry
+    if registry is not None:
+        registry.flush()
+
+
+def _reset_after_fork() -> None:
+    """Make every registry of a forked child start from zero."""
+    registries = list(_registries)
+    if not registries:
+        return
+    cache_base = _cache_counters()
+    for registry in registries:
+        registry._start(cache_base)
+
+
+os.register_at_fork(after_in_child=_reset_after_fork)
+atexit.register(flush_metrics)
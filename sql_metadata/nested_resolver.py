@@ -1,9 +1,10 @@
 """Nested column resolution and CTE/subquery body extraction.
 
 The :class:`NestedResolver` class owns the complete "look inside nested
-queries" concern: rendering CTE/subquery AST nodes back to SQL, parsing
-those bodies with sub-:class:`Parser` instances, and resolving
-``subquery.column`` references to actual columns.
+queries" concern: rendering CTE/subquery AST nodes back to SQL, analysing
+those bodies with sub-:class:`Parser` instances built from the already
+parsed AST subtrees, and resolving ``subquery.column`` references to
+actual columns.
 """
 
 from __future__ import annotations
@@ -18,6 +19,7 @@ from sqlglot import exp
 from sqlglot.errors import ErrorLevel
 from sqlglot.generator import Generator
 
+from sql_metadata.ast_index import ASTIndex
 from sql_metadata.utils import (
     UniqueList,
     last_segment,
@@ -168,37 +170,40 @@ class NestedResolver:
 
     1. **Body extraction** — render CTE/subquery AST nodes back to SQL
        via :class:`_PreservingGenerator`.
-    2. **Column resolution** — parse bodies with sub-Parsers and resolve
+    2. **Column resolution** — wrap body subtrees in sub-Parsers and resolve
        ``subquery.column`` references to actual columns.
     3. **Unqualified alias resolution** — detect column names that are actually
        aliases defined inside nested queries.
 
     :param ast: Root AST node (for body extraction).
     :param parser_factory: Callable that constructs a :class:`Parser` from
-        a SQL string. Injected to break the ``parser.py`` ↔ ``nested_resolver.py``
-        import cycle — ``parser.py`` already imports this module, so it passes
-        the ``Parser`` class itself at resolver-construction time.
+        a nested query's AST subtree.  Injected to break the ``parser.py`` ↔
+        ``nested_resolver.py`` import cycle — ``parser.py`` already imports
+        this module, so it passes a factory bound to its own dialect at
+        resolver-construction time.
+    :param index: Node index of *ast*; built on demand when not given.
     """
 
     def __init__(
         self,
         ast: exp.Expression,
-        parser_factory: Callable[[str], "Parser"],
+        parser_factory: Callable[[exp.Expression], "Parser"],
+        index: ASTIndex | None = None,
     ) -> None:
         self._ast = ast
         self._parser_factory = parser_factory
+        self._index = index
 
         # Lazy caches
         self._subqueries_parsers: dict[str, "Parser"] = {}
         self._with_parsers: dict[str, "Parser"] = {}
         self._columns_aliases: dict[str, str | list[str]] = {}
-        self._cached_cte_nodes: list[exp.CTE] | None = None
 
         # Set by resolve() caller
         self._subqueries_names: list[str] = []
-        self._subqueries: dict[str, str] = {}
+        self._subqueries: dict[str, exp.Expression] = {}
         self._with_names: list[str] = []
-        self._with_queries: dict[str, str] = {}
+        self._with_queries: dict[str, exp.Expression] = {}
 
     # -------------------------------------------------------------------
     # Public API — name extraction
@@ -224,6 +229,26 @@ class NestedResolver:
             cte_name_map.get(cte.alias, cte.alias) for cte in self._cte_nodes()
         ])
 
+    def extract_cte_nodes(
+        self,
+        cte_name_map: dict[str, str],
+    ) -> dict[str, exp.Expression]:
+        """Return the body AST node of each CTE, keyed by CTE name.
+
+        Unlike :meth:`extract_cte_bodies` nothing is rendered — the nodes
+        are handed to :meth:`resolve` so that sub-parsers can be built
+        straight from the already-parsed subtrees.
+
+        :param cte_name_map: Placeholder-to-original mapping, e.g.
+            ``{"db__DOT__cte": "db.cte"}``.  See :meth:`extract_cte_names`
+            for details.
+        :returns: Mapping of ``{cte_name: body_node}``.
+        """
+        return {
+            cte_name_map.get(cte.alias, cte.alias): cte.this
+            for cte in self._cte_nodes()
+        }
+
     def extract_cte_bodies(
         self,
         cte_name_map: dict[str, str],
@@ -236,36 +261,74 @@ class NestedResolver:
         :returns: Mapping of ``{cte_name: body_sql}``,
             e.g. ``{"db.cte": "SELECT id FROM t"}``.
         """
-        results: dict[str, str] = {}
-        for cte in self._cte_nodes():
-            alias = cte.alias
-            original_name = cte_name_map.get(alias, alias)
-            results[original_name] = self._body_sql(cte.this)
-
-        return results
+        return self.render_bodies(self.extract_cte_nodes(cte_name_map))
 
     @staticmethod
-    def extract_subqueries(
-        ast: exp.Expression,
-    ) -> tuple[UniqueList, dict[str, str]]:
-        """Extract subquery names and bodies in a single post-order walk.
+    def extract_subquery_nodes(
+        index: ASTIndex,
+    ) -> tuple[UniqueList, dict[str, exp.Expression]]:
+        """Extract subquery names and body nodes in post-order.
 
         Aliased subqueries keep their alias as the name.  Unaliased
         subqueries (e.g. ``WHERE id IN (SELECT …)``) get auto-generated
-        names ``subquery_1``, ``subquery_2``, etc.
+        names ``subquery_1``, ``subquery_2``, etc.  Bodies are returned as
+        the original ``exp.Expression`` nodes — use :meth:`render_bodies`
+        when the SQL text is needed.
 
         Example SQL::
 
             SELECT * FROM (SELECT id FROM t) AS sub
             WHERE id IN (SELECT id FROM t2)
 
-        :returns: ``(names, bodies)`` where *names* is ordered innermost-first,
+        :param index: Node index of the query's AST.
+        :returns: ``(names, nodes)`` where *names* is ordered innermost-first,
             e.g. ``(["subquery_1", "sub"], {...})``.
         """
         names = UniqueList()
-        bodies: dict[str, str] = {}
-        NestedResolver._walk_subqueries(ast, names, bodies, 0)
-        return names, bodies
+        nodes: dict[str, exp.Expression] = {}
+        counter = 0
+        for node in index.post_order(exp.Subquery):
+            if node.alias:
+                # e.g. (SELECT 1) AS named — use the explicit alias
+                name = node.alias
+            else:
+                # e.g. WHERE id IN (SELECT 1) — auto-generate name
+                counter += 1
+                name = f"subquery_{counter}"
+            names.append(name)
+            nodes[name] = node.this
+        return names, nodes
+
+    @staticmethod
+    def render_bodies(nodes: dict[str, exp.Expression]) -> dict[str, str]:
+        """Render each nested query body node back to SQL.
+
+        Used by :attr:`Parser.with_queries` and :attr:`Parser.subqueries`,
+        the only places where the body SQL text is actually needed.
+
+        :param nodes: Mapping of ``{name: body_node}``.
+        :returns: Mapping of ``{name: body_sql}``.
+        """
+        return {
+            name: NestedResolver.render_body(node) for name, node in nodes.items()
+        }
+
+    @staticmethod
+    def detach_subtree(node: exp.Expression) -> exp.Expression:
+        """Return a parent-less copy of *node* with identifier quoting removed.
+
+        The copy is what a sub-:class:`Parser` works on: detaching it keeps
+        ancestor lookups (e.g. ``find_ancestor(exp.Func)``) from escaping
+        the nested query, and unquoting identifiers yields the same names
+        the body would have after rendering via :meth:`render_body`.
+
+        :param node: Body node of a CTE or subquery.
+        :returns: Independent copy of the subtree.
+        """
+        body = node.copy()
+        for ident in body.find_all(exp.Identifier):
+            ident.set("quoted", False)
+        return body
 
     # -------------------------------------------------------------------
     # Public API — column resolution
@@ -274,15 +337,18 @@ class NestedResolver:
     def resolve(
         self,
         columns: "UniqueList",
-        columns_dict: dict[str, UniqueList],
         columns_aliases: dict[str, str | list[str]],
         subqueries_names: list[str],
-        subqueries: dict[str, str],
+        subqueries: dict[str, exp.Expression],
         with_names: list[str],
-        with_queries: dict[str, str],
-    ) -> tuple[UniqueList, dict[str, UniqueList], dict[str, str | list[str]]]:
+        with_queries: dict[str, exp.Expression],
+    ) -> tuple[UniqueList, dict[str, str | list[str]]]:
         """Resolve columns that reference subqueries or CTEs.
 
+        *subqueries* and *with_queries* map each nested query name to its
+        body AST node; sub-parsers are built from those subtrees on demand
+        (see :meth:`_subparser`), so no SQL is rendered or re-parsed.
+
         Two-phase resolution:
 
         1. Replace ``subquery.column`` references with the actual column
@@ -290,15 +356,14 @@ class NestedResolver:
         2. Drop unqualified column names that are actually aliases defined
            inside a nested query.
 
-        Also applies the resolution to *columns_dict*,
-        but there instead of dropping we also resolve unqualified aliases.
+        The nested queries are kept for :meth:`resolve_columns_dict`.
 
         Example SQL::
 
             WITH cte AS (SELECT a FROM t)
             SELECT cte.a FROM cte
 
-        :returns: Tuple of ``(columns, columns_dict, columns_aliases)``.
+        :returns: Tuple of ``(columns, columns_aliases)``.
         """
         self._subqueries_names = subqueries_names
         self._subqueries = subqueries
@@ -309,17 +374,32 @@ class NestedResolver:
         # For columns drop aliases as we need only actual columns
         columns = self._resolve_and_filter(columns, drop_unqualified_aliases=True)
 
-        if columns_dict:
-            # For columns_dict do not drop aliases but instead resolve them to columns.
-            # That ensures the column is present in all the relevant sections regardless
-            # if it's called directly or by alias i.e. SELECT a AS x FROM tbl ORDER BY x
-            # the column a should appear both in select and order_by sections.
-            for section, cols in list(columns_dict.items()):
-                columns_dict[section] = self._resolve_and_filter(
-                    cols, drop_unqualified_aliases=False
-                )
+        return columns, self._columns_aliases
+
+    def resolve_columns_dict(
+        self, columns_dict: dict[str, UniqueList]
+    ) -> dict[str, UniqueList]:
+        """Resolve *columns_dict* against the nested queries of :meth:`resolve`.
+
+        Lets :class:`Parser` defer the per-clause resolution until
+        ``columns_dict`` is accessed.  Unqualified aliases are resolved to
+        their columns rather than dropped from the clause lists.
+
+        Example SQL::
 
-        return columns, columns_dict, self._columns_aliases
+            SELECT sub.a FROM (SELECT a FROM t) AS sub ORDER BY sub.a
+
+        :returns: The resolved mapping of clause name to columns.
+        """
+        # For columns_dict do not drop aliases but instead resolve them to columns.
+        # That ensures the column is present in all the relevant sections regardless
+        # if it's called directly or by alias i.e. SELECT a AS x FROM tbl ORDER BY x
+        # the column a should appear both in select and order_by sections.
+        for section, cols in list(columns_dict.items()):
+            columns_dict[section] = self._resolve_and_filter(
+                cols, drop_unqualified_aliases=False
+            )
+        return columns_dict
 
     def resolve_column_alias(
         self, alias: str | list[str], columns_aliases: dict[str, str | list[str]]
@@ -431,7 +511,7 @@ class NestedResolver:
         self,
         col_name: str,
         names: list[str],
-        definitions: dict[str, str],
+        definitions: dict[str, exp.Expression],
         parser_cache: dict[str, "Parser"],
         check_columns: bool = False,
     ) -> list[str] | None:
@@ -465,10 +545,7 @@ class NestedResolver:
                -- "name" not in subquery → returns None
         """
         for nested_name in names:
-            nested_def = definitions[nested_name]
-            nested_parser = parser_cache.setdefault(
-                nested_name, self._parser_factory(nested_def)
-            )
+            nested_parser = self._subparser(nested_name, definitions, parser_cache)
             if col_name in nested_parser.columns_aliases_names:
                 # Path 1: alias match — resolve through the full alias chain
                 # e.g. SELECT col1 AS a ... then SELECT a AS x ...
@@ -494,7 +571,7 @@ class NestedResolver:
         self,
         subquery_alias: str,
         nested_queries_names: list[str],
-        nested_queries: dict[str, str],
+        nested_queries: dict[str, exp.Expression],
         already_parsed: dict[str, "Parser"],
     ) -> list[str]:
         """Resolve a ``prefix.column`` reference through a nested query.
@@ -514,10 +591,7 @@ class NestedResolver:
             # e.g. "table.col" or "schema.table.col" — not a subquery ref
             return [subquery_alias]
         sub_query, column_name = parts[0], parts[-1]
-        sub_query_definition = nested_queries[sub_query]
-        subparser = already_parsed.setdefault(
-            sub_query, self._parser_factory(sub_query_definition)
-        )
+        subparser = self._subparser(sub_query, nested_queries, already_parsed)
         return NestedResolver._resolve_column_in_subparser(
             column_name, subparser, subquery_alias
         )
@@ -634,9 +708,31 @@ class NestedResolver:
     # Shared helpers
     # -------------------------------------------------------------------
 
+    def _subparser(
+        self,
+        name: str,
+        definitions: dict[str, exp.Expression],
+        parser_cache: dict[str, "Parser"],
+    ) -> "Parser":
+        """Return the cached sub-:class:`Parser` for nested query *name*.
+
+        The sub-parser is built on first use from the body's AST subtree
+        via the injected factory, so the body is neither rendered back to
+        SQL nor cleaned and re-parsed.
+
+        Example SQL::
+
+            SELECT sub.id FROM (SELECT id FROM users) AS sub
+
+        ``_subparser("sub", ...)`` wraps the ``SELECT id FROM users`` node.
+        """
+        if name not in parser_cache:
+            parser_cache[name] = self._parser_factory(definitions[name])
+        return parser_cache[name]
+
     def _nested_sources(
         self,
-    ) -> list[tuple[list[str], dict[str, str], dict[str, "Parser"]]]:
+    ) -> list[tuple[list[str], dict[str, exp.Expression], dict[str, "Parser"]]]:
         """Return the (names, defs, cache) tuples for subqueries then CTEs.
 
         Subqueries are checked first because they are more specific than
@@ -650,7 +746,7 @@ class NestedResolver:
         ]
 
     def _cte_nodes(self) -> list[exp.CTE]:
-        """Return all ``exp.CTE`` nodes from the AST (cached).
+        """Return all ``exp.CTE`` nodes from the AST index.
 
         Example SQL::
 
@@ -658,16 +754,16 @@ class NestedResolver:
 
         Returns two ``exp.CTE`` nodes (for ``a`` and ``b``).
         """
-        if self._cached_cte_nodes is None:
-            self._cached_cte_nodes = list(self._ast.find_all(exp.CTE))
-        return self._cached_cte_nodes
+        if self._index is None:
+            self._index = ASTIndex(self._ast)
+        return self._index.find_all(exp.CTE)
 
     # -------------------------------------------------------------------
     # Body extraction helpers
     # -------------------------------------------------------------------
 
     @staticmethod
-    def _body_sql(node: exp.Expression) -> str:
+    def render_body(node: exp.Expression) -> str:
         """Render an AST node to SQL, stripping identifier quoting.
 
         Example SQL::
@@ -676,47 +772,11 @@ class NestedResolver:
 
         Renders the CTE body as ``SELECT id FROM users`` (quotes stripped).
         """
-        body = node.copy()
-        for ident in body.find_all(exp.Identifier):
-            ident.set("quoted", False)
-        # IGNORE unsupported-feature warnings: the rendered SQL is only fed
-        # back into a sub-Parser and never shown to the user, so warnings
-        # about constructs sqlglot can't faithfully re-emit (e.g. T-SQL
-        # FOR XML PATH) are noise.
+        body = NestedResolver.detach_subtree(node)
+        # IGNORE unsupported-feature warnings: the rendered SQL is only a
+        # best-effort view of the body (sub-Parsers work on the AST subtree
+        # itself), so warnings about constructs sqlglot can't faithfully
+        # re-emit (e.g. T-SQL FOR XML PATH) are noise.
         return _PreservingGenerator(unsupported_level=ErrorLevel.IGNORE).generate(
             body, copy=False
         )
-
-    @staticmethod
-    def _walk_subqueries(
-        node: exp.Expression,
-        names: list[str],
-        bodies: dict[str, str],
-        counter: int,
-    ) -> int:
-        """Post-order walk collecting subquery names and bodies.
-
-        Returns the updated *counter* so unnamed subqueries are numbered
-        sequentially.
-
-        Example SQL::
-
-            SELECT * FROM (SELECT 1) AS named, (SELECT 2)
-
-        Produces names ``["named", "subquery_1"]`` with corresponding bodies.
-        """
-        for child in node.iter_expressions():
-            counter = NestedResolver._walk_subqueries(
-                child, names, bodies, counter
-            )
-        if isinstance(node, exp.Subquery):
-            if node.alias:
-                # e.g. (SELECT 1) AS named — use the explicit alias
-                name = node.alias
-            else:
-                # e.g. WHERE id IN (SELECT 1) — auto-generate name
-                counter += 1
-                name = f"subquery_{counter}"
-            names.append(name)
-            bodies[name] = NestedResolver._body_sql(node.this)
-        return counter
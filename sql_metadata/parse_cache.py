@@ -0,0 +1,232 @@
+"""Process-wide LRU cache of parsed SQL statements.
+
+Services that see the same query shapes over and over pay for
+:meth:`SqlCleaner.clean <sql_metadata.sql_cleaner.SqlCleaner.clean>` and
+:meth:`DialectParser.parse <sql_metadata.dialect_parser.DialectParser.parse>`
+on every :class:`~sql_metadata.parser.Parser` instance.  When enabled, the
+:class:`ParseCache` maps the raw SQL text to the sqlglot AST, the winning
+dialect and the :class:`~sql_metadata.sql_cleaner.CleanResult` flags, so
+that repeated queries skip cleaning, dialect probing and parsing entirely.
+
+The cache is opt-in and bounded both by the number of entries and by an
+approximate memory budget::
+
+    from sql_metadata import enable_parse_cache
+
+    cache = enable_parse_cache(max_entries=2048, max_bytes=64 * 1024 * 1024)
+    ...
+    cache.stats()  # CacheStats(hits=..., misses=..., evictions=..., ...)
+
+Cached ASTs are shared between ``Parser`` instances and must be treated as
+read-only.  The extractors never mutate the tree they are given — anything
+that needs to modify a node (e.g. rendering CTE/subquery bodies) works on a
+copy made by :meth:`NestedResolver.detach_subtree
+<sql_metadata.nested_resolver.NestedResolver.detach_subtree>`.
+"""
+
+import threading
+from collections import OrderedDict
+from typing import NamedTuple
+
+from sqlglot import exp
+from sqlglot.dialects.dialect import DialectType
+
+from sql_metadata.ast_index import ASTIndex
+
+#: Rough per-node footprint of a sqlglot AST (node object, its ``args``
+#: dict and leaf values), measured with ``tracemalloc`` on sqlglot 30.x.
+_BYTES_PER_NODE = 1024
+
+#: Default limits used by :func:`enable_parse_cache`.
+DEFAULT_MAX_ENTRIES = 1024
+DEFAULT_MAX_BYTES = 64 * 1024 * 1024
+
+
+class CachedParse(NamedTuple):
+    """A single cached parse result."""
+
+    ast: exp.Expression
+    dialect: DialectType
+    is_replace: bool
+    cte_name_map: dict[str, str]
+    size: int
+    ast_index: ASTIndex
+
+
+class CacheStats(NamedTuple):
+    """Snapshot of :class:`ParseCache` counters."""
+
+    hits: int
+    misses: int
+    evictions: int
+    entries: int
+    size: int
+
+
+def estimate_size(sql: str, ast: exp.Expression, nodes: int | None = None) -> int:
+    """Approximate the memory held by a cache entry, in bytes.
+
+    :param sql: The raw SQL used as the cache key.
+    :type sql: str
+    :param ast: The parsed statement.
+    :type ast: exp.Expression
+    :param nodes: Node count of *ast*, if already known (see
+        :attr:`ASTIndex.size <sql_metadata.ast_index.ASTIndex.size>`).
+    :type nodes: int | None
+    :rtype: int
+    """
+    if nodes is None:
+        nodes = sum(1 for _ in ast.walk())
+    return len(sql) + nodes * _BYTES_PER_NODE
+
+
+class ParseCache:
+    """Thread-safe LRU mapping of raw SQL to :class:`CachedParse` entries.
+
+    Entries are keyed by the SQL and the dialect hint it was parsed with,
+    as a hint may change the resulting AST.
+
+    Entries are evicted least-recently-used first whenever either
+    *max_entries* or the estimated *max_bytes* budget is exceeded.  An
+    entry larger than the whole budget is never stored.
+
+    :param max_entries: Maximum number of cached statements.
+    :type max_entries: int
+    :param max_bytes: Approximate memory budget, see :func:`estimate_size`.
+    :type max_bytes: int
+    """
+
+    def __init__(
+        self,
+        max_entries: int = DEFAULT_MAX_ENTRIES,
+        max_bytes: int = DEFAULT_MAX_BYTES,
+    ) -> None:
+        if max_entries < 1 or max_bytes < 1:
+            raise ValueError("Cache limits must be positive")
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self._entries: OrderedDict[tuple[str, DialectType], CachedParse] = OrderedDict()
+        self._lock = threading.Lock()
+        self._size = 0
+        self._hits = 0
+        self._misses = 0
+        self._evictions = 0
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def get(self, sql: str, dialect_hint: DialectType = None) -> CachedParse | None:
+        """Return the entry for *sql* and mark it most recently used.
+
+        :param sql: Raw SQL string.
+        :type sql: str
+        :param dialect_hint: Dialect hint the SQL is parsed with.
+        :type dialect_hint: DialectType
+        :rtype: CachedParse | None
+        """
+        key = (sql, dialect_hint)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self._misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self._hits += 1
+            return entry
+
+    def put(
+        self,
+        sql: str,
+        ast: exp.Expression,
+        dialect: DialectType,
+        is_replace: bool,
+        cte_name_map: dict[str, str],
+        index: ASTIndex | None = None,
+        dialect_hint: DialectType = None,
+    ) -> None:
+        """Store a successful parse of *sql*, evicting old entries as needed.
+
+        :param sql: Raw SQL string used as the key.
+        :param ast: Root node produced by the parse.
+        :param dialect: Dialect that produced *ast*.
+        :param is_replace: ``CleanResult.is_replace`` flag.
+        :param cte_name_map: ``CleanResult.cte_name_map``.
+        :param index: Node index of *ast*, built here when not given.
+        :param dialect_hint: Dialect hint *sql* was parsed with.
+        """
+        index = index or ASTIndex(ast)
+        size = estimate_size(sql, ast, index.size)
+        if size > self.max_bytes:
+            return
+        entry = CachedParse(ast, dialect, is_replace, dict(cte_name_map), size, index)
+        with self._lock:
+            key = (sql, dialect_hint)
+            previous = self._entries.pop(key, None)
+            if previous is not None:
+                self._size -= previous.size
+            self._entries[key] = entry
+            self._size += size
+            while len(self._entries) > self.max_entries or self._size > self.max_bytes:
+                _, evicted = self._entries.popitem(last=False)
+                self._size -= evicted.size
+                self._evictions += 1
+
+    def clear(self) -> None:
+        """Drop all entries and reset the counters."""
+        with self._lock:
+            self._entries.clear()
+            self._size = self._hits = self._misses = self._evictions = 0
+
+    def stats(self) -> CacheStats:
+        """Return a consistent snapshot of the cache counters.
+
+        :rtype: CacheStats
+        """
+        with self._lock:
+            return CacheStats(
+                self._hits,
+                self._misses,
+                self._evictions,
+                len(self._entries),
+                self._size,
+            )
+
+
+# ---------------------------------------------------------------------------
+# Process-wide instance
+# ---------------------------------------------------------------------------
+
+_parse_cache: ParseCache | None = None
+
+
+def enable_parse_cache(
+    max_entries: int = DEFAULT_MAX_ENTRIES,
+    max_bytes: int = DEFAULT_MAX_BYTES,
+) -> ParseCache:
+    """Install a fresh process-wide :class:`ParseCache` and return it.
+
+    Replaces (and thereby empties) any previously enabled cache.
+
+    :param max_entries: Maximum number of cached statements.
+    :type max_entries: int
+    :param max_bytes: Approximate memory budget in bytes.
+    :type max_bytes: int
+    :rtype: ParseCache
+    """
+    global _parse_cache
+    _parse_cache = ParseCache(max_entries, max_bytes)
+    return _parse_cache
+
+
+def disable_parse_cache() -> None:
+    """Remove the process-wide cache; subsequent parses are uncached."""
+    global _parse_cache
+    _parse_cache = None
+
+
+def get_parse_cache() -> ParseCache | None:
+    """Return the process-wide cache, or ``None`` when caching is disabled.
+
+    :rtype: ParseCache | None
+    """
+    return _parse_cache
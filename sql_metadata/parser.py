@@ -12,21 +12,44 @@ Thin facade that composes the specialised extractors via lazy properties:
 """
 
 import logging
+import os
 import re
-from typing import Any
+from collections.abc import Hashable, Iterable, Iterator
+from contextlib import AbstractContextManager, nullcontext
+from functools import partial
+from typing import TYPE_CHECKING, Any
 
 from sqlglot import exp
+from sqlglot.dialects.dialect import DialectType
 
+from sql_metadata.ast_fingerprint import structural_fingerprint
+from sql_metadata.ast_index import ASTIndex
 from sql_metadata.ast_parser import ASTParser
 from sql_metadata.column_extractor import ColumnExtractor
+from sql_metadata.columnar import ColumnData, transpose
 from sql_metadata.comments import extract_comments, strip_comments
+from sql_metadata.extraction_plan import (
+    DEFAULT_FIELDS,
+    extraction_plan,
+    validate_fields,
+)
 from sql_metadata.generalizator import Generalizator
+from sql_metadata.instrumentation import Profile, entry_point, stage
 from sql_metadata.keywords_lists import QueryType
 from sql_metadata.nested_resolver import NestedResolver
 from sql_metadata.query_type_extractor import QueryTypeExtractor
+from sql_metadata.result import QueryResult
 from sql_metadata.sql_cleaner import SqlCleaner
 from sql_metadata.table_extractor import TableExtractor
+from sql_metadata.token_stream import TokenStream
 from sql_metadata.utils import UniqueList
+from sql_metadata.values_scanner import ValuesScanner, scan_dialect
+
+if TYPE_CHECKING:
+    from sql_metadata.file_reader import FileStatement
+
+#: Bases of the integers hex and bit string literals convert to.
+_LITERAL_BASES: dict[type[exp.Expression], int] = {exp.HexString: 16, exp.BitString: 2}
 
 
 class Parser:
@@ -41,16 +64,51 @@ class Parser:
     :type sql: str
     :param disable_logging: If ``True``, suppress all log output.
     :type disable_logging: bool
+    :param dialect_hint: sqlglot dialect to try before the ones inferred
+        from the query, e.g. ``"tsql"`` or ``"hive"``.
+    :type dialect_hint: DialectType
+    :param source: Key identifying where the query comes from (an
+        application, an ETL job); the dialect that usually wins for the
+        source is tried first, see :mod:`~sql_metadata.dialect_affinity`.
+    :type source: Hashable | None
+    :param profile: If ``True``, time the pipeline stages run for this
+        query into :attr:`profile`.
+    :type profile: bool
     """
 
-    def __init__(self, sql: str = "", disable_logging: bool = False) -> None:
-        self._logger = logging.getLogger(self.__class__.__name__)
-        self._logger.disabled = disable_logging
+    def __init__(
+        self,
+        sql: str = "",
+        disable_logging: bool = False,
+        dialect_hint: DialectType = None,
+        source: Hashable | None = None,
+        profile: bool = False,
+    ) -> None:
+        if disable_logging:
+            # a private logger: disabling the shared one would silence
+            # the parsers of every other thread
+            self._logger = logging.Logger(self.__class__.__name__)
+            self._logger.disabled = True
+        else:
+            self._logger = logging.getLogger(self.__class__.__name__)
 
-        self._raw_query = sql
+        self._sql: str | None = sql
+        self._sql_node: exp.Expression | None = None
         self._query_type: QueryType | None = None
 
-        self._ast_parser = ASTParser(sql)
+        self._dialect_hint = dialect_hint
+        self._source = source
+        #: Per-stage timings of this query, see
+        #: :mod:`~sql_metadata.instrumentation`; ``None`` unless requested.
+        self.profile: Profile | None = Profile() if profile else None
+        self._token_stream: TokenStream | None = TokenStream(sql)
+        self._ast_parser = ASTParser(
+            sql,
+            self._token_stream,
+            dialect_hint=dialect_hint,
+            source=source,
+            profile=self.profile,
+        )
         self._resolver: NestedResolver | None = None
 
         self._tokens: list[str] | None = None
@@ -58,10 +116,12 @@ class Parser:
         self._columns_extracted = False
         self._columns: UniqueList = UniqueList()
         self._columns_dict: dict[str, UniqueList] = {}
+        self._columns_dict_resolved = False
+        self._columns_dict_nested = False
         self._columns_aliases_names: UniqueList = UniqueList()
         self._columns_aliases: dict[str, str | list[str]] = {}
         self._columns_aliases_dict: dict[str, UniqueList] = {}
-        self._output_columns: list[str] = []
+        self._output_columns: list[str] | None = []
 
         self._tables: UniqueList | None = None
         self._table_aliases: dict[str, str] | None = None
@@ -70,11 +130,233 @@ class Parser:
         self._with_queries: dict[str, str] | None = None
         self._subqueries: dict[str, str] | None = None
         self._subqueries_names: UniqueList | None = None
+        self._subquery_nodes: dict[str, exp.Expression] | None = None
 
         self._limit_and_offset: tuple[int, int] | None = None
+        self._structural_fingerprint: int | None = None
 
         self._values: list[Any] | None = None
         self._values_dict: dict[str, int | float | str | list[Any]] | None = None
+        self._values_scanner: ValuesScanner | None = None
+        self._values_columnar: dict[str, ColumnData] | None = None
+
+    @classmethod
+    def cached(cls, sql: str) -> "Parser":
+        """Return a parser for *sql* reusing metadata of literal-only variants.
+
+        Looks *sql* up in the process-wide
+        :class:`~sql_metadata.metadata_cache.MetadataCache`.  When a query
+        differing only in string/number literals was seen before, tables,
+        columns, aliases, CTE/subquery names and the query type are copied
+        from the cache; ``values``, ``limit_and_offset`` and the other
+        literal-dependent properties are still extracted from *sql*.
+        Queries not in memory are then looked up in the disk cache, if
+        :func:`~sql_metadata.disk_cache.enable_disk_cache` was called.
+
+        Example SQL::
+
+            SELECT a FROM t WHERE id = 5  -- reuses the result for ``id = 7``
+
+        :param sql: The SQL query string to parse.
+        :type sql: str
+        :rtype: Parser
+        """
+        from sql_metadata.metadata_cache import get_metadata_cache
+
+        return get_metadata_cache().parser(sql)
+
+    @staticmethod
+    def iter_statements(
+        script: str | Iterable[str],
+        delimiter: str = ";",
+        dialect_hint: DialectType = None,
+        source: Hashable | None = None,
+    ) -> Iterator["Parser"]:
+        """Yield a parser for each statement of a multi-statement script.
+
+        The script is split incrementally by
+        :class:`~sql_metadata.script_parser.ScriptParser`, honouring
+        strings, comments, ``BEGIN ... END`` bodies and ``DELIMITER``
+        directives; each statement is parsed only when its properties
+        are read.
+
+        Example SQL::
+
+            CREATE TABLE t (id INT); INSERT INTO t VALUES (1);
+
+        :param script: The script, or an iterable of its chunks (e.g. an
+            open file).
+        :type script: str | Iterable[str]
+        :param delimiter: Statement delimiter.
+        :type delimiter: str
+        :param dialect_hint: Passed to each parser, see :class:`Parser`.
+        :type dialect_hint: DialectType
+        :param source: Passed to each parser, see :class:`Parser`.
+        :type source: Hashable | None
+        :rtype: Iterator[Parser]
+        """
+        from sql_metadata.script_parser import ScriptParser
+
+        return iter(
+            ScriptParser(script, delimiter, dialect_hint=dialect_hint, source=source)
+        )
+
+    @staticmethod
+    def iter_file(
+        path: str | os.PathLike[str],
+        delimiter: str = ";",
+        dialect_hint: DialectType = None,
+        source: Hashable | None = None,
+        encoding: str = "utf-8",
+    ) -> Iterator[tuple["FileStatement", "Parser"]]:
+        """Yield each statement of a SQL file with a parser for it.
+
+        Plain files are memory-mapped and gzip, bzip2 or xz files are
+        decompressed as a stream (see :mod:`~sql_metadata.file_reader`);
+        the file is never read into memory as a whole.  Each
+        :class:`~sql_metadata.file_reader.FileStatement` holds the byte
+        offset and length of the statement, so results can be traced back
+        to the file.
+
+        :param path: Plain or compressed SQL file.
+        :type path: str | os.PathLike[str]
+        :param delimiter: Statement delimiter.
+        :type delimiter: str
+        :param dialect_hint: Passed to each parser, and picks the
+            tokenizer used for splitting (e.g. ``"mysql"`` for dumps).
+        :type dialect_hint: DialectType
+        :param source: Passed to each parser, see :class:`Parser`.
+        :type source: Hashable | None
+        :param encoding: An ASCII-compatible text encoding.
+        :type encoding: str
+        :rtype: Iterator[tuple[FileStatement, Parser]]
+        """
+        from sql_metadata.file_reader import iter_file_statements
+
+        for statement in iter_file_statements(path, delimiter, dialect_hint, encoding):
+            yield statement, Parser(
+                statement.sql, dialect_hint=dialect_hint, source=source
+            )
+
+    def extract(self, fields: Iterable[str]) -> dict[str, Any]:
+        """Compute only *fields* and what they depend on, and return them.
+
+        The properties are evaluated following
+        :func:`~sql_metadata.extraction_plan.extraction_plan`, so nothing
+        outside the dependency closure of *fields* is computed — e.g.
+        ``extract(["tables"])`` never walks columns, and
+        ``extract(["columns"])`` renders no CTE or subquery body.
+
+        :param fields: Names of the properties to return, see
+            :data:`~sql_metadata.extraction_plan.FIELDS`.
+        :type fields: Iterable[str]
+        :returns: Requested field name → value, in the requested order.
+        :rtype: dict[str, Any]
+        :raises ValueError: If a field is unknown or the SQL is malformed.
+        """
+        fields = validate_fields(fields)
+        computed = {field: getattr(self, field) for field in extraction_plan(fields)}
+        return {field: computed[field] for field in fields}
+
+    def to_result(self, fields: Iterable[str] = DEFAULT_FIELDS) -> QueryResult:
+        """Return *fields* as a compact record holding no AST.
+
+        See :class:`~sql_metadata.result.QueryResult`.  Keep the record
+        instead of the parser when results for many queries are kept in
+        memory.
+
+        :param fields: Names of the properties to extract.
+        :type fields: Iterable[str]
+        :rtype: QueryResult
+        :raises ValueError: If a field is unknown or the SQL is malformed.
+        """
+        return QueryResult(self.extract(fields))
+
+    def release(self, fields: Iterable[str] = ()) -> None:
+        """Compute *fields*, then drop the AST and everything built on it.
+
+        The AST, its node index, the :class:`NestedResolver` with its
+        sub-parsers and the cached subquery nodes are released; computed
+        properties stay cached.  A property not computed yet still works
+        afterwards, but parses the query again.  An AST stored in the
+        parse cache (see :func:`~sql_metadata.parse_cache.enable_parse_cache`)
+        is kept there.
+
+        :param fields: Names of the properties to compute first.
+        :type fields: Iterable[str]
+        :raises ValueError: If a field is unknown or the SQL is malformed.
+        """
+        self.extract(fields)
+        sql = self._raw_query
+        dialect = (
+            self._ast_parser.dialect
+            if self._ast_parser.is_parsed
+            else self._dialect_hint
+        )
+        self._ast_parser = ASTParser(
+            sql, dialect_hint=dialect, source=self._source, profile=self.profile
+        )
+        self._token_stream = None
+        self._sql_node = None
+        self._resolver = None
+        self._subquery_nodes = None
+        self._values_scanner = None
+
+    @classmethod
+    def _from_subtree(
+        cls,
+        node: exp.Expression,
+        dialect: DialectType = None,
+        cte_name_map: dict[str, str] | None = None,
+        profile: Profile | None = None,
+    ) -> "Parser":
+        """Build a sub-parser for a nested query from its AST subtree.
+
+        Used as the :class:`NestedResolver` parser factory.  The subtree is
+        detached (see :meth:`NestedResolver.detach_subtree`) and wrapped in
+        an already-parsed :class:`ASTParser` sharing the parent's dialect
+        and CTE name map, so the body skips cleaning, dialect probing and
+        parsing.  The body SQL is only rendered if the sub-parser's raw
+        query is actually needed.
+
+        :param node: Body node of a CTE or subquery.
+        :param dialect: Dialect that produced the parent AST.
+        :param cte_name_map: The parent's placeholder-to-CTE-name map.
+        :param profile: The parent's profile, shared with the sub-parser.
+        :returns: A parser for the nested query.
+        :rtype: Parser
+        """
+        with stage("sub_parser", profile):
+            parser = cls()
+            parser.profile = profile
+            parser._sql = None
+            parser._sql_node = node
+            parser._token_stream = None
+            parser._ast_parser = ASTParser.from_expression(
+                NestedResolver.detach_subtree(node), dialect, cte_name_map
+            )
+        return parser
+
+    @property
+    def _raw_query(self) -> str:
+        """Return the raw SQL, rendering it first for subtree-backed parsers.
+
+        :rtype: str
+        """
+        if self._sql is None:
+            assert self._sql_node is not None
+            self._sql = NestedResolver.render_body(self._sql_node)
+        return self._sql
+
+    @property
+    def _stream(self) -> TokenStream:
+        """Return the token stream of the raw SQL shared by all consumers.
+
+        :rtype: TokenStream
+        """
+        if self._token_stream is None:
+            self._token_stream = TokenStream(self._raw_query)
+        return self._token_stream
 
     def _require_ast(self) -> exp.Expression:
         """Return the AST, asserting it is non-None.
@@ -93,6 +375,16 @@ class Parser:
         assert ast is not None
         return ast
 
+    def _require_index(self) -> ASTIndex:
+        """Return the shared :class:`ASTIndex` of the AST, asserting it exists.
+
+        :rtype: ASTIndex
+        :raises ValueError: Propagated from ``ASTParser`` for malformed SQL.
+        """
+        index = self._ast_parser.index
+        assert index is not None
+        return index
+
     def _get_resolver(self) -> NestedResolver:
         """Return the cached :class:`NestedResolver` for this query.
 
@@ -105,11 +397,19 @@ class Parser:
         """
         if self._resolver is None:
             self._resolver = NestedResolver(
-                self._require_ast(), parser_factory=Parser
+                self._require_ast(),
+                parser_factory=partial(
+                    Parser._from_subtree,
+                    dialect=self._ast_parser.dialect,
+                    cte_name_map=self._ast_parser.cte_name_map,
+                    profile=self.profile,
+                ),
+                index=self._require_index(),
             )
         return self._resolver
 
     @property
+    @entry_point
     def query(self) -> str:
         """Return the preprocessed SQL query.
 
@@ -119,9 +419,10 @@ class Parser:
 
         :rtype: str
         """
-        return SqlCleaner.preprocess_query(self._raw_query)
+        return SqlCleaner.preprocess_query(self._raw_query, self._stream)
 
     @property
+    @entry_point
     def query_type(self) -> QueryType | None:
         """Return the type of the SQL query.
 
@@ -135,16 +436,24 @@ class Parser:
         """
         if self._query_type:
             return self._query_type
+        timer: AbstractContextManager[Any]
         try:
             ast = self._ast_parser.ast
         except ValueError:
-            ast = None
-        self._query_type = QueryTypeExtractor(
-            ast, self._raw_query, is_replace=self._ast_parser.is_replace
-        ).extract()
+            # already reported by the parse stage
+            ast, timer = None, nullcontext()
+        else:
+            timer = stage("extract_query_type", self.profile)
+        with timer:
+            self._query_type = QueryTypeExtractor(
+                ast,
+                lambda: self._raw_query,
+                is_replace=self._ast_parser.is_replace,
+            ).extract()
         return self._query_type
 
     @property
+    @entry_point
     def tokens(self) -> list[str]:
         """Return the SQL as a list of token strings.
 
@@ -159,23 +468,24 @@ class Parser:
         if not self._raw_query or not self._raw_query.strip():
             self._tokens = []
             return self._tokens
-        from sql_metadata.comments import _choose_tokenizer
+        from sql_metadata.comments import _tokenizer_dialect
 
-        sg_tokens = list(
-            _choose_tokenizer(self._raw_query).tokenize(self._raw_query)
-        )
+        sg_tokens = self._stream.tokenize(_tokenizer_dialect(self._raw_query))
         self._tokens = [t.text.strip("`").strip('"') for t in sg_tokens]
         return self._tokens
 
     @property
+    @entry_point
     def columns(self) -> UniqueList:
         """Return the list of column names referenced in the query.
 
         Walks the sqlglot AST via :class:`ColumnExtractor` in a single DFS
         pass, then resolves CTE and subquery references through
-        :class:`NestedResolver`.  When AST construction fails (unparseable
-        SQL), falls back to a regex extraction of ``INTO … (col1, col2)``
-        column lists.
+        :class:`NestedResolver` — only when the query defines CTEs or
+        aliased subqueries.  The per-clause :attr:`columns_dict` is
+        resolved on its first access.  When AST construction fails
+        (unparseable SQL), falls back to a regex extraction of
+        ``INTO … (col1, col2)`` column lists.
 
         :rtype: UniqueList
         """
@@ -190,8 +500,12 @@ class Parser:
             self._columns = UniqueList(self._extract_columns_regex())
             return self._columns
 
-        extractor = ColumnExtractor(ast, ta, self._ast_parser.cte_name_map)
-        result = extractor.extract()
+        index = self._require_index()
+        extractor = ColumnExtractor(
+            ast, ta, self._ast_parser.cte_name_map, index=index
+        )
+        with stage("extract_columns", self.profile):
+            result = extractor.extract()
 
         self._columns = result.columns
         self._columns_dict = result.columns_dict
@@ -202,26 +516,37 @@ class Parser:
 
         # Use only aliased subquery names for column resolution —
         # auto-generated names (subquery_1, …) are never referenced in SQL.
+        # Bodies are passed as AST nodes; sub-parsers wrap those subtrees.
         aliased_names = result.subquery_names
-        all_names, all_bodies = NestedResolver.extract_subqueries(ast)
-        aliased_bodies = {k: v for k, v in all_bodies.items() if k in aliased_names}
+        if not aliased_names and not result.cte_names:
+            # nothing to resolve through, e.g. SELECT a FROM t
+            return self._columns
+        aliased_nodes: dict[str, exp.Expression] = {}
+        if aliased_names:
+            all_names, all_nodes = NestedResolver.extract_subquery_nodes(index)
+            aliased_nodes = {
+                k: v for k, v in all_nodes.items() if k in aliased_names
+            }
+            # Cache the full walk for the public subquery properties
+            self._subqueries_names = all_names
+            self._subquery_nodes = all_nodes
         resolver = self._get_resolver()
-        self._columns, self._columns_dict, self._columns_aliases = resolver.resolve(
-            self._columns,
-            self._columns_dict,
-            self._columns_aliases,
-            aliased_names,
-            aliased_bodies,
-            self.with_names,
-            self.with_queries,
-        )
-        # Cache full results for the public properties
-        self._subqueries_names = all_names
-        self._subqueries = all_bodies
+        with_names = self.with_names
+        with stage("resolve_nested", self.profile):
+            self._columns, self._columns_aliases = resolver.resolve(
+                self._columns,
+                self._columns_aliases,
+                aliased_names,
+                aliased_nodes,
+                with_names,
+                resolver.extract_cte_nodes(self._ast_parser.cte_name_map),
+            )
+        self._columns_dict_nested = True
 
         return self._columns
 
     @property
+    @entry_point
     def columns_dict(self) -> dict[str, UniqueList]:
         """Return column names organised by query clause.
 
@@ -235,6 +560,16 @@ class Parser:
         """
         if not self._columns_extracted:
             _ = self.columns
+        if self._columns_dict_resolved:
+            return self._columns_dict
+        self._columns_dict_resolved = True
+        if self._columns_dict_nested:
+            # Resolve subquery / CTE references deferred by columns
+            resolver = self._get_resolver()
+            with stage("resolve_nested", self.profile):
+                self._columns_dict = resolver.resolve_columns_dict(
+                    self._columns_dict
+                )
         # Resolve aliases used in other sections
         if self.columns_aliases_dict:
             resolver = self._get_resolver()
@@ -248,6 +583,7 @@ class Parser:
         return self._columns_dict
 
     @property
+    @entry_point
     def columns_aliases(self) -> dict[str, str | list[str]]:
         """Return the alias-to-column mapping for column aliases.
 
@@ -262,6 +598,7 @@ class Parser:
         return self._columns_aliases
 
     @property
+    @entry_point
     def columns_aliases_dict(self) -> dict[str, UniqueList]:
         """Return column alias names organised by query clause.
 
@@ -276,6 +613,7 @@ class Parser:
         return self._columns_aliases_dict
 
     @property
+    @entry_point
     def columns_aliases_names(self) -> UniqueList:
         """Return the names of all column aliases used in the query.
 
@@ -286,6 +624,7 @@ class Parser:
         return self._columns_aliases_names
 
     @property
+    @entry_point
     def output_columns(self) -> list[str]:
         """Return the ordered list of SELECT output column names.
 
@@ -296,9 +635,20 @@ class Parser:
         """
         if not self._columns_extracted:
             _ = self.columns
+        if self._output_columns is None:
+            # seeded by MetadataCache — the projection renders literals
+            extractor = ColumnExtractor(
+                self._require_ast(),
+                self.tables_aliases,
+                self._ast_parser.cte_name_map,
+                index=self._require_index(),
+            )
+            with stage("extract_columns", self.profile):
+                self._output_columns = extractor.extract().output_columns
         return self._output_columns
 
     @property
+    @entry_point
     def tables(self) -> UniqueList:
         """Return the list of table names referenced in the query.
 
@@ -319,11 +669,14 @@ class Parser:
             ast,
             cte_names,
             dialect=self._ast_parser.dialect,
+            index=self._require_index(),
         )
-        self._tables = extractor.extract()
+        with stage("extract_tables", self.profile):
+            self._tables = extractor.extract()
         return self._tables
 
     @property
+    @entry_point
     def tables_aliases(self) -> dict[str, str]:
         """Return the table alias mapping for this query.
 
@@ -334,11 +687,14 @@ class Parser:
         """
         if self._table_aliases is not None:
             return self._table_aliases
-        extractor = TableExtractor(self._require_ast())
+        extractor = TableExtractor(
+            self._require_ast(), index=self._require_index()
+        )
         self._table_aliases = extractor.extract_aliases(self.tables)
         return self._table_aliases
 
     @property
+    @entry_point
     def with_names(self) -> UniqueList:
         """Return the CTE (Common Table Expression) names from the query.
 
@@ -353,6 +709,7 @@ class Parser:
         return self._with_names
 
     @property
+    @entry_point
     def with_queries(self) -> dict[str, str]:
         """Return the SQL body for each CTE defined in the query.
 
@@ -370,23 +727,28 @@ class Parser:
         return self._with_queries
 
     @property
+    @entry_point
     def subqueries(self) -> dict[str, str]:
         """Return the SQL body for each subquery in the query.
 
         Maps each subquery name to its SQL text.  Aliased subqueries use
         their alias as the key; unaliased ones get auto-generated names
-        (``subquery_1``, ``subquery_2``, …).
+        (``subquery_1``, ``subquery_2``, …).  Bodies are rendered from the
+        AST only when this property is first accessed.
 
         :rtype: dict[str, str]
         """
         if self._subqueries is not None:
             return self._subqueries
-        self._subqueries_names, self._subqueries = (
-            NestedResolver.extract_subqueries(self._require_ast())
-        )
+        if self._subquery_nodes is None:
+            self._subqueries_names, self._subquery_nodes = (
+                NestedResolver.extract_subquery_nodes(self._require_index())
+            )
+        self._subqueries = NestedResolver.render_bodies(self._subquery_nodes)
         return self._subqueries
 
     @property
+    @entry_point
     def subqueries_names(self) -> UniqueList:
         """Return the names of all subqueries (innermost first).
 
@@ -397,8 +759,8 @@ class Parser:
         """
         if self._subqueries_names is not None:
             return self._subqueries_names
-        self._subqueries_names, self._subqueries = (
-            NestedResolver.extract_subqueries(self._require_ast())
+        self._subqueries_names, self._subquery_nodes = (
+            NestedResolver.extract_subquery_nodes(self._require_index())
         )
         return self._subqueries_names
 
@@ -421,6 +783,7 @@ class Parser:
             return None
 
     @property
+    @entry_point
     def limit_and_offset(self) -> tuple[int, int] | None:
         """Return the LIMIT and OFFSET values, if present.
 
@@ -433,11 +796,11 @@ class Parser:
         if self._limit_and_offset is not None:
             return self._limit_and_offset
 
-        ast = self._ast_parser.ast
-        if ast is None:
+        index = self._ast_parser.index
+        if index is None:
             return None
 
-        select = ast if isinstance(ast, exp.Select) else ast.find(exp.Select)
+        select = index.find(exp.Select)
         if select is None:
             return None
 
@@ -451,6 +814,7 @@ class Parser:
         return self._limit_and_offset
 
     @property
+    @entry_point
     def values(self) -> list[Any]:
         """Return the list of literal values from INSERT/REPLACE queries.
 
@@ -465,6 +829,7 @@ class Parser:
         return self._values
 
     @property
+    @entry_point
     def values_dict(self) -> dict[str, Any] | None:
         """Return column-value pairs from INSERT/REPLACE queries.
 
@@ -495,54 +860,203 @@ class Parser:
         return self._values_dict
 
     @property
+    @entry_point
+    def values_columnar(self) -> dict[str, ColumnData] | None:
+        """Return the INSERT/REPLACE values by column, in compact buffers.
+
+        Keyed like :attr:`values_dict` (``column_1``, ``column_2``, …
+        when the INSERT names no columns), but every column is a sequence,
+        even for a single row.  Columns of integers are ``array.array("q")``
+        and columns of numbers ``array.array("d")`` buffers, which NumPy
+        and pandas can wrap without copying; other columns are lists.
+        Rows are streamed with :meth:`iter_values` unless :attr:`values`
+        was read already, so no list of rows is built.
+
+        :rtype: dict[str, array | list] | None
+        """
+        if self._values_columnar is not None:
+            return self._values_columnar
+        columns = transpose(self.iter_values())
+        if not columns:
+            return None
+        names = self.columns or [
+            f"column_{ind + 1}" for ind in range(len(columns))
+        ]
+        self._values_columnar = dict(zip(names, columns))
+        return self._values_columnar
+
+    def iter_values(self) -> Iterator[list[Any]]:
+        """Yield the rows of an INSERT/REPLACE ``VALUES`` clause one by one.
+
+        Unlike :attr:`values`, a single-row INSERT also yields a list.
+        Unless the query was parsed already, the rows are read straight
+        from the tokens by :class:`~sql_metadata.values_scanner.ValuesScanner`
+        without building an AST for them, and the parser switches to an
+        AST of the statement head — the statement with its first row (and
+        any row referencing columns or subqueries) — so that
+        :attr:`tables`, :attr:`columns` and :attr:`values_dict` stay cheap
+        for huge multi-row inserts.  Values are converted as in
+        :attr:`values`.
+
+        Example SQL::
+
+            INSERT INTO t (a, b) VALUES (1, 'x'), (2, 'y'), ...
+
+        :rtype: Iterator[list[Any]]
+        :raises InvalidQueryDefinition: If the rows cannot be tokenized.
+        """
+        scanner = self._get_values_scanner()
+        if scanner is not None:
+            yield from scanner.rows()
+        elif self._values is not None:
+            values = self._values
+            yield from values if values and isinstance(values[0], list) else [values]
+        else:
+            yield from self._ast_rows()
+
+    def _get_values_scanner(self) -> ValuesScanner | None:
+        """Return the scanner streaming the rows, creating it if the AST
+        was not built yet and the statement has a ``VALUES`` clause.
+
+        :rtype: ValuesScanner | None
+        """
+        if self._values_scanner is not None or self._ast_parser.is_parsed:
+            return self._values_scanner
+        scanner = ValuesScanner(
+            self._raw_query, scan_dialect(self._raw_query, self._dialect_hint)
+        )
+        if scanner.locate():
+            self._values_scanner = scanner
+            self._ast_parser = ASTParser.deferred(
+                scanner.head,
+                dialect_hint=self._dialect_hint,
+                source=self._source,
+                profile=self.profile,
+            )
+        return self._values_scanner
+
+    @property
+    @entry_point
     def comments(self) -> list[str]:
         """Return all comments from the SQL query.
 
         :rtype: list[str]
         """
-        return extract_comments(self._raw_query)
+        return extract_comments(self._raw_query, self._stream)
 
     @property
+    @entry_point
     def without_comments(self) -> str:
         """Return the SQL with all comments removed.
 
         :rtype: str
         """
-        return strip_comments(self._raw_query)
+        return strip_comments(self._raw_query, self._stream)
 
     @property
+    @entry_point
     def generalize(self) -> str:
         """Return a generalised (anonymised) version of the query.
 
         :rtype: str
         """
-        return Generalizator(self._raw_query).generalize
+        return Generalizator(self._raw_query, self._stream).generalize
+
+    @property
+    @entry_point
+    def fingerprint(self) -> int:
+        """Return a stable 64-bit digest of :attr:`generalize`.
+
+        See :attr:`Generalizator.fingerprint
+        <sql_metadata.generalizator.Generalizator.fingerprint>`.
+
+        :rtype: int
+        """
+        return Generalizator(self._raw_query, self._stream).fingerprint
+
+    @property
+    @entry_point
+    def fingerprint_hex(self) -> str:
+        """Return :attr:`fingerprint` as 16 lowercase hex digits.
+
+        :rtype: str
+        """
+        return Generalizator(self._raw_query, self._stream).fingerprint_hex
+
+    @property
+    @entry_point
+    def structural_fingerprint(self) -> int:
+        """Return a 64-bit fingerprint of the shape of the parsed query.
+
+        Unlike :attr:`fingerprint` it is computed from the AST, so it
+        ignores formatting, comments, quoting, keyword and unquoted
+        identifier case, literal values and the names of table aliases,
+        subquery aliases and CTEs.  See
+        :func:`~sql_metadata.ast_fingerprint.structural_fingerprint`.
+        It covers all rows of an ``INSERT``, so once :meth:`iter_values`
+        streamed them the whole statement is parsed for it.
+
+        Example SQL::
+
+            SELECT u.a FROM users u WHERE u.id = 5
+            select x.a from users AS x where x.id = 7  -- same fingerprint
+
+        :rtype: int
+        :raises ValueError: If the query is empty or cannot be parsed.
+        """
+        if self._structural_fingerprint is None:
+            _ = self.query_type
+            ast: exp.Expression | None = self._require_ast()
+            if self._values_scanner is not None:
+                # the head AST of streamed rows lacks most of them
+                ast = ASTParser(
+                    self._raw_query,
+                    self._token_stream,
+                    dialect_hint=self._dialect_hint,
+                    source=self._source,
+                    profile=self.profile,
+                ).ast
+            assert ast is not None  # the head of the statement parsed
+            self._structural_fingerprint = structural_fingerprint(ast)
+        return self._structural_fingerprint
 
     def _extract_values(self) -> list[Any]:
         """Extract literal values from INSERT/REPLACE query AST.
 
+        Rows are read from the tokens instead if :meth:`iter_values`
+        already switched to streaming them.
+
         :returns: A flat list for single-row inserts, a list of lists for
             multi-row inserts, or an empty list when no VALUES clause exists.
         :rtype: list[Any]
         """
+        if self._values_scanner is not None:
+            rows = list(self._values_scanner.rows())
+        else:
+            rows = list(self._ast_rows())
+        if len(rows) == 1:
+            return rows[0]
+        return rows
+
+    def _ast_rows(self) -> Iterator[list[Any]]:
+        """Yield the converted rows of the ``VALUES`` node of the AST.
+
+        :rtype: Iterator[list[Any]]
+        """
         try:
-            ast = self._ast_parser.ast
+            index = self._ast_parser.index
         except ValueError:
-            return []
+            return
 
-        if ast is None:
-            return []
+        if index is None:
+            return
 
-        values_node = ast.find(exp.Values)
+        values_node = index.find(exp.Values)
         if not values_node:
-            return []
+            return
 
-        rows = []
         for tup in values_node.expressions:
-            rows.append([self._convert_value(val) for val in tup.expressions])
-        if len(rows) == 1:
-            return rows[0]
-        return rows
+            yield [self._convert_value(val) for val in tup.expressions]
 
     @staticmethod
     def _convert_value(val: exp.Expression) -> int | float | str:
@@ -551,21 +1065,27 @@ class Parser:
         :param val: A sqlglot expression node (typically ``exp.Literal``
             or ``exp.Neg``).
         :type val: exp.Expression
-        :returns: The Python int, float, or str representation.
+        :returns: The Python int, float, or str representation; hex and
+            bit strings become ints, national and escape strings their
+            text.
         :rtype: int | float | str
         """
+        base = _LITERAL_BASES.get(type(val))
+        if base is not None:
+            return int(val.this or "0", base)
+        if isinstance(val, (exp.National, exp.ByteString)):
+            return str(val.this)
         if isinstance(val, exp.Literal):
             if val.is_int:
                 return int(val.this)
             if val.is_number:
                 return float(val.this)
             return str(val.this)
-        if isinstance(val, exp.Neg):
+        if isinstance(val, exp.Neg) and isinstance(val.this, exp.Literal):
             inner = val.this
-            if isinstance(inner, exp.Literal):
-                if inner.is_int:
-                    return -int(inner.this)
-                return -float(inner.this)
+            if inner.is_int:
+                return -int(inner.this)
+            return -float(inner.this)
         return str(val)
 
     def _extract_limit_regex(self) -> tuple[int, int] | None:
@@ -578,7 +1098,7 @@ class Parser:
             clause is found.
         :rtype: tuple[int, int] | None
         """
-        sql = strip_comments(self._raw_query)
+        sql = strip_comments(self._raw_query, self._stream)
         match = re.search(r"LIMIT\s+(\d+)\s*,\s*(\d+)", sql, re.IGNORECASE)
         if match:
             offset_val = int(match.group(1))
@@ -7,6 +7,7 @@ cannot fully parse (e.g. Hive DDL).
 """
 
 import logging
+from collections.abc import Callable
 from typing import NoReturn
 
 from sqlglot import exp
@@ -46,19 +47,31 @@ class QueryTypeExtractor:
     :param ast: Root AST node produced by :class:`DialectParser`, or
         ``None`` when the input was empty or comment-only.
     :param raw_query: Original SQL string, kept for error messages
-        when the AST is ``None``.
+        when the AST is ``None``.  May also be a zero-argument callable
+        returning the SQL, so that sub-parsers built from AST subtrees only
+        render their body when an error message actually needs it.
     """
 
     def __init__(
         self,
         ast: exp.Expression | None,
-        raw_query: str,
+        raw_query: str | Callable[[], str],
         is_replace: bool = False,
     ):
         self._ast = ast
-        self._raw_query = raw_query
+        self._raw_query_source = raw_query
         self._is_replace = is_replace
 
+    @property
+    def _raw_query(self) -> str:
+        """Return the original SQL, calling the source if it is lazy.
+
+        :rtype: str
+        """
+        if callable(self._raw_query_source):
+            return self._raw_query_source()
+        return self._raw_query_source
+
     def extract(self) -> QueryType:
         """Determine the :class:`QueryType` for the parsed SQL.
 
@@ -0,0 +1,174 @@
+"""Compact, immutable snapshot of the metadata extracted from a query.
+
+A :class:`~sql_metadata.parser.Parser` keeps the raw SQL, the sqlglot AST,
+the node index, a :class:`~sql_metadata.nested_resolver.NestedResolver`
+with a sub-parser (and AST) per CTE and subquery, and a cache field per
+property.  That is needed while properties are being computed, but far
+too much to keep around for every query of a large log.
+:meth:`Parser.to_result <sql_metadata.parser.Parser.to_result>` copies
+the requested fields into a :class:`QueryResult` instead::
+
+    results = [Parser(sql).to_result(["tables", "columns"]) for sql in log]
+    results[0].tables  # ('users',)
+
+The record has one slot per field and no ``__dict__``.  Lists become
+tuples, dicts become read-only mappings and identifier strings (table,
+column and alias names, tokens) are interned, so the names shared by
+many queries are stored once.  Literal values and SQL text are left as
+they are.
+"""
+
+import sys
+from collections.abc import Mapping
+from types import MappingProxyType
+from typing import Any, NoReturn
+
+from sql_metadata.columnar import ColumnData
+from sql_metadata.extraction_plan import validate_fields
+from sql_metadata.keywords_lists import QueryType
+
+#: Fields holding SQL text or literal values, whose strings are not interned.
+_TEXT_FIELDS = frozenset(
+    {
+        "with_queries",
+        "subqueries",
+        "values",
+        "values_dict",
+        "values_columnar",
+        "comments",
+        "without_comments",
+        "generalize",
+    }
+)
+
+
+class QueryResult:
+    """Read-only record of the fields extracted from one query.
+
+    Only the fields given to the constructor are set; reading another
+    one raises ``AttributeError``.  Records can be compared and pickled.
+
+    :param fields: Field name → value as returned by
+        :meth:`Parser.extract <sql_metadata.parser.Parser.extract>`.
+    :type fields: Mapping[str, Any]
+    :raises ValueError: If a field is unknown.
+    """
+
+    __slots__ = (
+        "_fields",
+        "query_type",
+        "tokens",
+        "with_names",
+        "with_queries",
+        "subqueries",
+        "subqueries_names",
+        "tables",
+        "tables_aliases",
+        "columns",
+        "columns_dict",
+        "columns_aliases",
+        "columns_aliases_dict",
+        "columns_aliases_names",
+        "output_columns",
+        "limit_and_offset",
+        "values",
+        "values_dict",
+        "values_columnar",
+        "comments",
+        "without_comments",
+        "generalize",
+        "structural_fingerprint",
+    )
+
+    _fields: tuple[str, ...]
+    query_type: QueryType | None
+    tokens: tuple[str, ...]
+    with_names: tuple[str, ...]
+    with_queries: Mapping[str, str]
+    subqueries: Mapping[str, str]
+    subqueries_names: tuple[str, ...]
+    tables: tuple[str, ...]
+    tables_aliases: Mapping[str, str]
+    columns: tuple[str, ...]
+    columns_dict: Mapping[str, tuple[str, ...]]
+    columns_aliases: Mapping[str, str | tuple[str, ...]]
+    columns_aliases_dict: Mapping[str, tuple[str, ...]]
+    columns_aliases_names: tuple[str, ...]
+    output_columns: tuple[str, ...]
+    limit_and_offset: tuple[int, int] | None
+    values: tuple[Any, ...]
+    values_dict: Mapping[str, Any] | None
+    values_columnar: Mapping[str, ColumnData] | None
+    comments: tuple[str, ...]
+    without_comments: str
+    generalize: str
+    structural_fingerprint: int
+
+    def __init__(self, fields: Mapping[str, Any]) -> None:
+        names = validate_fields(fields)
+        for name in names:
+            value = _freeze(fields[name], name not in _TEXT_FIELDS)
+            object.__setattr__(self, name, value)
+        object.__setattr__(self, "_fields", tuple(sys.intern(n) for n in names))
+
+    @property
+    def fields(self) -> tuple[str, ...]:
+        """Names of the fields the record holds, in extraction order.
+
+        :rtype: tuple[str, ...]
+        """
+        return self._fields
+
+    def as_dict(self) -> dict[str, Any]:
+        """Return the fields as a dict, with plain dicts for the mappings.
+
+        :rtype: dict[str, Any]
+        """
+        return {name: _thaw(getattr(self, name)) for name in self._fields}
+
+    def __eq__(self, other: object) -> bool:
+        if not isinstance(other, QueryResult):
+            return NotImplemented
+        return self.as_dict() == other.as_dict()
+
+    __hash__ = None  # type: ignore[assignment]
+
+    def __repr__(self) -> str:
+        items = ", ".join(f"{name}={getattr(self, name)!r}" for name in self._fields)
+        return f"{type(self).__name__}({items})"
+
+    def __reduce__(self) -> tuple[type["QueryResult"], tuple[dict[str, Any]]]:
+        # read-only mappings cannot be pickled; strings are interned again
+        # when the record is rebuilt
+        return type(self), (self.as_dict(),)
+
+    def __setattr__(self, name: str, value: Any) -> NoReturn:
+        raise AttributeError(f"{type(self).__name__} is read-only")
+
+    def __delattr__(self, name: str) -> NoReturn:
+        raise AttributeError(f"{type(self).__name__} is read-only")
+
+
+def _freeze(value: Any, intern: bool) -> Any:
+    """Copy *value* into tuples and read-only mappings.
+
+    Plain strings are interned when *intern* is set; dict keys always are.
+    """
+    if type(value) is str:
+        return sys.intern(value) if intern else value
+    if isinstance(value, (list, tuple)):
+        return tuple(_freeze(item, intern) for item in value)
+    if isinstance(value, dict):
+        return MappingProxyType(
+            {_freeze(key, True): _freeze(item, intern) for key, item in value.items()}
+        )
+    return value
+
+
+def _thaw(value: Any) -> Any:
+    """Turn the read-only mappings of a frozen value back into dicts."""
+    if isinstance(value, MappingProxyType):
+        return {key: _thaw(item) for key, item in value.items()}
+    if isinstance(value, tuple):
+        return tuple(_thaw(item) for item in value)
+    return value
@@ -0,0 +1,437 @@
+"""Split multi-statement SQL scripts and parse each statement lazily.
+
+:class:`~sql_metadata.parser.Parser` handles one statement — given a
+script it only looks at the first one.  :class:`ScriptParser` splits a
+script (a string, or any iterable of text chunks such as an open file)
+into statements and yields one lazily evaluated ``Parser`` per
+statement::
+
+    from sql_metadata import Parser
+
+    with open("migration.sql") as script:
+        for parser in Parser.iter_statements(script):
+            print(parser.query_type, parser.tables)
+
+Statement boundaries are found with the sqlglot tokenizer, so delimiters
+inside strings, quoted identifiers and comments are ignored, and so are
+semicolons inside ``BEGIN ... END`` bodies of procedures and triggers.
+The MySQL client's ``DELIMITER`` directive switches to a custom
+delimiter (with which ``BEGIN ... END`` needs no tracking).
+
+Input is consumed chunk by chunk and only the text of the statement
+being scanned is kept, so memory is proportional to the largest
+statement rather than to the whole script.
+"""
+
+import io
+import re
+from collections.abc import Hashable, Iterable, Iterator
+from typing import TYPE_CHECKING, NamedTuple
+
+from sqlglot.dialects.dialect import Dialect, DialectType
+from sqlglot.errors import TokenError
+from sqlglot.tokens import Token, Tokenizer, TokenType
+
+from sql_metadata.comments import _tokenizer_dialect
+
+if TYPE_CHECKING:
+    from sql_metadata.parser import Parser
+
+#: Default statement delimiter.
+DEFAULT_DELIMITER = ";"
+
+#: Tokens whose text is quoted — delimiters inside them do not count.
+_QUOTED_TOKENS = frozenset(
+    {
+        TokenType.STRING,
+        TokenType.IDENTIFIER,
+        TokenType.BIT_STRING,
+        TokenType.BYTE_STRING,
+        TokenType.HEX_STRING,
+        TokenType.HEREDOC_STRING,
+        TokenType.NATIONAL_STRING,
+        TokenType.RAW_STRING,
+        TokenType.UNICODE_STRING,
+    }
+)
+
+#: Words after ``BEGIN`` that start a transaction rather than a block.
+_TRANSACTION_WORDS = frozenset(
+    {"TRANSACTION", "TRAN", "WORK", "DEFERRED", "IMMEDIATE", "EXCLUSIVE"}
+)
+
+#: Words after ``END`` closing a construct that did not open a block.
+_END_SUFFIXES = frozenset({"IF", "LOOP", "WHILE", "REPEAT", "FOR"})
+
+#: Tokens whose meaning depends on the next word.
+_LOOKAHEAD_TOKENS = frozenset({TokenType.BEGIN, TokenType.END})
+
+#: Start of a token the tokenizer could not finish, after the complete
+#: tokens: a block comment, a dollar-quoted string (Postgres tokenizer)
+#: or a quoted string or identifier, possibly prefixed (``N'``, ``X'``,
+#: ``E'``, ``U&'``) or bracketed (T-SQL tokenizer).
+_UNTERMINATED = re.compile(
+    r"""(?:\s|--[^\n]*\n|/\*.*?\*/)*(?:(/\*)|(\$\w*\$)|\w*&?(['"`\[]))""",
+    re.DOTALL,
+)
+
+#: Opening → closing text of the tokens matched by ``_UNTERMINATED``.
+_CLOSERS = {"/*": "*/", "[": "]"}
+
+#: A MySQL client ``DELIMITER`` directive at the start of a statement,
+#: optionally preceded by whitespace and line comments.
+_DELIMITER_DIRECTIVE = re.compile(
+    r"(?:\s|--[^\n]*\n|#[^\n]*\n)*DELIMITER[ \t]+(\S+)[ \t]*(?:\r?\n|\Z)",
+    re.IGNORECASE,
+)
+
+
+class ScriptStatement(NamedTuple):
+    """One statement of a script and its character offset in the script."""
+
+    offset: int
+    sql: str
+
+
+class StatementSplitter:
+    """Incrementally split SQL text fed in chunks into statements.
+
+    :meth:`feed` and :meth:`close` return the statements completed so
+    far.  Until the end of input, text is scanned up to its last line
+    break, except for a final ``BEGIN`` or ``END`` whose meaning depends
+    on the next word; text before the current statement is dropped and
+    its scanned text is set aside, so every character is tokenized once.
+    Statements before a string or comment spanning lines are split off
+    at once; the string or comment is tokenized again only when its
+    closing quote or ``*/`` arrives (or the pending text has doubled).
+
+    :param delimiter: Initial statement delimiter.
+    :type delimiter: str
+    :param dialect: sqlglot dialect whose tokenizer to use, by default
+        MySQL's when the text holds back-ticks or ``#`` comments.
+    :type dialect: DialectType
+    """
+
+    def __init__(
+        self, delimiter: str = DEFAULT_DELIMITER, dialect: DialectType = None
+    ) -> None:
+        self.delimiter = delimiter
+        self._dialect = dialect
+        self._buffer = ""
+        self._chunks: list[str] = []
+        #: Scanned text of the current statement preceding ``_buffer``.
+        self._head: list[str] = []
+        self._head_size = 0
+        #: Offset of ``_buffer[0]`` in the whole input.
+        self._offset = 0
+        #: After a token error: text closing the unfinished token, the
+        #: last characters already searched for it, the number of chunks
+        #: searched and the pending size at which to retry anyway.
+        self._closer: str | None = None
+        self._carry = ""
+        self._checked = 0
+        self._retry_size = 0
+        #: Start of the current statement, of the unscanned text and end
+        #: of the text that can be scanned.
+        self._start = self._scan_from = self._limit = 0
+        self._has_tokens = False
+        self._untokenized = False
+        # BEGIN ... END / CASE ... END nesting (``;`` delimiter only)
+        self._depth = 0
+        self._after_end = False
+
+    def feed(self, chunk: str) -> list[ScriptStatement]:
+        """Add *chunk* to the input and return the statements it completes.
+
+        :param chunk: The next piece of the script.
+        :type chunk: str
+        :rtype: list[ScriptStatement]
+        """
+        self._chunks.append(chunk)
+        if "\n" not in chunk:
+            return []
+        return self._scan(final=False)
+
+    def close(self) -> list[ScriptStatement]:
+        """Signal the end of input and return the remaining statements.
+
+        A trailing statement without a delimiter is returned as well, as
+        is text the tokenizer rejects (e.g. an unterminated string), so
+        that its ``Parser`` reports the error.
+
+        :rtype: list[ScriptStatement]
+        """
+        return self._scan(final=True)
+
+    # -- scanning -----------------------------------------------------------
+
+    def _scan(self, final: bool) -> list[ScriptStatement]:
+        if not final and self._blocked():
+            return []
+        if self._chunks:
+            self._buffer += "".join(self._chunks)
+            self._chunks.clear()
+            self._checked = 0
+        self._limit = len(self._buffer) if final else self._buffer.rfind("\n") + 1
+        statements: list[ScriptStatement] = []
+        while self._scan_tokens(statements, final):
+            pass
+        if final:
+            self._flush(statements)
+        self._compact()
+        return statements
+
+    def _scan_tokens(self, statements: list[ScriptStatement], final: bool) -> bool:
+        """Scan the buffered text, collecting statements.
+
+        :returns: ``True`` if the delimiter changed and the rest of the
+            text has to be tokenized again.
+        """
+        if self._switch_delimiter():
+            return True
+        base = self._scan_from
+        tokenizer = self._tokenizer(self._buffer[base : self._limit])
+        end = self._limit
+        try:
+            tokens = tokenizer.tokenize(self._buffer[base : self._limit])
+        except TokenError:
+            # e.g. a string continuing on the next line: split on the
+            # complete tokens before it, then wait for its end
+            tokens = tokenizer.tokens
+            end = base + tokens[-1].end + 1 if tokens else base
+        blocked = end < self._limit
+        usable = len(tokens)
+        if (blocked or not final) and tokens:
+            usable -= tokens[-1].token_type in _LOOKAHEAD_TOKENS
+        if self._consume(tokens, usable, base, statements):
+            return True
+        stop = base + tokens[usable].start if usable < len(tokens) else end
+        self._scan_from = max(stop, self._start)
+        if blocked:
+            self._untokenized = final
+            self._block(end)
+        return False
+
+    def _consume(
+        self,
+        tokens: list[Token],
+        usable: int,
+        base: int,
+        statements: list[ScriptStatement],
+    ) -> bool:
+        """Process the first *usable* tokens, which start at offset *base*.
+
+        :returns: ``True`` if a ``DELIMITER`` directive followed a
+            statement, which invalidates the remaining tokens.
+        """
+        for i in range(usable):
+            token = tokens[i]
+            start = base + token.start
+            if start < self._start:
+                continue  # the rest of a multi-token delimiter
+            following = tokens[i + 1] if i + 1 < len(tokens) else None
+            stop = base + token.end + 1
+            if self._at_delimiter(token, following, start, stop, statements):
+                if self._switch_delimiter():
+                    return True
+        return False
+
+    def _at_delimiter(
+        self,
+        token: Token,
+        following: Token | None,
+        start: int,
+        stop: int,
+        statements: list[ScriptStatement],
+    ) -> bool:
+        """Consume *token*, spanning ``[start, stop)``; end the statement
+        if the delimiter begins inside it.
+
+        :returns: ``True`` if a statement ended at this token.
+        """
+        if self.delimiter == DEFAULT_DELIMITER:
+            self._track_blocks(token, following)
+        position = -1
+        if token.token_type not in _QUOTED_TOKENS and self._depth == 0:
+            end = stop - 1 + len(self.delimiter)
+            position = self._buffer.find(self.delimiter, start, end)
+        if position < 0:
+            self._has_tokens = True
+            return False
+        if self._has_tokens or position > start:
+            self._emit(self._start, position, statements)
+        self._has_tokens = False
+        self._begin(position + len(self.delimiter))
+        return True
+
+    def _track_blocks(self, token: Token, following: Token | None) -> None:
+        """Update the ``BEGIN``/``CASE`` ... ``END`` nesting depth."""
+        after_end, self._after_end = self._after_end, False
+        kind = token.token_type
+        next_word = following.text.upper() if following is not None else ""
+        if kind is TokenType.END:
+            if next_word not in _END_SUFFIXES:
+                self._depth = max(self._depth - 1, 0)
+            self._after_end = True
+        elif kind is TokenType.CASE and not after_end:
+            self._depth += 1
+        elif kind is TokenType.BEGIN and self._opens_block(following):
+            self._depth += 1
+
+    @staticmethod
+    def _opens_block(following: Token | None) -> bool:
+        """Tell ``BEGIN ... END`` blocks from ``BEGIN [TRANSACTION]``."""
+        if following is None or following.token_type is TokenType.SEMICOLON:
+            return False
+        return following.text.upper() not in _TRANSACTION_WORDS
+
+    def _switch_delimiter(self) -> bool:
+        """Apply a ``DELIMITER`` directive starting the current statement."""
+        if self._has_tokens:
+            return False
+        match = _DELIMITER_DIRECTIVE.match(self._buffer, self._scan_from, self._limit)
+        if match is None:
+            return False
+        self.delimiter = match.group(1)
+        self._depth = 0
+        self._begin(match.end())
+        return True
+
+    def _tokenizer(self, sql: str) -> Tokenizer:
+        dialect = self._dialect
+        if dialect is None:
+            # back-ticks quote identifiers only in the MySQL tokenizer
+            dialect = "mysql" if "`" in sql else _tokenizer_dialect(sql)
+        return Dialect.get_or_raise(dialect).tokenizer()
+
+    def _block(self, start: int) -> None:
+        """Wait for the end of the token the tokenizer could not finish.
+
+        :param start: Buffer offset just past the complete tokens before it.
+        """
+        match = _UNTERMINATED.match(self._buffer, start, self._limit)
+        if match is None:
+            self._closer = ""  # unknown: retry once the text has doubled
+        else:
+            opening = match.group(match.lastindex or 0)
+            self._closer = _CLOSERS.get(opening, opening)
+        # the closer may already be in the text after the last line break
+        self._carry = self._buffer[self._limit - len(self._closer) + 1 :]
+        self._checked = 0
+        self._retry_size = self._limit - self._scan_from
+
+    def _blocked(self) -> bool:
+        """Tell whether the pending chunks cannot finish a blocked token."""
+        closer = self._closer
+        if closer is None:
+            return False
+        for chunk in self._chunks[self._checked :]:
+            self._retry_size -= len(chunk)
+            text = self._carry + chunk
+            if (closer and closer in text) or self._retry_size <= 0:
+                self._closer = None
+                return False
+            self._carry = text[len(text) - len(closer) + 1 :] if closer else ""
+        self._checked = len(self._chunks)
+        return True
+
+    # -- output -------------------------------------------------------------
+
+    def _begin(self, start: int) -> None:
+        """Start the next statement at buffer offset *start*."""
+        self._start = self._scan_from = start
+        self._head.clear()
+        self._head_size = 0
+
+    def _emit(self, start: int, end: int, statements: list[ScriptStatement]) -> None:
+        # the head, if any, directly precedes start == 0
+        text = "".join(self._head) + self._buffer[start:end]
+        stripped = text.lstrip()
+        offset = self._offset + start - self._head_size + len(text) - len(stripped)
+        statements.append(ScriptStatement(offset, stripped.rstrip()))
+
+    def _flush(self, statements: list[ScriptStatement]) -> None:
+        """Emit what is left after the last delimiter, if anything."""
+        rest = self._buffer[self._start :]
+        if (self._has_tokens or self._untokenized) and (
+            rest.strip() or any(part.strip() for part in self._head)
+        ):
+            self._emit(self._start, len(self._buffer), statements)
+        self._begin(len(self._buffer))
+        self._has_tokens = self._untokenized = False
+        self._closer = None
+
+    def _compact(self) -> None:
+        """Drop the text before the current statement, set its scanned text
+        aside and keep only the text still to be scanned."""
+        cut = self._scan_from
+        if not cut:
+            return
+        if self._start < cut:
+            piece = self._buffer[self._start : cut]
+            self._head.append(piece)
+            self._head_size += len(piece)
+        self._buffer = self._buffer[cut:]
+        self._offset += cut
+        self._start = self._scan_from = 0
+
+
+class ScriptParser:
+    """Iterate over the statements of a SQL script as :class:`Parser` objects.
+
+    Each statement is handed to its own ``Parser`` (with the given
+    options); nothing is parsed until one of its properties is read.
+    Empty statements and statements holding only comments are skipped.
+
+    :param script: The script as one string, or an iterable of chunks
+        (e.g. a text file, which yields lines).
+    :type script: str | Iterable[str]
+    :param delimiter: Statement delimiter, ``;`` by default.
+    :type delimiter: str
+    :param dialect_hint: sqlglot dialect passed to each ``Parser``; its
+        tokenizer is also used for splitting (e.g. ``"mysql"`` for
+        backslash-escaped quotes in ``mysqldump`` output).
+    :type dialect_hint: DialectType
+    :param source: Source key passed to each ``Parser``.
+    :type source: Hashable | None
+    :param disable_logging: Passed to each ``Parser``.
+    :type disable_logging: bool
+    """
+
+    def __init__(
+        self,
+        script: str | Iterable[str],
+        delimiter: str = DEFAULT_DELIMITER,
+        dialect_hint: DialectType = None,
+        source: Hashable | None = None,
+        disable_logging: bool = False,
+    ) -> None:
+        self._script = script
+        self._delimiter = delimiter
+        self._dialect_hint = dialect_hint
+        self._source = source
+        self._disable_logging = disable_logging
+
+    def statements(self) -> Iterator[ScriptStatement]:
+        """Yield the statements of the script with their offsets.
+
+        :rtype: Iterator[ScriptStatement]
+        """
+        splitter = StatementSplitter(self._delimiter, self._dialect_hint)
+        chunks = self._script
+        if isinstance(chunks, str):
+            chunks = io.StringIO(chunks)  # scan line by line
+        for chunk in chunks:
+            yield from splitter.feed(chunk)
+        yield from splitter.close()
+
+    def __iter__(self) -> Iterator["Parser"]:
+        from sql_metadata.parser import Parser
+
+        for statement in self.statements():
+            yield Parser(
+                statement.sql,
+                disable_logging=self._disable_logging,
+                dialect_hint=self._dialect_hint,
+                source=self._source,
+            )
@@ -10,10 +10,11 @@ import re
 from typing import NamedTuple
 
 from sqlglot.errors import TokenError
-from sqlglot.tokens import Tokenizer, TokenType
+from sqlglot.tokens import TokenType
 
 from sql_metadata.comments import strip_comments_for_parsing as _strip_comments
 from sql_metadata.exceptions import InvalidQueryDefinition
+from sql_metadata.token_stream import TokenStream
 from sql_metadata.utils import DOT_PLACEHOLDER
 
 
@@ -123,7 +124,7 @@ class SqlCleaner:
     """
 
     @staticmethod
-    def preprocess_query(sql: str) -> str:
+    def preprocess_query(sql: str, stream: TokenStream | None = None) -> str:
         """Normalise quoting and whitespace in raw SQL.
 
         Walks sqlglot's tokenizer output, emitting each token's original
@@ -135,6 +136,8 @@ class SqlCleaner:
 
         :param sql: Raw SQL string.
         :type sql: str
+        :param stream: Token stream of *sql* to reuse, if any.
+        :type stream: TokenStream | None
         :returns: The normalised SQL string, or ``""`` for empty input.
         :rtype: str
         """
@@ -145,7 +148,7 @@ class SqlCleaner:
             # tokenizer reclassifies ``"X"`` as a STRING token (because
             # MySQL with ANSI_QUOTES off treats double-quotes as strings),
             # which would skip the identifier rewrite below.
-            tokens = list(Tokenizer().tokenize(sql))
+            tokens = TokenStream.of(sql, stream).tokenize()
         except TokenError:
             # Malformed SQL — fall back to plain whitespace collapse.
             return re.sub(r" {2,}", " ", sql.replace("\n", " ")).strip()
@@ -168,7 +171,7 @@ class SqlCleaner:
         return re.sub(r" {2,}", " ", "".join(parts))
 
     @staticmethod
-    def clean(sql: str) -> CleanResult:
+    def clean(sql: str, stream: TokenStream | None = None) -> CleanResult:
         """Apply all preprocessing steps to raw SQL.
 
         Steps (in order):
@@ -183,6 +186,9 @@ class SqlCleaner:
 
         :param sql: Raw SQL string.
         :type sql: str
+        :param stream: Token stream of *sql*, reused for comment stripping
+            unless one of the rewrites above changed the SQL.
+        :type stream: TokenStream | None
         :returns: Cleaning result with preprocessed SQL (``None`` if
             effectively empty), replace flag, and CTE name map.
         :rtype: CleanResult
@@ -211,7 +217,7 @@ class SqlCleaner:
             flags=re.DOTALL,
         )
 
-        clean_sql = _strip_comments(sql)
+        clean_sql = _strip_comments(sql, stream)
         if not clean_sql.strip():
             return CleanResult(sql=None, is_replace=is_replace, cte_name_map={})
 
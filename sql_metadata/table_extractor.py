@@ -9,9 +9,12 @@ regex scan of the raw SQL.  CTE names are excluded from the result so
 that only *real* tables are reported.
 """
 
+from typing import cast
+
 from sqlglot import exp
 from sqlglot.dialects.dialect import DialectType
 
+from sql_metadata.ast_index import ASTIndex
 from sql_metadata.utils import UniqueList
 
 # ---------------------------------------------------------------------------
@@ -119,6 +122,7 @@ class TableExtractor:
     :param ast: Root AST node produced by sqlglot.
     :param cte_names: Set of CTE names to exclude from the result.
     :param dialect: The dialect used to parse the AST.
+    :param index: Node index of *ast*; built on demand when not given.
     """
 
     def __init__(
@@ -126,16 +130,17 @@ class TableExtractor:
         ast: exp.Expression,
         cte_names: set[str] | None = None,
         dialect: DialectType = None,
+        index: ASTIndex | None = None,
     ):
         self._ast = ast
         self._cte_names = cte_names or set()
+        self._index = index
 
         from sql_metadata.dialect_parser import BracketedTableDialect
 
         self._bracket_mode = isinstance(dialect, type) and issubclass(
             dialect, BracketedTableDialect
         )
-        self._cached_table_nodes: list[exp.Table] | None = None
 
     # -------------------------------------------------------------------
     # Public API
@@ -163,10 +168,10 @@ class TableExtractor:
             create_target = self._extract_create_target()
 
         tables_with_pos: list[tuple[str, int]] = []
-        for node in self._table_nodes():
-            name = self._table_full_name(node)
+        for table, start in self._table_entries():
+            name = self._table_full_name(table)
             if name and name not in self._cte_names:
-                tables_with_pos.append((name, self._table_start_position(node)))
+                tables_with_pos.append((name, start or 0))
         tables_with_pos.sort(key=lambda pair: pair[1])
         sorted_names = [name for name, _ in tables_with_pos]
         return UniqueList(
@@ -188,7 +193,7 @@ class TableExtractor:
         :returns: Mapping of ``{alias: table_name}``.
         """
         aliases = {}
-        for table in self._table_nodes():
+        for table, _ in self._table_entries():
             alias = table.alias
             if not alias:
                 # e.g. SELECT * FROM users — no alias, skip
@@ -226,19 +231,23 @@ class TableExtractor:
         name = self._table_full_name(target_table)
         return name or None
 
-    def _table_nodes(self) -> list[exp.Table]:
-        """Return all ``exp.Table`` nodes from the AST (cached).
+    def _table_entries(self) -> list[tuple[exp.Table, int | None]]:
+        """Return all ``exp.Table`` nodes of the AST from its index.
 
-        Uses ``find_all(exp.Table)`` which performs a DFS traversal, finding
-        tables in subqueries, CTEs, and joins.  Results are cached so
-        repeated calls (from :meth:`extract_aliases`, :meth:`_collect_all`)
-        don't re-walk the tree.
+        The index is built on first use (unless one was passed in) with a
+        single walk, finding tables in subqueries, CTEs, and joins, in
+        ``find_all`` (breadth-first) order, each paired with the
+        character position of the table name (see
+        :attr:`IndexedNode.start <sql_metadata.ast_index.IndexedNode>`).
 
-        :returns: List of ``exp.Table`` AST nodes.
+        :returns: ``(table, start)`` pairs.
         """
-        if self._cached_table_nodes is None:
-            self._cached_table_nodes = list(self._ast.find_all(exp.Table))
-        return self._cached_table_nodes
+        if self._index is None:
+            self._index = ASTIndex(self._ast)
+        return [
+            (cast(exp.Table, entry.node), entry.start)
+            for entry in self._index.entries(exp.Table)
+        ]
 
     # -------------------------------------------------------------------
     # Table name construction
@@ -277,31 +286,3 @@ class TableExtractor:
         return _assemble_dotted_name(
             table.catalog, table.db, name, preserve_empty=has_double_dot
         )
-
-    # -------------------------------------------------------------------
-    # Position detection
-    # -------------------------------------------------------------------
-
-    @staticmethod
-    def _table_start_position(table: exp.Table) -> int:
-        """Return the earliest identifier start position for *table*.
-
-        sqlglot's tokenizer attaches ``meta['start']`` (0-based character
-        offset in the raw SQL) to every ``exp.Identifier`` it produces.
-        A qualified name like ``catalog.db.name`` has three Identifier
-        children inside ``exp.Table.args``; we take the minimum so the
-        whole reference sorts by its leftmost character.
-
-        Tables without any positioned identifier (e.g. AST nodes built
-        programmatically rather than parsed) sort to the front via ``0``.
-
-        :param table: An ``exp.Table`` AST node.
-        :returns: Character position (0-based) of the first identifier.
-        """
-        positions = [
-            n.meta["start"]
-            for key in ("catalog", "db", "this")
-            if isinstance((n := table.args.get(key)), exp.Identifier)
-            and "start" in n.meta
-        ]
-        return min(positions) if positions else 0
@@ -0,0 +1,90 @@
+"""Tokenize a SQL string once per tokenizer flavour and share the result.
+
+A single :class:`~sql_metadata.parser.Parser` needs the tokens of its query
+in several places — comment extraction and stripping, quoting
+normalisation (:attr:`Parser.query`), :attr:`Parser.tokens`,
+:class:`~sql_metadata.generalizator.Generalizator` and the sqlglot parse
+itself.  :class:`TokenStream` memoises the token list of one SQL string
+per sqlglot dialect, so each flavour (e.g. default and MySQL) is
+tokenized at most once and the parse is fed the already tokenized input.
+"""
+
+from sqlglot.dialects.dialect import Dialect, DialectType
+from sqlglot.errors import TokenError
+from sqlglot.tokens import Token
+
+#: Dialect instances by name (``None`` for the default dialect).
+_DIALECTS: dict[str | None, Dialect] = {}
+
+
+def get_dialect(dialect: DialectType) -> Dialect:
+    """Return a :class:`Dialect` instance for *dialect*, reusing named ones.
+
+    ``Dialect.get_or_raise`` builds a new instance on every call; the
+    instances of dialects given by name are kept and shared instead, as
+    dialects hold no per-query state.
+
+    :param dialect: A sqlglot dialect name, class, instance or ``None``.
+    :type dialect: DialectType
+    :rtype: Dialect
+    """
+    if dialect is not None and not isinstance(dialect, str):
+        return Dialect.get_or_raise(dialect)
+    instance = _DIALECTS.get(dialect)
+    if instance is None:
+        instance = _DIALECTS[dialect] = Dialect.get_or_raise(dialect)
+    return instance
+
+
+class TokenStream:
+    """Memoised sqlglot token lists of one SQL string.
+
+    Token lists are shared between consumers and must not be mutated.
+    Tokenization errors are memoised too and re-raised on every call.
+
+    :param sql: The SQL string to tokenize.
+    :type sql: str
+    """
+
+    def __init__(self, sql: str) -> None:
+        self.sql = sql
+        self._tokens: dict[type[Dialect], list[Token] | TokenError] = {}
+
+    @classmethod
+    def of(cls, sql: str, stream: "TokenStream | None" = None) -> "TokenStream":
+        """Return *stream* if it tokenizes *sql*, otherwise a new stream.
+
+        Lets helpers accept an optional stream for SQL that a caller may
+        have rewritten in the meantime (e.g. ``REPLACE INTO`` cleaning).
+
+        :param sql: The SQL string to tokenize.
+        :type sql: str
+        :param stream: A candidate stream to reuse.
+        :type stream: TokenStream | None
+        :rtype: TokenStream
+        """
+        if stream is not None and stream.sql == sql:
+            return stream
+        return cls(sql)
+
+    def tokenize(self, dialect: DialectType = None) -> list[Token]:
+        """Return the tokens of :attr:`sql` for *dialect*'s tokenizer.
+
+        :param dialect: A sqlglot dialect name, class or ``None`` for the
+            default dialect.
+        :type dialect: DialectType
+        :rtype: list[Token]
+        :raises TokenError: If the SQL cannot be tokenized.
+        """
+        instance = get_dialect(dialect)
+        key = type(instance)
+        tokens = self._tokens.get(key)
+        if tokens is None:
+            try:
+                tokens = instance.tokenize(self.sql)
+            except TokenError as exc:
+                tokens = exc
+            self._tokens[key] = tokens
+        if isinstance(tokens, TokenError):
+            raise tokens.with_traceback(None)
+        return tokens
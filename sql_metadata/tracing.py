@@ -0,0 +1,191 @@
+"""Record the pipeline stages of a run as a Chrome trace.
+
+Inside :func:`tracing`, every stage reported by
+:mod:`~sql_metadata.instrumentation` — cleaning, each dialect attempt,
+the extractors, nested resolution and the construction of sub-parsers,
+plus one ``statement`` span per statement of
+:func:`~sql_metadata.batch.parse_many` — becomes a complete (``"X"``)
+event of the `Trace Event Format`_, which ``chrome://tracing`` and
+https://ui.perfetto.dev open locally::
+
+    from sql_metadata import parse_many
+    from sql_metadata.tracing import tracing
+
+    with tracing("parse-run.json"):
+        for result in parse_many(log, workers=8):
+            ...
+
+Spans of one thread nest by time, so the stages of a sub-parser show up
+inside the ``resolve_nested`` span of its parent.  Each process streams
+its events to a part file next to the output — ``parse_many`` workers,
+threads or processes, included — and the parts are merged into the
+output file when the block exits, so memory use does not grow with the
+length of the run.
+
+.. _Trace Event Format: https://docs.google.com/document/d/
+   1CvAClvFfyA5R-PhYUmn5OOQtYMH4h6I0nSsKchNAySU
+"""
+
+import json
+import os
+import shutil
+import tempfile
+import threading
+from collections.abc import Iterator
+from contextlib import contextmanager
+from typing import Any
+
+from sql_metadata.instrumentation import StageEvent, add_observer, remove_observer
+
+#: Directory of the part files while :func:`tracing` runs in this process.
+_trace_dir: str | None = None
+
+_writer: "TraceWriter | None" = None
+_writer_lock = threading.Lock()
+
+
+def chrome_event(event: StageEvent, pid: int, tid: int) -> dict[str, Any]:
+    """Convert *event* to a complete event of the Trace Event Format.
+
+    :param event: A finished stage.
+    :type event: StageEvent
+    :param pid: Process the stage ran in.
+    :type pid: int
+    :param tid: Native id of the thread the stage ran in.
+    :type tid: int
+    :rtype: dict[str, Any]
+    """
+    return {
+        "name": event.name,
+        "cat": "sql_metadata",
+        "ph": "X",
+        "ts": event.start_ns / 1000,
+        "dur": event.wall_ns / 1000,
+        "pid": pid,
+        "tid": tid,
+        "args": {**event.attributes, "cpu_us": event.cpu_ns / 1000},
+    }
+
+
+class TraceWriter:
+    """Observer appending each stage to *path* as one JSON line.
+
+    Events reported by a forked child, which inherits the observer, are
+    ignored: the child writes its own part file.
+
+    :param path: File the events are appended to.
+    :type path: str
+    """
+
+    def __init__(self, path: str) -> None:
+        self._file = open(path, "a", encoding="utf-8")
+        self._lock = threading.Lock()
+        self._pid = os.getpid()
+
+    def __call__(self, event: StageEvent) -> None:
+        if os.getpid() != self._pid:
+            return
+        line = json.dumps(
+            chrome_event(event, self._pid, threading.get_native_id()), default=str
+        )
+        with self._lock:
+            self._file.write(line + "\n")
+
+    def flush(self) -> None:
+        """Write buffered events to the file."""
+        with self._lock:
+            self._file.flush()
+
+    def close(self) -> None:
+        """Flush and close the file."""
+        with self._lock:
+            self._file.close()
+
+
+def current_trace_dir() -> str | None:
+    """Return the part directory of the active trace, if any.
+
+    :rtype: str | None
+    """
+    return _trace_dir
+
+
+def record_trace(directory: str) -> None:
+    """Stream this process's stages to a part file in *directory*.
+
+    Called by :func:`tracing` and by ``parse_many`` workers; does nothing
+    if the process already writes a part file.
+
+    :param directory: Part directory of the trace.
+    :type directory: str
+    """
+    global _writer
+    with _writer_lock:
+        if _writer is None:
+            _writer = TraceWriter(os.path.join(directory, f"{os.getpid()}.jsonl"))
+            add_observer(_writer)
+
+
+def flush_trace() -> None:
+    """Write the buffered events of this process to its part file."""
+    writer = _writer
+    if writer is not None:
+        writer.flush()
+
+
+def _stop_recording() -> None:
+    global _writer
+    with _writer_lock:
+        writer, _writer = _writer, None
+    if writer is not None:
+        remove_observer(writer)
+        writer.close()
+
+
+def _reset_after_fork() -> None:
+    """Forget the parent's writer (flushed before the fork) in a child."""
+    global _writer, _writer_lock
+    _writer = None
+    _writer_lock = threading.Lock()
+
+
+os.register_at_fork(before=flush_trace, after_in_child=_reset_after_fork)
+
+
+@contextmanager
+def tracing(path: str | os.PathLike[str]) -> Iterator[None]:
+    """Record the stages run inside the block into the trace file *path*.
+
+    :param path: Output JSON file, overwritten.
+    :type path: str | os.PathLike[str]
+    :raises RuntimeError: If a trace is already being recorded.
+    """
+    global _trace_dir
+    if _trace_dir is not None:
+        raise RuntimeError("A trace is already being recorded")
+    path = os.path.abspath(path)
+    directory = tempfile.mkdtemp(
+        prefix=".sql-metadata-trace-", dir=os.path.dirname(path)
+    )
+    _trace_dir = directory
+    record_trace(directory)
+    try:
+        yield
+    finally:
+        _trace_dir = None
+        _stop_recording()
+        _merge(directory, path)
+        shutil.rmtree(directory)
+
+
+def _merge(directory: str, path: str) -> None:
+    """Join the part files of *directory* into one trace file."""
+    separator = ""
+    with open(path, "w", encoding="utf-8") as output:
+        output.write('{"displayTimeUnit": "ms", "traceEvents": [')
+        for name in sorted(os.listdir(directory)):
+            with open(os.path.join(directory, name), encoding="utf-8") as part:
+                for line in part:
+                    output.write(separator + line.rstrip("\n"))
+                    separator = ",\n"
+        output.write("]}\n")
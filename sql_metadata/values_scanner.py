@@ -0,0 +1,304 @@
+"""Stream the rows of ``INSERT ... VALUES`` statements without an AST.
+
+Building a sqlglot AST for an extended insert from a dump costs far more
+memory than its text — a 50 MB statement needs gigabytes.
+:class:`ValuesScanner` walks the ``VALUES`` section token by token
+instead, tokenizing a window of the text at a time, and converts one row
+at a time with the rules of :meth:`Parser._convert_value
+<sql_metadata.parser.Parser._convert_value>`.  Only values that are not
+plain literals (function calls, expressions) are parsed, one by one.
+
+The scanner also provides the statement *head* — the text before and
+after the rows plus the first row (and any row referencing columns or
+subqueries) — which :meth:`Parser.iter_values
+<sql_metadata.parser.Parser.iter_values>` parses instead of the whole
+statement to answer ``tables``, ``columns`` and friends.
+"""
+
+from collections.abc import Iterator
+from typing import Any, cast
+
+import sqlglot
+from sqlglot import exp
+from sqlglot.dialects.dialect import Dialect, DialectType
+from sqlglot.errors import ParseError, TokenError
+from sqlglot.tokens import Token, TokenType
+
+from sql_metadata.comments import _literal_dialect, _tokenizer_dialect
+from sql_metadata.exceptions import InvalidQueryDefinition
+
+#: Characters tokenized at a time; grown for tokens longer than that.
+DEFAULT_WINDOW = 1 << 16
+
+#: Prepended to windows that do not start the statement, so that their
+#: first token is never taken for a command (e.g. ``REPLACE(...)`` in
+#: MySQL, which would turn the rest of the window into one string).
+_WINDOW_PREFIX = "0 "
+
+#: Statements whose ``VALUES`` rows can be streamed.
+_INSERT_TOKENS = frozenset({TokenType.INSERT, TokenType.REPLACE})
+
+#: Bases of the integers hex and bit string literals convert to.
+_LITERAL_BASES = {TokenType.HEX_STRING: 16, TokenType.BIT_STRING: 2}
+
+#: Tokens whose text is the value: plain, national and escape strings.
+_TEXT_TOKENS = (TokenType.STRING, TokenType.NATIONAL_STRING, TokenType.BYTE_STRING)
+
+#: Keyword values, rendered as :meth:`Parser._convert_value` does.
+_KEYWORD_VALUES = {
+    TokenType.NULL: "NULL",
+    TokenType.TRUE: "TRUE",
+    TokenType.FALSE: "FALSE",
+}
+
+
+def scan_dialect(sql: str, dialect_hint: DialectType = None) -> DialectType:
+    """Pick the dialect for scanning the rows of *sql*.
+
+    Without a hint, MySQL's tokenizer is used for back-tick quoted
+    identifiers, backslash-escaped quotes (as written by ``mysqldump``),
+    hex and bit literals and ``#`` comments, Postgres' one for ``E'...'``
+    escape strings and the default one otherwise.
+
+    :param sql: The whole statement.
+    :type sql: str
+    :param dialect_hint: Dialect given by the caller, used as-is.
+    :type dialect_hint: DialectType
+    :rtype: DialectType
+    """
+    if dialect_hint is not None:
+        return dialect_hint
+    literal_dialect = _literal_dialect(sql)
+    if literal_dialect:
+        return literal_dialect
+    if "`" in sql or "\\'" in sql:
+        return "mysql"
+    return _tokenizer_dialect(sql)
+
+
+class ValuesScanner:
+    """Find the ``VALUES`` rows of an INSERT/REPLACE and convert them lazily.
+
+    :param sql: The whole statement.
+    :type sql: str
+    :param dialect: sqlglot dialect used to tokenize the rows and to parse
+        values that are not plain literals.
+    :type dialect: DialectType
+    :param window: Number of characters tokenized at a time.
+    :type window: int
+    """
+
+    def __init__(
+        self, sql: str, dialect: DialectType = None, window: int = DEFAULT_WINDOW
+    ) -> None:
+        self._sql = sql
+        self._dialect = Dialect.get_or_raise(dialect)
+        self._window = window
+        #: Offset right after the ``VALUES`` keyword.
+        self._rows_start: int | None = None
+        #: Text spans of the rows kept in the head, and where the text
+        #: following the rows starts (``None`` until the rows were read).
+        self._head_rows: list[tuple[int, int]] = []
+        self._tail: int | None = None
+
+    def locate(self) -> bool:
+        """Find the ``VALUES`` keyword of the statement.
+
+        Only the text before it is tokenized; scanning stops at a
+        top-level ``SELECT`` (``INSERT ... SELECT`` has no rows to stream).
+
+        :returns: ``True`` if the statement is an INSERT/REPLACE with a
+            top-level ``VALUES`` clause.
+        :rtype: bool
+        """
+        first = next(self._tokens(0), None)
+        if first is None or first.token_type not in _INSERT_TOKENS:
+            return False
+        depth = 0
+        for token in self._tokens(first.end + 1):
+            kind = token.token_type
+            if kind is TokenType.L_PAREN:
+                depth += 1
+            elif kind is TokenType.R_PAREN:
+                depth -= 1
+            elif depth == 0 and kind is TokenType.VALUES:
+                self._rows_start = token.end + 1
+                return True
+            elif depth == 0 and kind in (TokenType.SELECT, TokenType.SEMICOLON):
+                break
+        return False
+
+    def rows(self) -> Iterator[list[Any]]:
+        """Yield the converted rows, one list per row.
+
+        Each call scans the rows again.  Requires a successful
+        :meth:`locate`.
+
+        :rtype: Iterator[list[Any]]
+        :raises InvalidQueryDefinition: If the text cannot be tokenized,
+            e.g. because of an unterminated string.
+        """
+        head_rows: list[tuple[int, int]] = []
+        for start, end, values in self._split_rows():
+            row = []
+            referencing = not head_rows
+            for tokens in values:
+                if tokens:
+                    value, references = self._convert(tokens)
+                    row.append(value)
+                    referencing = referencing or references
+            if referencing:
+                head_rows.append((start, end))
+            yield row
+        self._head_rows = head_rows
+
+    def head(self) -> str:
+        """Return the statement with only the rows its metadata depends on.
+
+        These are the first row and any row referencing columns or
+        subqueries; the rows are read first if :meth:`rows` has not been
+        exhausted yet.
+
+        :rtype: str
+        """
+        assert self._rows_start is not None
+        if self._tail is None:
+            for _ in self.rows():
+                pass
+        assert self._tail is not None
+        rows = ", ".join(self._sql[start:end] for start, end in self._head_rows)
+        return f"{self._sql[: self._rows_start]} {rows} {self._sql[self._tail :]}"
+
+    # -- tokens -------------------------------------------------------------
+
+    def _split_rows(self) -> Iterator[tuple[int, int, list[list[Token]]]]:
+        """Yield the span and the tokens of each value of every row.
+
+        Sets :attr:`_tail` to the offset of the first token following
+        the rows (or the end of the text) once the rows are exhausted.
+        """
+        assert self._rows_start is not None
+        tokens = self._tokens(self._rows_start)
+        for token in tokens:
+            if token.token_type is TokenType.COMMA:
+                continue
+            if token.token_type is not TokenType.L_PAREN:
+                self._tail = token.start
+                return
+            values, end = self._row_values(tokens)
+            if end is None:
+                break  # unterminated row
+            yield token.start, end, values
+        self._tail = len(self._sql)
+
+    def _row_values(
+        self, tokens: Iterator[Token]
+    ) -> tuple[list[list[Token]], int | None]:
+        """Consume one row up to its closing parenthesis.
+
+        :returns: The tokens of each value and the offset after the row,
+            ``None`` if the row is not closed.
+        """
+        values: list[list[Token]] = [[]]
+        depth = 1
+        for token in tokens:
+            kind = token.token_type
+            if kind is TokenType.L_PAREN:
+                depth += 1
+            elif kind is TokenType.R_PAREN:
+                depth -= 1
+                if depth == 0:
+                    return values, token.end + 1
+            elif kind is TokenType.COMMA and depth == 1:
+                values.append([])
+                continue
+            values[-1].append(token)
+        return values, None
+
+    def _tokens(self, position: int) -> Iterator[Token]:
+        """Yield the tokens from *position* on, with offsets into the SQL."""
+        while position < len(self._sql):
+            tokens, position = self._window_tokens(position)
+            yield from tokens
+
+    def _window_tokens(self, position: int) -> tuple[list[Token], int]:
+        """Tokenize a window of the text starting at *position*.
+
+        The last token of a window may be cut short, so it is left for
+        the next window; the window grows until it holds a complete token.
+
+        :returns: The tokens, with offsets into the SQL, and the start of
+            the next window.
+        """
+        sql = self._sql
+        prefix = _WINDOW_PREFIX if position else ""
+        window = self._window
+        while True:
+            end = position + window
+            final = end >= len(sql)
+            try:
+                tokens = self._dialect.tokenize(prefix + sql[position:end])
+            except TokenError as error:
+                if final:
+                    raise InvalidQueryDefinition(
+                        "Query could not be parsed — SQL syntax error"
+                    ) from error
+                window *= 2  # a string or comment longer than the window
+                continue
+            tokens = tokens[1:] if prefix else tokens
+            if final or len(tokens) > 1:
+                break
+            window *= 2
+        shift = position - len(prefix)
+        following = len(sql) if final else tokens.pop().start + shift
+        for token in tokens:
+            token.start += shift
+            token.end += shift
+        return tokens, following
+
+    # -- conversion ---------------------------------------------------------
+
+    def _convert(self, tokens: list[Token]) -> tuple[Any, bool]:
+        """Convert the tokens of one value like :meth:`Parser._convert_value`.
+
+        :returns: The value, and whether it references columns or
+            subqueries (and so matters for the statement's metadata).
+        """
+        if len(tokens) == 1:
+            token = tokens[0]
+            if token.token_type in _TEXT_TOKENS:
+                return token.text, False
+            if token.token_type in _LITERAL_BASES:
+                base = _LITERAL_BASES[token.token_type]
+                return int(token.text or "0", base), False
+            if token.token_type is TokenType.NUMBER:
+                return _number(token.text), False
+            if token.token_type in _KEYWORD_VALUES:
+                return _KEYWORD_VALUES[token.token_type], False
+        elif (
+            len(tokens) == 2
+            and tokens[0].token_type is TokenType.DASH
+            and tokens[1].token_type is TokenType.NUMBER
+        ):
+            return -_number(tokens[1].text), False
+        return self._parse_value(self._sql[tokens[0].start : tokens[-1].end + 1])
+
+    def _parse_value(self, text: str) -> tuple[Any, bool]:
+        from sql_metadata.parser import Parser
+
+        try:
+            # parsed as a projection: a leading ``REPLACE(`` is no command
+            select = sqlglot.parse_one(f"SELECT {text}", read=self._dialect)
+        except ParseError:
+            return text, True
+        node = cast(exp.Expression, select.expressions[0])
+        referencing = node.find(exp.Column, exp.Select) is not None
+        return Parser._convert_value(node), referencing
+
+
+def _number(text: str) -> int | float:
+    """Convert a numeric literal the way sqlglot's ``Literal.is_int`` does."""
+    try:
+        return int(text)
+    except ValueError:
+        return float(text)
@@ -0,0 +1,174 @@
+import asyncio
+import os
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import pytest
+
+import sql_metadata.aio
+import sql_metadata.batch
+from sql_metadata import ParseResult, QueryType, parse_many
+from sql_metadata.aio import AsyncParser, aparse, aparse_many
+
+QUERIES = [
+    "SELECT a, b FROM t1",
+    "INSERT INTO t2 (x) VALUES (1)",
+    "SELECT * FROM t WHERE a = 'x",
+    "SELECT c FROM t3 JOIN t4 ON t3.id = t4.id",
+] * 3
+
+
+async def _collect(results):
+    return [result async for result in results]
+
+
+def test_aparse():
+    result = asyncio.run(aparse("SELECT a FROM t", fields=["query_type", "tables"]))
+    assert result == ParseResult(0, {"query_type": QueryType.SELECT, "tables": ["t"]})
+    with pytest.raises(ValueError, match="Unknown fields: nope"):
+        asyncio.run(aparse("SELECT a FROM t", fields=["nope"]))
+
+
+def test_aparse_many_matches_parse_many():
+    expected = list(parse_many(QUERIES, workers=1))
+
+    async def statements():
+        for sql in QUERIES:
+            yield sql
+
+    assert asyncio.run(_collect(aparse_many(QUERIES, concurrency=3))) == expected
+    assert asyncio.run(_collect(aparse_many(statements()))) == expected
+    unordered = asyncio.run(_collect(aparse_many(QUERIES, ordered=False)))
+    assert sorted(unordered, key=lambda r: r.index) == expected
+
+
+def test_aparse_many_in_process_pool():
+    with ProcessPoolExecutor(max_workers=2) as executor:
+        results = asyncio.run(_collect(aparse_many(QUERIES, executor=executor)))
+    assert results == list(parse_many(QUERIES, workers=1))
+
+
+def _slow_parse(monkeypatch, delay, slow_sql=None):
+    running = []
+    peak = []
+    original = sql_metadata.batch.parse_one
+    lock = threading.Lock()
+
+    def slow(index, sql, fields):
+        with lock:
+            running.append(index)
+            peak.append(len(running))
+        if slow_sql in (None, sql):
+            time.sleep(delay)
+        with lock:
+            running.remove(index)
+        return original(index, sql, fields)
+
+    monkeypatch.setattr("sql_metadata.aio.parse_one", slow)
+    return peak
+
+
+def test_bounded_concurrency_and_backpressure(monkeypatch):
+    peak = _slow_parse(monkeypatch, 0.01)
+    consumed = []
+
+    def statements():
+        for index in range(40):
+            consumed.append(index)
+            yield f"SELECT a FROM t{index}"
+
+    async def first():
+        results = aparse_many(statements(), concurrency=3)
+        result = await results.__anext__()
+        await results.aclose()
+        return result
+
+    assert asyncio.run(first()).metadata["tables"] == ["t0"]
+    assert len(consumed) == 3
+    assert max(peak) <= 3
+
+
+def test_concurrent_aparse_calls_share_one_limit(monkeypatch):
+    monkeypatch.setattr(sql_metadata.aio, "DEFAULT_CONCURRENCY", 2)
+    peak = _slow_parse(monkeypatch, 0.01)
+
+    async def run():
+        calls = [aparse(f"SELECT a FROM t{index}") for index in range(12)]
+        return await asyncio.gather(*calls)
+
+    results = asyncio.run(run())
+    assert [result.metadata["tables"] for result in results[:2]] == [["t0"], ["t1"]]
+    assert max(peak) == 2
+
+
+def test_timeout_keeps_the_slot_until_done(monkeypatch):
+    _slow_parse(monkeypatch, 0.2, slow_sql="SELECT a FROM t")
+
+    async def run():
+        parser = AsyncParser(concurrency=1, timeout=0.05)
+        timed_out = await parser.parse("SELECT a FROM t")
+        started = time.monotonic()
+        result = await parser.parse("SELECT b FROM u", fields=["tables"])
+        return timed_out, result, time.monotonic() - started
+
+    timed_out, result, waited = asyncio.run(run())
+    assert timed_out == ParseResult(
+        0, {}, "TimeoutError: parsing took longer than 0.05 s"
+    )
+    assert result.metadata == {"tables": ["u"]}
+    # the second statement waited for the first to release its slot
+    assert waited >= 0.1
+
+
+def test_cancellation_withdraws_queued_statements(monkeypatch):
+    peak = _slow_parse(monkeypatch, 0.05)
+
+    async def run():
+        parser = AsyncParser(concurrency=1)
+        first = asyncio.ensure_future(parser.parse("SELECT a FROM t"))
+        second = asyncio.ensure_future(parser.parse("SELECT b FROM u"))
+        await asyncio.sleep(0.01)
+        second.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await second
+        return await first
+
+    assert asyncio.run(run()).metadata["tables"] == ["t"]
+    assert len(peak) == 1  # the cancelled statement never ran
+
+
+def test_invalid_concurrency():
+    with pytest.raises(ValueError, match="concurrency must be positive"):
+        aparse_many(QUERIES, concurrency=0)
+
+
+def test_submit_failure_releases_the_slot():
+    executor = ProcessPoolExecutor(max_workers=1)
+    executor.shutdown()
+
+    async def run():
+        parser = AsyncParser(executor, concurrency=1)
+        for _ in range(2):
+            with pytest.raises(RuntimeError):
+                await parser.parse("SELECT a FROM t")
+
+    asyncio.run(run())
+
+
+def test_release_after_loop_closed():
+    loop = asyncio.new_event_loop()
+    loop.close()
+    sql_metadata.aio._release(loop, asyncio.Semaphore(1), None)
+
+
+def test_default_executor_is_reset_after_fork():
+    executor = sql_metadata.aio._default_executor()
+    assert sql_metadata.aio._default_executor() is executor
+    pid = os.fork()
+    if pid == 0:  # pragma: no cover - runs in the child
+        os._exit(0 if sql_metadata.aio._default_pool is None else 1)
+    _, status = os.waitpid(pid, 0)
+    assert os.waitstatus_to_exitcode(status) == 0
+    sql_metadata.aio._reset_default_executor()
+    assert sql_metadata.aio._default_pool is None
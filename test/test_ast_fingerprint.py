@@ -0,0 +1,90 @@
+import pytest
+import sqlglot
+
+from sql_metadata import Parser
+from sql_metadata.ast_fingerprint import structural_fingerprint
+
+
+@pytest.mark.parametrize(
+    "first, second",
+    [
+        (
+            "SELECT u.name FROM users u WHERE u.id = 5",
+            "select x.NAME\n  from users AS x /* c */ where x.id = 7",
+        ),
+        ('SELECT "a" FROM t', "SELECT a FROM `t`"),
+        (
+            "WITH c AS (SELECT 1 AS a) SELECT a FROM c",
+            "WITH d AS (SELECT 2 AS a) SELECT a FROM d",
+        ),
+        (
+            "SELECT s.a FROM (SELECT a FROM t) AS s",
+            "SELECT q.a FROM (SELECT a FROM t) AS q",
+        ),
+        (
+            "SELECT a FROM t WHERE b IN ('x', 'y')",
+            "SELECT a FROM t WHERE b IN ('', 'z')",
+        ),
+    ],
+)
+def test_same_shape_shares_fingerprint(first, second):
+    assert Parser(first).structural_fingerprint == (
+        Parser(second).structural_fingerprint
+    )
+
+
+@pytest.mark.parametrize(
+    "first, second",
+    [
+        ("SELECT a FROM t", "SELECT b FROM t"),
+        ("SELECT a FROM t", "SELECT DISTINCT a FROM t"),
+        ("SELECT a AS x FROM t", "SELECT a AS y FROM t"),
+        ('SELECT "A" FROM t', "SELECT a FROM t"),
+        ("SELECT a FROM t WHERE b = 1", "SELECT a FROM t WHERE b = '1'"),
+        ("SELECT a FROM t WHERE b IN (1, 2)", "SELECT a FROM t WHERE b IN (1, 2, 3)"),
+        (
+            "SELECT * FROM t JOIN u ON t.a = u.a",
+            "SELECT * FROM t LEFT JOIN u ON t.a = u.a",
+        ),
+        # a real table with the name of an alias is not renamed
+        ("SELECT * FROM a AS b JOIN b AS c", "SELECT * FROM a AS x JOIN x AS c"),
+        ("SELECT t.a FROM t", "SELECT u.a FROM u"),
+    ],
+)
+def test_different_shapes_differ(first, second):
+    assert Parser(first).structural_fingerprint != (
+        Parser(second).structural_fingerprint
+    )
+
+
+def test_fingerprint_is_stable():
+    # stored by users as a cache key: this value must not change
+    parser = Parser("SELECT u.name FROM users u WHERE u.id = 5")
+    assert parser.structural_fingerprint == 0xE1D62C67BDF0771D
+    assert parser.structural_fingerprint is parser.structural_fingerprint
+
+
+@pytest.mark.parametrize("read", ["iter_values", "values_columnar", "values"])
+def test_fingerprint_does_not_depend_on_streamed_rows(read):
+    sql = "INSERT INTO t (a, b) VALUES (1, 'x'), (2, 'y'), (3, b + 1)"
+    expected = Parser(sql).structural_fingerprint
+    parser = Parser(sql)
+    value = getattr(parser, read)
+    if callable(value):
+        list(value())
+    assert parser.structural_fingerprint == expected
+
+
+def test_deep_trees():
+    sql = "SELECT " + " + ".join(f"c{i}" for i in range(3000)) + " FROM t"
+    ast = sqlglot.parse_one(sql)
+    assert 0 <= structural_fingerprint(ast) < 2**64
+
+
+def test_extract_and_errors():
+    expected = Parser("select A from T").structural_fingerprint
+    assert Parser("SELECT a FROM t").extract(["structural_fingerprint"]) == {
+        "structural_fingerprint": expected
+    }
+    with pytest.raises(ValueError):
+        _ = Parser("").structural_fingerprint
@@ -0,0 +1,145 @@
+import pytest
+import sqlglot
+from sqlglot import exp
+
+import sql_metadata.ast_parser
+from sql_metadata import Parser
+from sql_metadata.ast_index import INDEXED_TYPES, ASTIndex
+from sql_metadata.nested_resolver import NestedResolver
+from sql_metadata.parse_cache import disable_parse_cache, enable_parse_cache
+from sql_metadata.table_extractor import TableExtractor
+
+NESTED = """
+WITH cte AS (SELECT a FROM t1)
+SELECT x.a, (SELECT max(b) FROM t2) AS m
+FROM (SELECT a FROM (SELECT a FROM cte) AS inner_q) AS x
+JOIN t3 ON t3.id = x.a
+WHERE x.a IN (SELECT id FROM t4)
+"""
+
+
+@pytest.fixture
+def index_builds(monkeypatch):
+    builds = []
+    original = ASTIndex.__init__
+
+    def counting(self, root, *args, **kwargs):
+        builds.append(root)
+        original(self, root, *args, **kwargs)
+
+    monkeypatch.setattr(ASTIndex, "__init__", counting)
+    return builds
+
+
+def test_find_all_matches_sqlglot_order():
+    ast = sqlglot.parse_one(NESTED)
+    index = ASTIndex(ast)
+    for kind in INDEXED_TYPES:
+        assert index.find_all(kind) == list(ast.find_all(kind))
+    assert index.find(exp.Select) is ast
+    assert index.find(exp.Values) is None
+    assert index.size == sum(1 for _ in ast.walk())
+
+
+def test_post_order_is_innermost_first():
+    ast = sqlglot.parse_one(NESTED)
+    aliases = [node.alias for node in ASTIndex(ast).post_order(exp.Subquery)]
+    # the scalar subquery's alias belongs to the enclosing exp.Alias
+    assert aliases == ["", "inner_q", "x", ""]
+
+
+def test_entries_carry_clause_and_position():
+    sql = "SELECT a FROM db.t WHERE b = 1 GROUP BY c ORDER BY d"
+    index = ASTIndex(sqlglot.parse_one(sql))
+    clauses = {e.node.name: e.clause for e in index.entries(exp.Column)}
+    assert clauses == {"a": "select", "b": "where", "c": "group_by", "d": "order_by"}
+    (table,) = index.entries(exp.Table)
+    assert table.start == sql.index("db.t")
+    assert index.entries(exp.Select)[0].start is None
+
+
+def test_entries_nest_by_order_and_end():
+    index = ASTIndex(sqlglot.parse_one("SELECT a FROM (SELECT b FROM t) AS s"))
+    subquery = index.entries(exp.Subquery)[0]
+    inside = [
+        e.node.name
+        for e in index.entries(exp.Column)
+        if subquery.order < e.order <= subquery.end
+    ]
+    assert inside == ["b"]
+
+
+def test_custom_types_and_unindexed_kind():
+    index = ASTIndex(sqlglot.parse_one("SELECT * FROM t AS x"), [exp.Star])
+    assert len(index.find_all(exp.Star)) == 1
+    with pytest.raises(KeyError):
+        index.find_all(exp.Table)
+
+
+def test_deep_tree_is_walked_iteratively():
+    node = exp.column("a")
+    for _ in range(5000):
+        node = exp.Paren(this=node)
+    index = ASTIndex(exp.Select(expressions=[node]))
+    assert index.size == 5003
+    assert index.entries(exp.Column)[0].depth == 5001
+
+
+def test_extractors_build_index_when_not_given():
+    ast = sqlglot.parse_one("SELECT a FROM t AS x WHERE b IN (SELECT b FROM u)")
+    assert TableExtractor(ast).extract() == ["t", "u"]
+    assert TableExtractor(ast).extract_aliases(["t"]) == {"x": "t"}
+    resolver = NestedResolver(ast, parser_factory=Parser)
+    assert resolver.extract_cte_names({}) == []
+
+
+def test_parser_walks_the_tree_once(index_builds):
+    parser = Parser(
+        "INSERT INTO t (a, b) SELECT a, b FROM u AS x WHERE x.c > 1 LIMIT 5"
+    )
+    assert parser.tables == ["t", "u"]
+    assert parser.tables_aliases == {"x": "u"}
+    assert parser.columns == ["a", "b", "u.c"]
+    assert parser.subqueries_names == []
+    assert parser.limit_and_offset == (5, 0)
+    assert parser.values == []
+    assert index_builds == [parser._ast_parser.ast]
+
+
+def test_quality_check_index_is_reused(index_builds):
+    ast_parser = sql_metadata.ast_parser.ASTParser("SELECT a FROM t WHERE b = 1")
+    assert ast_parser.ast is not None
+    # built by the degradation check of the first candidate dialect
+    assert index_builds == [ast_parser.ast]
+    assert ast_parser.index.root is ast_parser.ast
+    assert len(index_builds) == 1
+
+
+def test_parse_cache_stores_index(index_builds):
+    enable_parse_cache()
+    try:
+        sql = "SELECT a FROM t AS x JOIN u ON u.id = x.id"
+        first = Parser(sql)
+        assert first.tables == ["t", "u"]
+        second = Parser(sql)
+        assert second.tables == ["t", "u"]
+        assert second._ast_parser.index is first._ast_parser.index
+        assert len(index_builds) == 1
+    finally:
+        disable_parse_cache()
+
+
+def test_parse_cache_indexes_last_resort_dialect(index_builds):
+    enable_parse_cache()
+    try:
+        # the last candidate dialect is accepted without a quality check
+        parser = Parser("INSERT IGNORE INTO t (a) VALUES (1)")
+        assert parser._ast_parser.dialect == "mysql"
+        assert parser.values == [1]
+        assert len(index_builds) == 1
+    finally:
+        disable_parse_cache()
+
+
+def test_no_index_without_ast():
+    assert sql_metadata.ast_parser.ASTParser("").index is None
@@ -0,0 +1,80 @@
+import pickle
+
+import pytest
+
+from sql_metadata import ParseResult, Parser, QueryType, parse_many
+
+QUERIES = [
+    "SELECT a, b FROM t1",
+    "INSERT INTO t2 (x) VALUES (1)",
+    "SELECT * FROM t WHERE a = 'x",
+    "",
+    "SELECT c FROM t3 JOIN t4 ON t3.id = t4.id",
+] * 5
+
+
+def test_parse_many_in_process():
+    results = list(parse_many(QUERIES, workers=1))
+    assert [r.index for r in results] == list(range(len(QUERIES)))
+    assert results[0] == ParseResult(
+        0, {"query_type": QueryType.SELECT, "tables": ["t1"], "columns": ["a", "b"]}
+    )
+    assert type(results[0].metadata["tables"]) is list
+    assert results[1].metadata["tables"] == ["t2"]
+    # failures are reported per statement, keeping fields extracted so far
+    assert results[2].error.startswith("InvalidQueryDefinition: ")
+    assert results[3].error == (
+        "InvalidQueryDefinition: Empty queries are not supported!"
+    )
+    assert results[3].metadata == {}
+    assert results[4].error is None
+
+
+def test_parse_many_matches_parser_in_pool():
+    fields = ["tables", "columns_dict", "values_dict", "limit_and_offset"]
+    results = list(parse_many(iter(QUERIES), workers=2, fields=fields, chunksize=3))
+    assert [r.index for r in results] == list(range(len(QUERIES)))
+    expected = list(parse_many(QUERIES, workers=1, fields=fields))
+    assert results == expected
+    assert results[4].metadata["columns_dict"] == Parser(QUERIES[4]).columns_dict
+    assert pickle.loads(pickle.dumps(results[1])) == results[1]
+
+
+def test_parse_many_unordered():
+    results = list(parse_many(QUERIES, workers=2, chunksize=2, ordered=False))
+    assert sorted(r.index for r in results) == list(range(len(QUERIES)))
+    by_index = {r.index: r for r in results}
+    assert by_index[0].metadata["tables"] == ["t1"]
+
+
+def test_parse_many_streams_lazily():
+    consumed = []
+
+    def statements():
+        for index in range(1000):
+            consumed.append(index)
+            yield f"SELECT a FROM t{index}"
+
+    results = parse_many(statements(), workers=2, chunksize=10)
+    first = next(results)
+    assert first.metadata["tables"] == ["t0"]
+    # only the in-flight window has been read from the input
+    assert len(consumed) <= 2 * 2 * 10 + 10
+    results.close()
+
+
+def test_parse_many_validates_arguments():
+    with pytest.raises(ValueError, match="Unknown fields: nope"):
+        parse_many(QUERIES, fields=["tables", "nope"])
+    with pytest.raises(ValueError):
+        parse_many(QUERIES, workers=-1)
+    with pytest.raises(ValueError):
+        parse_many(QUERIES, chunksize=0)
+    with pytest.raises(ValueError, match="Unknown executor: fiber"):
+        parse_many(QUERIES, executor="fiber")
+    assert next(parse_many(QUERIES)).metadata["tables"] == ["t1"]
+
+
+def test_parse_many_in_thread_pool():
+    results = list(parse_many(QUERIES, workers=3, chunksize=2, executor="thread"))
+    assert results == list(parse_many(QUERIES, workers=1))
@@ -0,0 +1,123 @@
+import pytest
+
+from sql_metadata import Parser, get_dialect_affinity
+from sql_metadata.dialect_affinity import AffinityStats, DialectAffinity
+from sql_metadata.dialect_parser import DialectParser, HashVarDialect
+
+
+@pytest.fixture
+def parse_calls(monkeypatch):
+    calls = []
+    original = DialectParser._parse_with_dialect
+
+    def counting(stream, dialect):
+        calls.append(dialect)
+        return original(stream, dialect)
+
+    monkeypatch.setattr(DialectParser, "_parse_with_dialect", staticmethod(counting))
+    return calls
+
+
+@pytest.fixture
+def affinity():
+    tracker = get_dialect_affinity()
+    tracker.clear()
+    yield tracker
+    tracker.clear()
+
+
+def test_dialect_hint_is_tried_first(parse_calls):
+    parser = Parser(r"SELECT a FROM t WHERE b = 'it\'s'", dialect_hint="mysql")
+    assert parser.columns == ["a", "b"]
+    assert parser._ast_parser.dialect == "mysql"
+    assert parse_calls == ["mysql"]
+
+    # a hint bound to degrade falls back to the detected candidates
+    parse_calls.clear()
+    assert Parser("SELECT UNIQUE col FROM t", dialect_hint="tsql").columns == ["col"]
+    assert parse_calls == ["oracle"]
+
+
+def test_unknown_dialect_hint():
+    with pytest.raises(ValueError):
+        Parser("SELECT a FROM t", dialect_hint="nope").tables
+
+
+def test_source_affinity(affinity, parse_calls):
+    assert Parser("SELECT `a` FROM t", source="oltp").tables == ["t"]
+    assert affinity.preferred("oltp", [None, "mysql"]) == ["mysql"]
+    assert affinity.preferred("etl", [None, "mysql"]) == []
+
+    parse_calls.clear()
+    query = r"SELECT a FROM t WHERE b = 'it\'s'"
+    assert Parser(query, source="oltp").tables == ["t"]
+    assert parse_calls == ["mysql"]
+    assert affinity.stats() == AffinityStats(
+        sources=1, hinted=1, hits=1, fallbacks_avoided=1
+    )
+
+    # without a source nothing is learned or counted
+    Parser(query).tables
+    assert affinity.stats().hinted == 1
+
+
+def test_source_affinity_misses(affinity):
+    Parser("SELECT a FROM t WHERE b = #var", source="app").tables
+    # learned dialects only reorder the detected candidates
+    assert affinity.preferred("app", [None, "mysql"]) == []
+    # ... and never ahead of a dialect picked by a marker
+    assert affinity.preferred("app", [HashVarDialect, None]) == []
+    Parser("SELECT `a` FROM t", source="app").tables
+    Parser("SELECT `b` FROM t", source="app").tables
+    assert affinity.stats() == AffinityStats(
+        sources=1, hinted=0, hits=0, fallbacks_avoided=0
+    )
+    # the preferred dialect is the candidate that won most parses
+    assert affinity.preferred("app", [None, "mysql"]) == ["mysql"]
+    assert Parser("SELECT UNIQUE col FROM t", source="app").columns == ["col"]
+    assert affinity.stats() == AffinityStats(
+        sources=1, hinted=1, hits=0, fallbacks_avoided=0
+    )
+
+
+def test_source_affinity_keeps_marker_dialects(affinity):
+    for _ in range(3):
+        Parser("SELECT a FROM t", source="app").tables
+    assert affinity.preferred("app", ["mysql", None]) == []
+    assert Parser("SELECT `a;b` FROM t", source="app").tables == ["t"]
+
+
+@pytest.mark.parametrize(
+    "query",
+    [
+        'SELECT "a", b FROM t WHERE "c" = 1',
+        "SELECT a FROM t WHERE b = 'x' || c",
+        r"SELECT a FROM t WHERE b = 'it\'s'",
+        r"SELECT a FROM t WHERE b = 'x\' AND c = 1",
+        "SELECT a, b FROM t JOIN u ON t.id = u.id",
+    ],
+)
+def test_source_affinity_keeps_metadata(affinity, query):
+    for _ in range(3):
+        Parser("INSERT IGNORE INTO t VALUES (1)", source="app").tables
+    assert affinity.preferred("app", [None, "mysql"]) == ["mysql"]
+    expected = Parser(query)
+    parser = Parser(query, source="app")
+    assert parser.tables == expected.tables
+    assert parser.columns == expected.columns
+    assert parser.columns_dict == expected.columns_dict
+
+
+def test_dialect_affinity_bounds():
+    with pytest.raises(ValueError):
+        DialectAffinity(max_sources=0)
+    tracker = DialectAffinity(max_sources=2)
+    tracker.record("a", "mysql", ["mysql", None])
+    tracker.record("b", None, [None, "mysql"])
+    tracker.preferred("a", [None])
+    tracker.record("c", "spark", ["spark", None, "mysql"], preferred=["spark"])
+    assert tracker.preferred("b", [None]) == []
+    assert tracker.preferred("a", [None, "mysql"]) == ["mysql"]
+    assert tracker.stats() == AffinityStats(2, 1, 1, 0)
+    tracker.clear()
+    assert tracker.stats() == AffinityStats(0, 0, 0, 0)
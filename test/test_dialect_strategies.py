@@ -0,0 +1,137 @@
+import os
+import threading
+
+import pytest
+
+import sql_metadata.dialect_parser as dialect_parser
+from sql_metadata import Parser, ProbeStrategy
+from sql_metadata.dialect_parser import DialectParser, _predicts_degraded
+from sql_metadata.token_stream import TokenStream
+
+QUERIES = [
+    "SHOW TABLES",
+    "EXECUTE sp_help",
+    "INSERT IGNORE INTO bar VALUES (1, '2')",
+    "SELECT UNIQUE col FROM t",
+    "SELECT a, b FROM t WHERE c = 1",
+    "SELECT `a` FROM `t`",
+    "SELECT [a] FROM [t]",
+    "SELECT * FROM #tmp",
+    "SELECT * FROM t WHERE a = 'x",
+]
+
+
+@pytest.fixture
+def parse_calls(monkeypatch):
+    calls = []
+    original = DialectParser._parse_with_dialect
+
+    def counting(stream, dialect):
+        calls.append(dialect)
+        return original(stream, dialect)
+
+    monkeypatch.setattr(DialectParser, "_parse_with_dialect", staticmethod(counting))
+    return calls
+
+
+def _parse(sql, strategy):
+    try:
+        ast, dialect = DialectParser(strategy).parse(sql)
+    except ValueError as exc:
+        return str(exc)
+    return ast.sql(), dialect
+
+
+@pytest.mark.parametrize("strategy", ["precheck", ProbeStrategy.CONCURRENT])
+def test_strategies_match_sequential(strategy):
+    for sql in QUERIES:
+        assert _parse(sql, strategy) == _parse(sql, "sequential"), sql
+
+
+def test_default_strategy(monkeypatch):
+    assert DialectParser().strategy is ProbeStrategy.PRECHECK
+    monkeypatch.setattr(DialectParser, "default_strategy", "sequential")
+    assert DialectParser().strategy is ProbeStrategy.SEQUENTIAL
+    with pytest.raises(ValueError):
+        DialectParser("random")
+
+
+@pytest.mark.parametrize(
+    "sql, dialect",
+    [
+        ("SHOW TABLES", None),
+        ("EXECUTE sp_help", None),
+        ("INSERT IGNORE INTO bar VALUES (1)", None),
+        ("SELECT UNIQUE col FROM t", None),
+        ("SELECT UNIQUE col FROM t", "mysql"),
+    ],
+)
+def test_prechecks_reject(sql, dialect):
+    assert _predicts_degraded(TokenStream(sql), dialect)
+
+
+@pytest.mark.parametrize(
+    "sql, dialect",
+    [
+        ("SHOW TABLES", "mysql"),
+        ("INSERT IGNORE INTO bar VALUES (1)", "mysql"),
+        ("INSERT INTO ignore VALUES (1)", None),
+        ("SELECT UNIQUE col FROM t", "oracle"),
+        ("SELECT a FROM t WHERE b IS UNIQUE", None),
+        ("SELECT 'unterminated", None),
+        ("", None),
+    ],
+)
+def test_prechecks_accept(sql, dialect):
+    assert not _predicts_degraded(TokenStream(sql), dialect)
+
+
+def test_precheck_skips_doomed_dialects(parse_calls):
+    assert DialectParser().parse("SHOW TABLES")[1] == "mysql"
+    assert Parser("INSERT IGNORE INTO bar VALUES (1)").tables == ["bar"]
+    assert parse_calls == ["mysql", "mysql"]
+
+    parse_calls.clear()
+    assert Parser("SELECT UNIQUE col FROM t").columns == ["col"]
+    assert parse_calls == ["oracle"]
+
+
+def test_sequential_parses_every_candidate(parse_calls):
+    DialectParser("sequential").parse("SELECT UNIQUE col FROM t")
+    assert parse_calls == [None, "mysql", "oracle"]
+
+
+def test_concurrent_cancels_unneeded_attempts(parse_calls, monkeypatch):
+    # keep the pool busy so the fallback attempt is still queued
+    release = threading.Event()
+    monkeypatch.setattr(dialect_parser, "_probe_pool", None)
+    executor = dialect_parser._probe_executor()
+    blockers = [
+        executor.submit(release.wait) for _ in range(dialect_parser._PROBE_WORKERS - 1)
+    ]
+    try:
+        _, dialect = DialectParser("concurrent").parse("SELECT a FROM t")
+    finally:
+        release.set()
+        for blocker in blockers:
+            blocker.result()
+    assert dialect is None
+    assert parse_calls == [None]
+    executor.shutdown()
+
+
+def test_concurrent_reports_syntax_errors():
+    with pytest.raises(ValueError, match="SQL syntax error"):
+        DialectParser("concurrent").parse("SELECT * FROM t WHERE a = 'x")
+
+
+def test_probe_executor_is_reset_after_fork():
+    executor = dialect_parser._probe_executor()
+    assert dialect_parser._probe_executor() is executor
+    pid = os.fork()
+    if pid == 0:  # pragma: no cover - runs in the child
+        os._exit(0 if dialect_parser._probe_pool is None else 1)
+    _, status = os.waitpid(pid, 0)
+    assert os.waitstatus_to_exitcode(status) == 0
+    dialect_parser._reset_probe_executor()
+    assert dialect_parser._probe_pool is None
@@ -0,0 +1,161 @@
+import os
+import sqlite3
+
+import pytest
+
+import sql_metadata.disk_cache
+from sql_metadata import (
+    Parser,
+    QueryType,
+    disable_disk_cache,
+    enable_disk_cache,
+    get_disk_cache,
+)
+from sql_metadata.disk_cache import DiskCache, cache_key
+from sql_metadata.metadata_cache import MetadataSnapshot, get_metadata_cache
+from sql_metadata.utils import UniqueList
+
+QUERY = """
+WITH recent AS (SELECT user_id, MAX(ts) AS last_ts FROM events GROUP BY user_id)
+SELECT u.name AS n, r.last_ts FROM users u JOIN recent r ON r.user_id = u.id
+WHERE u.id IN (SELECT id FROM vip) ORDER BY n
+"""
+
+
+@pytest.fixture
+def path(tmp_path):
+    return tmp_path / "cache.sqlite"
+
+
+def _fail_parse(monkeypatch):
+    def fail(*args):
+        raise AssertionError("cached query was parsed")
+
+    monkeypatch.setattr("sql_metadata.ast_parser.ASTParser._parse", fail)
+
+
+def test_snapshot_survives_a_new_instance(path, monkeypatch):
+    expected = MetadataSnapshot.from_parser(Parser(QUERY))
+    DiskCache(path).parser(QUERY)
+    _fail_parse(monkeypatch)
+    cache = DiskCache(path)
+    snapshot = cache.get(QUERY)
+    assert snapshot == expected
+    assert snapshot.query_type is QueryType.SELECT
+    assert isinstance(snapshot.columns_dict["select"], UniqueList)
+    parser = cache.parser(QUERY)
+    assert parser.columns == expected.columns
+    assert parser.columns_aliases == expected.columns_aliases
+    assert parser.subqueries_names == ["subquery_1"]
+    assert cache.stats()[:2] == (2, 0)
+
+
+def test_miss_and_unparseable_queries(path):
+    cache = DiskCache(path)
+    assert cache.get("SELECT 1") is None
+    parser = cache.parser("WITH cte AS (SELECT 1)")
+    with pytest.raises(ValueError):
+        _ = parser.tables
+    assert cache.stats().entries == 0
+    snapshot = MetadataSnapshot.from_parser(Parser("DROP TABLE t"))
+    cache.put("DROP TABLE t", snapshot._replace(query_type=None))
+    assert cache.get("DROP TABLE t").query_type is None
+
+
+@pytest.mark.parametrize("sql", ["", "/* c */"])
+def test_empty_queries_are_not_cached(path, sql):
+    cache = DiskCache(path)
+    parser = cache.parser(sql)
+    with pytest.raises(ValueError):
+        _ = parser.tables
+    assert cache.stats().entries == 0
+
+
+def test_ttl(path, monkeypatch):
+    now = [1000.0]
+    monkeypatch.setattr(sql_metadata.disk_cache.time, "time", lambda: now[0])
+    cache = DiskCache(path, ttl=60)
+    cache.parser("SELECT a FROM t")
+    now[0] += 30
+    assert cache.get("SELECT a FROM t") is not None
+    now[0] += 31
+    assert cache.get("SELECT a FROM t") is None
+    cache.parser("SELECT b FROM t")
+    stats = cache.stats()
+    assert (stats.evictions, stats.entries) == (1, 1)
+
+
+def test_max_entries(path):
+    cache = DiskCache(path, max_entries=2)
+    for column in "abc":
+        cache.parser(f"SELECT {column} FROM t")
+    # storing an entry again refreshes it
+    cache.parser("SELECT b FROM t")
+    cache.put("SELECT b FROM t", cache.get("SELECT b FROM t"))
+    cache.parser("SELECT d FROM t")
+    assert cache.get("SELECT a FROM t") is None
+    assert cache.get("SELECT c FROM t") is None
+    assert cache.get("SELECT b FROM t") is not None
+    stats = cache.stats()
+    assert (stats.evictions, stats.entries) == (2, 2)
+    assert stats.size > 0
+    cache.clear()
+    assert cache.stats() == (0, 0, 0, 0, stats.size)
+
+
+def test_invalid_limits(path):
+    with pytest.raises(ValueError):
+        DiskCache(path, max_entries=0)
+    with pytest.raises(ValueError):
+        DiskCache(path, ttl=0)
+
+
+def test_key_depends_on_versions(monkeypatch):
+    key = cache_key("SELECT 1")
+    assert len(key) == 16
+    assert key == cache_key("SELECT 1") != cache_key("SELECT 2")
+    monkeypatch.setattr(sql_metadata.disk_cache, "version", lambda name: "9.9")
+    assert sql_metadata.disk_cache._library_version() == "9.9"
+    assert cache_key("SELECT 1") != key
+    monkeypatch.setattr(sql_metadata.disk_cache.sqlglot, "__version__", "0.0")
+    assert cache_key("SELECT 1") != key
+
+
+def test_database_errors_are_misses(path):
+    cache = DiskCache(path)
+    cache.parser("SELECT a FROM t")
+    with sqlite3.connect(path) as db:
+        db.execute("DROP TABLE entries")
+    assert cache.get("SELECT a FROM t") is None
+    assert cache.parser("SELECT a FROM t").tables == ["t"]
+    cache.close()
+    cache.close()
+
+
+def test_shared_between_processes(path):
+    cache = DiskCache(path)
+    assert cache.get("SELECT a FROM t") is None
+    pid = os.fork()
+    if pid == 0:  # pragma: no cover - runs in the child
+        cache.parser("SELECT a FROM t")
+        os._exit(0)
+    _, status = os.waitpid(pid, 0)
+    assert os.waitstatus_to_exitcode(status) == 0
+    assert cache.get("SELECT a FROM t").tables == ["t"]
+
+
+def test_cached_parser_reads_the_disk_cache(path, monkeypatch):
+    assert get_disk_cache() is None
+    cache = enable_disk_cache(path, ttl=3600)
+    try:
+        assert get_disk_cache() is cache
+        get_metadata_cache().clear()
+        assert Parser.cached(QUERY).tables == ["events", "users", "vip"]
+        get_metadata_cache().clear()
+        _fail_parse(monkeypatch)
+        assert Parser.cached(QUERY).tables == ["events", "users", "vip"]
+        assert cache.stats()[:2] == (1, 1)
+    finally:
+        disable_disk_cache()
+        get_metadata_cache().clear()
+    assert get_disk_cache() is None
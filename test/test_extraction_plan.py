@@ -0,0 +1,82 @@
+import pytest
+
+from sql_metadata import Parser
+from sql_metadata.extraction_plan import FIELDS, extraction_plan
+from sql_metadata.nested_resolver import NestedResolver
+
+NESTED = """
+WITH cte AS (SELECT a, b AS x FROM t1)
+SELECT cte.a, sub.c FROM cte
+JOIN (SELECT c, id FROM t2) AS sub ON sub.id = cte.a
+ORDER BY cte.x
+"""
+
+
+@pytest.fixture
+def resolver_calls(monkeypatch):
+    calls = []
+    for name in [
+        "extract_subquery_nodes",
+        "render_body",
+        "render_bodies",
+        "resolve",
+        "resolve_columns_dict",
+    ]:
+        original = getattr(NestedResolver, name)
+        wrapper = (
+            staticmethod
+            if isinstance(NestedResolver.__dict__[name], staticmethod)
+            else (lambda f: f)
+        )
+
+        def counting(*args, _name=name, _original=original, **kwargs):
+            calls.append(_name)
+            return _original(*args, **kwargs)
+
+        monkeypatch.setattr(NestedResolver, name, wrapper(counting))
+    return calls
+
+
+def test_extraction_plan():
+    assert extraction_plan(["tables"]) == ("query_type", "with_names", "tables")
+    assert extraction_plan(["columns", "query_type"]) == (
+        "query_type",
+        "with_names",
+        "tables",
+        "tables_aliases",
+        "columns",
+    )
+    assert extraction_plan(["comments", "values_dict"])[:2] == ("comments", "values")
+    assert extraction_plan([]) == ()
+    with pytest.raises(ValueError, match="Unknown fields: nope"):
+        extraction_plan(["tables", "nope"])
+
+
+def test_extract_matches_properties():
+    fields = sorted(FIELDS)
+    extracted = Parser(NESTED).extract(fields)
+    assert list(extracted) == fields
+    parser = Parser(NESTED)
+    assert extracted == {field: getattr(parser, field) for field in fields}
+
+
+def test_extract_computes_only_the_plan(resolver_calls):
+    parser = Parser(NESTED)
+    assert parser.extract(["columns"]) == {"columns": ["a", "b", "c", "id"]}
+    # no bodies rendered, clause lists not resolved yet
+    assert resolver_calls == ["extract_subquery_nodes", "resolve"]
+    assert parser._with_queries is None and parser._subqueries is None
+
+    resolver_calls.clear()
+    assert parser.columns_dict["order_by"] == ["b"]
+    assert resolver_calls == ["resolve_columns_dict"]
+
+
+def test_flat_query_skips_nested_resolution(resolver_calls):
+    parser = Parser("SELECT a, b AS x FROM t ORDER BY x")
+    assert parser.extract(["columns", "columns_dict"]) == {
+        "columns": ["a", "b"],
+        "columns_dict": {"select": ["a", "b"], "order_by": ["b"]},
+    }
+    assert resolver_calls == []
+    assert parser.subqueries_names == []
@@ -0,0 +1,94 @@
+import bz2
+import gzip
+import lzma
+
+import pytest
+
+from sql_metadata import Parser
+from sql_metadata.file_reader import FileStatement, iter_file_statements
+
+DUMP = (
+    "-- dump\n"
+    "INSERT INTO café VALUES ('naïve; ok', 1);\n"
+    "INSERT INTO b VALUES ('\xe9\xff');\n"
+    "DELIMITER //\n"
+    "CREATE PROCEDURE p() BEGIN SELECT 1; END//\n"
+    "DELIMITER ;\n"
+    "SELECT * FROM `c;d`"
+).encode("utf-8")
+# an invalid UTF-8 byte must not shift the offsets
+DUMP = DUMP.replace(b"\xc3\xbf", b"\xff")
+
+
+def _check_offsets(statements, content):
+    for statement in statements:
+        chunk = content[statement.offset : statement.offset + statement.length]
+        assert chunk.decode("utf-8", "surrogateescape") == statement.sql
+
+
+def test_plain_file_offsets(tmp_path):
+    path = tmp_path / "dump.sql"
+    path.write_bytes(DUMP)
+    statements = list(iter_file_statements(path))
+    assert [s.sql[:20] for s in statements] == [
+        "-- dump\nINSERT INTO ",
+        "INSERT INTO b VALUES",
+        "CREATE PROCEDURE p()",
+        "SELECT * FROM `c;d`",
+    ]
+    assert statements[0] == FileStatement(0, 50, statements[0].sql)
+    _check_offsets(statements, DUMP)
+
+
+@pytest.mark.parametrize(
+    "compress", [gzip.compress, bz2.compress, lzma.compress], ids=["gz", "bz2", "xz"]
+)
+def test_compressed_files(tmp_path, compress):
+    path = tmp_path / "dump.sql.z"
+    path.write_bytes(compress(DUMP))
+    plain = tmp_path / "dump.sql"
+    plain.write_bytes(DUMP)
+    statements = list(iter_file_statements(str(path)))
+    assert statements == list(iter_file_statements(plain))
+    _check_offsets(statements, DUMP)
+
+
+def test_empty_file(tmp_path):
+    path = tmp_path / "empty.sql"
+    path.write_bytes(b"")
+    assert list(iter_file_statements(path)) == []
+
+
+def test_iter_file_yields_lazy_parsers(tmp_path):
+    path = tmp_path / "dump.sql.gz"
+    path.write_bytes(
+        gzip.compress(b"INSERT INTO a VALUES ('it\\'s; ok');\nSELECT x FROM b")
+    )
+    results = list(Parser.iter_file(path, dialect_hint="mysql", source="dumps"))
+    assert [statement.offset for statement, _ in results] == [0, 36]
+    assert all(parser._ast_parser._ast is None for _, parser in results)
+    assert [parser.tables for _, parser in results] == [["a"], ["b"]]
+    assert results[0][1].values == ["it's; ok"]
+    assert results[1][1]._ast_parser._source == "dumps"
+
+
+def test_large_multi_line_statement_is_tokenized_once(tmp_path, monkeypatch):
+    from sql_metadata.script_parser import StatementSplitter
+
+    tokenized = [0]
+    original = StatementSplitter._tokenizer
+
+    def counting(self, sql):
+        tokenized[0] += len(sql)
+        return original(self, sql)
+
+    monkeypatch.setattr(StatementSplitter, "_tokenizer", counting)
+    rows = "".join(f"  ({row}, 'row {row}'),\n" for row in range(20_000))
+    content = f"INSERT INTO t VALUES\n{rows}  (0, 'end');\nSELECT 1;\n".encode()
+    path = tmp_path / "dump.sql"
+    path.write_bytes(content)
+    insert, select = iter_file_statements(path)
+    assert insert.offset == 0 and insert.sql.endswith("(0, 'end')")
+    assert select.sql == "SELECT 1"
+    _check_offsets([insert, select], content)
+    assert tokenized[0] < 3 * len(content)
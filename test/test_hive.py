@@ -156,3 +156,6 @@ def test_complex_lateral_view_with_array_subscript():
         "bdapp_ads_bhv_cuid_all_1d",
         "udw_ns.default.ug_dim_channel_new_df",
     ]
+    # ch_4th_class is an alias of the tb subquery, resolved to its source column
+    assert "ch_4th_class" not in parser.columns
+    assert "fourth_category" in parser.columns
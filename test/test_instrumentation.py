@@ -0,0 +1,135 @@
+import pytest
+from sqlglot.dialects.mysql import MySQL
+
+from sql_metadata import InvalidQueryDefinition, Parser
+from sql_metadata.dialect_parser import DialectParser, ProbeStrategy
+from sql_metadata.instrumentation import (
+    STAGES,
+    Profile,
+    StageEvent,
+    add_observer,
+    dialect_name,
+    remove_observer,
+    stage,
+)
+
+QUERY = """
+WITH recent AS (SELECT user_id, MAX(ts) AS last_ts FROM events GROUP BY user_id)
+SELECT u.name, r.last_ts, s.total
+FROM users u
+JOIN recent r ON r.user_id = u.id
+JOIN (SELECT user_id, SUM(amount) AS total FROM orders GROUP BY user_id) s
+  ON s.user_id = u.id
+"""
+
+
+@pytest.fixture
+def events():
+    events = []
+    add_observer(events.append)
+    yield events
+    remove_observer(events.append)
+
+
+def test_profile_breakdown():
+    parser = Parser(QUERY, profile=True)
+    _ = parser.columns_dict
+    profile = parser.profile
+    assert set(profile.stages) == set(STAGES) - {"statement", "failure"}
+    assert all(stats.calls >= 1 and stats.wall > 0 for stats in profile.stages.values())
+    assert profile.stages["parse"].wall >= profile.stages["clean"].wall
+    assert profile.dialect == "default"
+    assert profile.dialect_attempts == 1
+    assert profile.ast_nodes == parser._ast_parser.index.size
+    assert profile.sub_parsers == 2
+    assert repr(profile).startswith("Profile(clean=")
+    assert "sub_parsers=2)" in repr(profile)
+
+
+def test_profile_is_off_by_default():
+    parser = Parser(QUERY)
+    assert parser.columns == Parser(QUERY, profile=True).columns
+    assert parser.profile is None
+    assert not stage("parse")
+    with stage("parse") as span:
+        span.set("ignored", True)
+
+
+def test_attempt_outcomes(events, monkeypatch):
+    monkeypatch.setattr(DialectParser, "default_strategy", ProbeStrategy.SEQUENTIAL)
+    parser = Parser("INSERT IGNORE INTO t VALUES (1)", profile=True)
+    assert parser.tables == ["t"]
+    attempts = [e.attributes for e in events if e.name == "parse_attempt"]
+    assert attempts == [
+        {"dialect": "default", "outcome": "degraded"},
+        {"dialect": "mysql", "outcome": "accepted"},
+    ]
+    assert (parser.profile.dialect_attempts, parser.profile.dialect) == (2, "mysql")
+
+
+def test_failed_parse_is_reported(events):
+    parser = Parser("SELECT * FROM `t` WHERE a = 'x", profile=True)
+    with pytest.raises(InvalidQueryDefinition):
+        _ = parser.tables
+    attempts = [e for e in events if e.name == "parse_attempt"]
+    assert [e.attributes["outcome"] for e in attempts] == ["error", "error"]
+    parse = next(e for e in events if e.name == "parse")
+    assert parse.attributes == {
+        "error": "InvalidQueryDefinition",
+        "message": "Query could not be parsed — no dialect could handle this SQL",
+    }
+    assert parser.profile.dialect is None
+    assert parser.profile.stages["parse"].calls == 1
+
+
+def test_observer_events_nest(events):
+    Parser(QUERY).columns
+    depths: dict[str, list[int]] = {}
+    for event in events:
+        depths.setdefault(event.name, []).append(event.depth)
+    assert depths["parse"] == [0]
+    assert depths["clean"] == depths["detect_dialects"] == [1]
+    # the sub-parsers extract their columns while the parent resolves them
+    assert depths["extract_columns"] == [0, 1, 1]
+    parse = next(e for e in events if e.name == "parse")
+    clean = next(e for e in events if e.name == "clean")
+    assert parse.start_ns <= clean.start_ns
+    assert clean.start_ns + clean.wall_ns <= parse.start_ns + parse.wall_ns
+    assert parse.attributes["nodes"] > 0
+    assert all(isinstance(event, StageEvent) for event in events)
+
+
+def test_sub_parsers_share_the_profile(events):
+    parser = Parser(QUERY, profile=True)
+    _ = parser.columns
+    sub_parsers = [e for e in events if e.name == "sub_parser"]
+    assert len(sub_parsers) == parser.profile.sub_parsers
+    assert all(e.depth == 1 for e in sub_parsers)  # inside resolve_nested
+
+
+def test_profile_survives_release_and_streamed_values():
+    parser = Parser("INSERT INTO t (a) VALUES (1), (2)", profile=True)
+    assert list(parser.iter_values()) == [[1], [2]]
+    assert parser.tables == ["t"]
+    parser.release()
+    assert parser.columns == ["a"]
+    assert parser.profile.stages["parse"].calls == 2
+
+
+def test_remove_unknown_observer():
+    with pytest.raises(ValueError):
+        remove_observer(print)
+
+
+def test_profile_record():
+    profile = Profile()
+    profile.record(StageEvent("clean", 0, 2_000_000, 1_000_000, 1, {}))
+    profile.record(StageEvent("clean", 5, 1_000_000, 1_000_000, 1, {}))
+    assert profile.stages["clean"] == (2, 0.003, 0.002)
+
+
+def test_dialect_name():
+    assert dialect_name(None) == "default"
+    assert dialect_name("tsql") == "tsql"
+    assert dialect_name(MySQL) == "MySQL"
+    assert dialect_name(MySQL()) == "MySQL"
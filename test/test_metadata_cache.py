@@ -0,0 +1,142 @@
+import pytest
+
+from sql_metadata import Parser, QueryType
+from sql_metadata.metadata_cache import (
+    MetadataCache,
+    get_metadata_cache,
+    literal_key,
+)
+
+
+@pytest.fixture(autouse=True)
+def clear_cache():
+    get_metadata_cache().clear()
+    yield
+    get_metadata_cache().clear()
+
+
+def _fail_parse(monkeypatch):
+    def fail(*args):
+        raise AssertionError("literal-only variant was parsed")
+
+    monkeypatch.setattr("sql_metadata.ast_parser.ASTParser._parse", fail)
+
+
+def test_literal_key():
+    assert literal_key("SELECT a FROM t WHERE id = 5") == literal_key(
+        "SELECT a FROM t WHERE id = 7 /* other comment */"
+    )
+    assert literal_key("SELECT a FROM t WHERE b = 'x'") == literal_key(
+        "SELECT a FROM t WHERE b = 'yy'"
+    )
+    # identifiers, IN-list lengths and keywords are kept
+    assert literal_key("SELECT a FROM t_1") != literal_key("SELECT a FROM t_2")
+    assert literal_key("SELECT a FROM t WHERE b IN (1, 2)") != literal_key(
+        "SELECT a FROM t WHERE b IN (1, 2, 3)"
+    )
+    assert literal_key("SELECT a FROM t WHERE b = 'x") is None
+
+
+def test_cached_reuses_metadata_for_literal_variants(monkeypatch):
+    query = """
+    WITH recent AS (SELECT id, name AS n FROM users WHERE age > {age})
+    SELECT r.n, o.total FROM recent AS r
+    JOIN (SELECT user_id, SUM(amount) AS total FROM orders GROUP BY user_id) AS o
+    ON r.id = o.user_id WHERE r.n LIKE '{name}%' ORDER BY total LIMIT {limit}
+    """
+    first = Parser.cached(query.format(age=18, name="a", limit=10))
+    expected = Parser(query.format(age=21, name="bob", limit=50))
+    fields = (
+        "query_type",
+        "tables",
+        "tables_aliases",
+        "columns",
+        "columns_dict",
+        "columns_aliases",
+        "columns_aliases_dict",
+        "columns_aliases_names",
+        "with_names",
+        "subqueries_names",
+    )
+    expected_fields = {field: getattr(expected, field) for field in fields}
+
+    _fail_parse(monkeypatch)
+    second = Parser.cached(query.format(age=21, name="bob", limit=50))
+    assert second.query_type == QueryType.SELECT
+    assert {field: getattr(second, field) for field in fields} == expected_fields
+    assert get_metadata_cache().stats().hits == 1
+
+    # cached values are copies — mutating one parser does not leak
+    second.columns.append("leaked")
+    second.columns_dict["select"].append("leaked")
+    assert "leaked" not in first.columns
+    assert "leaked" not in first.columns_dict["select"]
+
+    monkeypatch.undo()
+    assert second.limit_and_offset == (50, 0)
+    assert second.with_queries == expected.with_queries
+    assert second.subqueries == expected.subqueries
+
+
+def test_cached_re_extracts_literal_dependent_fields():
+    Parser.cached("INSERT INTO t (a, b) VALUES (1, 'x')").columns
+    parser = Parser.cached("INSERT INTO t (a, b) VALUES (2, 'y')")
+    assert parser.values == [2, "y"]
+    assert parser.values_dict == {"a": 2, "b": "y"}
+
+    Parser.cached("SELECT 1, a + 1 FROM t")
+    parser = Parser.cached("SELECT 2, a + 1 FROM t")
+    assert parser.output_columns == ["2", "a"]
+    assert get_metadata_cache().stats().hits == 2
+
+
+def test_cached_does_not_store_failures():
+    parser = Parser.cached("SELECT * FROM t WHERE a = 'x")
+    with pytest.raises(ValueError):
+        parser.tables
+
+    parser = Parser.cached("WITH cte AS (SELECT 1)")
+    with pytest.raises(ValueError):
+        parser.query_type
+    assert len(get_metadata_cache()) == 0
+
+
+def test_literals_outside_value_positions_are_kept():
+    assert literal_key("SELECT id FROM `2023_sales` WHERE x = 1") != literal_key(
+        "SELECT id FROM `2024_sales` WHERE x = 1"
+    )
+    assert literal_key("SELECT * FROM 'users' u") != literal_key(
+        "SELECT * FROM 'orders' u"
+    )
+    assert literal_key("SELECT a FROM t LIMIT 10") == literal_key(
+        "SELECT a FROM t LIMIT 20"
+    )
+    Parser.cached("SELECT id FROM `2023_sales` WHERE x = 1").tables
+    assert Parser.cached("SELECT id FROM `2024_sales` WHERE x = 1").tables == [
+        "2024_sales"
+    ]
+    Parser.cached("SELECT * FROM 'users' u").tables
+    assert Parser.cached("SELECT * FROM 'orders' u").tables == ["orders"]
+
+
+@pytest.mark.parametrize("sql", ["", "/* c */"])
+def test_cached_returns_a_lazy_parser_for_empty_queries(sql):
+    parser = Parser.cached(sql)
+    with pytest.raises(ValueError):
+        _ = parser.tables
+    assert get_metadata_cache().stats().entries == 0
+
+
+def test_metadata_cache_evicts_least_recently_used():
+    cache = MetadataCache(max_entries=2)
+    cache.parser("SELECT a FROM t1 WHERE x = 1")
+    cache.parser("SELECT a FROM t2 WHERE x = 1")
+    cache.parser("SELECT a FROM t1 WHERE x = 2")
+    cache.parser("SELECT a FROM t3 WHERE x = 1")
+    stats = cache.stats()
+    assert (stats.hits, stats.misses, stats.evictions, stats.entries) == (1, 3, 1, 2)
+    assert cache.parser("SELECT a FROM t1 WHERE x = 3").tables == ["t1"]
+    assert cache.stats().hits == 2
+
+    with pytest.raises(ValueError):
+        MetadataCache(max_entries=0)
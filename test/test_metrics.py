@@ -0,0 +1,300 @@
+import os
+import sqlite3
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+import sql_metadata.metrics
+from sql_metadata import (
+    Parser,
+    disable_disk_cache,
+    disable_parse_cache,
+    enable_disk_cache,
+    enable_parse_cache,
+    parse_many,
+)
+from sql_metadata.dialect_parser import DialectParser, ProbeStrategy
+from sql_metadata.instrumentation import StageEvent
+from sql_metadata.metadata_cache import get_metadata_cache
+from sql_metadata.metrics import (
+    BUCKETS,
+    MetricsRegistry,
+    disable_metrics,
+    enable_metrics,
+    failure_reason,
+    flush_metrics,
+    get_metrics,
+    metrics_directory,
+    record_metrics,
+)
+
+QUERIES = ["SELECT a FROM t", "SELECT * FROM `t` WHERE a = 'x", "SHOW TABLES"]
+
+
+@pytest.fixture
+def registry():
+    registry = enable_metrics()
+    yield registry
+    disable_metrics()
+
+
+def _counter(snapshot, family, **labels):
+    return snapshot.counters.get((family, tuple(sorted(labels.items()))), 0)
+
+
+def test_parses_and_failures(registry):
+    Parser(QUERIES[0]).columns
+    for sql in QUERIES[1:]:
+        with pytest.raises(ValueError):
+            _ = Parser(sql).tables
+    snapshot = registry.snapshot()
+    assert _counter(snapshot, "sql_metadata_parses") == 3
+    failure = "sql_metadata_failures"
+    error = "InvalidQueryDefinition"
+    assert _counter(snapshot, failure, error=error, reason="syntax_error") == 1
+    assert (
+        _counter(snapshot, failure, error=error, reason="unsupported_query_type") == 1
+    )
+    assert sum(v for (f, _), v in snapshot.counters.items() if f == failure) == 2
+    wins = [v for (f, _), v in snapshot.counters.items() if f.endswith("_wins")]
+    assert sum(wins) == 2
+    assert snapshot.buckets["parse"][-1] == 0
+    assert sum(snapshot.buckets["parse"]) == 3
+
+
+def test_swallowed_exceptions_are_no_failures(registry):
+    # columns falls back to the raw text on a syntax error
+    assert Parser(QUERIES[1]).columns == []
+    snapshot = registry.snapshot()
+    assert _counter(snapshot, "sql_metadata_parses") == 1
+    assert not any(f == "sql_metadata_failures" for f, _ in snapshot.counters)
+    with pytest.raises(ValueError):
+        _ = Parser(QUERIES[1]).tables
+    failures = [
+        (labels, v)
+        for (f, labels), v in registry.snapshot().counters.items()
+        if f == "sql_metadata_failures"
+    ]
+    assert failures == [
+        ((("error", "InvalidQueryDefinition"), ("reason", "syntax_error")), 1)
+    ]
+
+
+def test_dialect_fallbacks(registry, monkeypatch):
+    monkeypatch.setattr(DialectParser, "default_strategy", ProbeStrategy.SEQUENTIAL)
+    assert Parser("INSERT IGNORE INTO t VALUES (1)").tables == ["t"]
+    snapshot = registry.snapshot()
+    assert _counter(snapshot, "sql_metadata_dialect_wins", dialect="mysql") == 1
+    fallbacks = "sql_metadata_dialect_fallbacks"
+    assert _counter(snapshot, fallbacks, dialect="default", outcome="degraded") == 1
+    assert _counter(snapshot, "sql_metadata_degraded_results", dialect="default") == 1
+
+
+@pytest.mark.parametrize(
+    "message, reason",
+    [
+        ("Query could not be parsed — SQL syntax error", "syntax_error"),
+        (
+            "Could not parse the query — the SQL syntax appears to be invalid",
+            "syntax_error",
+        ),
+        (
+            "Query could not be parsed — no dialect could handle this SQL",
+            "syntax_error",
+        ),
+        ("Not supported query type!", "unsupported_query_type"),
+        ("Empty queries are not supported!", "empty_query"),
+        ("WITH clause without a main statement is not valid SQL", "incomplete_with"),
+        ("Malformed WITH clause — extra AS keyword after CTE body", "malformed_with"),
+        ("All CTEs require an alias, not a valid SQL", "cte_without_alias"),
+        ("maximum recursion depth exceeded", "other"),
+    ],
+)
+def test_failure_reason(message, reason):
+    assert failure_reason(message) == reason
+
+
+def test_render():
+    registry = MetricsRegistry()
+    registry(
+        StageEvent(
+            "parse_attempt",
+            0,
+            300_000,
+            0,
+            1,
+            {"dialect": 'odd"dialect\\\n', "outcome": "accepted"},
+        )
+    )
+    registry(
+        StageEvent(
+            "parse",
+            0,
+            2_000_000,
+            0,
+            0,
+            {"error": "RecursionError", "message": "maximum recursion depth exceeded"},
+        )
+    )
+    registry(
+        StageEvent(
+            "failure",
+            0,
+            3_000_000,
+            0,
+            0,
+            {"error": "RecursionError", "message": "maximum recursion depth exceeded"},
+        )
+    )
+    registry(StageEvent("parse", 0, 5_000_000_000, 0, 0, {}))
+    text = registry.render()
+    lines = text.splitlines()
+    assert lines[:3] == [
+        "# TYPE sql_metadata_parses counter",
+        "# HELP sql_metadata_parses SQL strings parsed into an AST, including "
+        "failed parses.",
+        "sql_metadata_parses_total 2",
+    ]
+    assert lines[-1] == "# EOF" and text.endswith("\n")
+    assert (
+        'sql_metadata_failures_total{error="RecursionError",reason="other"} 1' in lines
+    )
+    assert 'sql_metadata_dialect_wins_total{dialect="odd\\"dialect\\\\\\n"} 1' in lines
+    assert "# UNIT sql_metadata_stage_duration_seconds seconds" in lines
+    family = "sql_metadata_stage_duration_seconds"
+    buckets = [
+        line for line in lines if line.startswith(f'{family}_bucket{{stage="parse"')
+    ]
+    assert len(buckets) == len(BUCKETS) + 1
+    assert buckets[4] == f'{family}_bucket{{stage="parse",le="0.0025"}} 1'
+    assert buckets[-2] == f'{family}_bucket{{stage="parse",le="2.5"}} 1'
+    assert buckets[-1] == f'{family}_bucket{{stage="parse",le="+Inf"}} 2'
+    assert f'{family}_count{{stage="parse"}} 2' in lines
+    assert f'{family}_sum{{stage="parse"}} 5.002' in lines
+    registry.flush()  # no directory: nothing to write
+
+
+def test_cache_counters(registry, tmp_path):
+    parse_cache = enable_parse_cache()
+    enable_disk_cache(tmp_path / "cache.sqlite")
+    get_metadata_cache().clear()
+    try:
+        for _ in range(2):
+            Parser("SELECT a FROM t").tables
+            Parser.cached("SELECT b FROM t").tables
+        snapshot = registry.snapshot()
+        hits, misses = "sql_metadata_cache_hits", "sql_metadata_cache_misses"
+        assert _counter(snapshot, hits, cache="parse") == parse_cache.stats().hits
+        assert _counter(snapshot, misses, cache="parse") == parse_cache.stats().misses
+        assert _counter(snapshot, hits, cache="metadata") == 1
+        assert _counter(snapshot, misses, cache="disk") == 1
+        with sqlite3.connect(tmp_path / "cache.sqlite") as db:
+            db.execute("DROP TABLE entries")
+        assert ("sql_metadata_cache_hits", (("cache", "disk"),)) not in (
+            registry.snapshot().counters
+        )
+    finally:
+        disable_parse_cache()
+        disable_disk_cache()
+        get_metadata_cache().clear()
+
+
+def test_threads(registry):
+    def parse(column):
+        return Parser(f"SELECT {column} FROM t").columns
+
+    with ThreadPoolExecutor(max_workers=8) as pool:
+        list(pool.map(parse, [f"c{i}" for i in range(200)]))
+    snapshot = registry.snapshot()
+    assert _counter(snapshot, "sql_metadata_parses") == 200
+    assert sum(snapshot.buckets["extract_columns"]) == 200
+
+
+@pytest.mark.parametrize("executor", ["process", "thread"])
+def test_parse_many_workers_share_a_directory(tmp_path, executor):
+    registry = enable_metrics(tmp_path / "metrics", flush_interval=3600)
+    try:
+        assert metrics_directory() == str(tmp_path / "metrics")
+        results = list(
+            parse_many(QUERIES * 10, workers=3, chunksize=4, executor=executor)
+        )
+        assert sum(result.error is not None for result in results) == 20
+        snapshot = registry.collect()
+        assert _counter(snapshot, "sql_metadata_parses") == 30
+        assert sum(snapshot.buckets["statement"]) == 30
+        reasons = {
+            dict(labels)["reason"]: count
+            for (family, labels), count in snapshot.counters.items()
+            if family == "sql_metadata_failures"
+        }
+        assert reasons == {"syntax_error": 10, "unsupported_query_type": 10}
+        assert "sql_metadata_parses_total 30" in registry.render().splitlines()
+    finally:
+        disable_metrics()
+    assert metrics_directory() is None
+
+
+def test_files_of_other_processes(tmp_path):
+    directory = tmp_path / "metrics"
+    registry = MetricsRegistry(directory, flush_interval=0)
+    Parser("SELECT a FROM t").tables  # not registered as an observer
+    registry(StageEvent("parse", 0, 1_000, 0, 0, {}))
+    assert os.listdir(directory) == [f"{os.getpid()}.json"]
+    (directory / "1.json").write_text((directory / f"{os.getpid()}.json").read_text())
+    (directory / "2.json").write_text("not json")
+    (directory / "notes.txt").write_text("")
+    registry(StageEvent("parse", 0, 1_000, 0, 0, {}))
+    snapshot = registry.collect()
+    assert _counter(snapshot, "sql_metadata_parses") == 3
+    assert sum(snapshot.buckets["parse"]) == 3
+    assert snapshot.sums["parse"] == pytest.approx(3e-6)
+
+
+def test_process_wide_registry(tmp_path):
+    assert get_metrics() is None
+    flush_metrics()
+    record_metrics(str(tmp_path))
+    registry = get_metrics()
+    assert registry is not None and registry.directory == str(tmp_path)
+    record_metrics(str(tmp_path / "other"))
+    assert get_metrics() is registry
+    Parser("SELECT a FROM t").tables
+    flush_metrics()
+    assert os.listdir(tmp_path) == [f"{os.getpid()}.json"]
+    disable_metrics()
+    disable_metrics()
+    assert get_metrics() is None
+
+
+def test_fork_starts_from_zero(registry):
+    parse_cache = enable_parse_cache()
+    try:
+        for _ in range(3):
+            Parser("SELECT a FROM t").tables
+        pid = os.fork()
+        if pid == 0:  # pragma: no cover - runs in the child
+            snapshot = registry.snapshot()
+            ok = _counter(snapshot, "sql_metadata_parses") == 0 and (
+                _counter(snapshot, "sql_metadata_cache_hits", cache="parse") == 0
+            )
+            os._exit(0 if ok else 1)
+        _, status = os.waitpid(pid, 0)
+        assert os.waitstatus_to_exitcode(status) == 0
+        assert _counter(registry.snapshot(), "sql_metadata_parses") == 3
+        sql_metadata.metrics._reset_after_fork()
+        snapshot = registry.snapshot()
+        assert _counter(snapshot, "sql_metadata_parses") == 0
+        assert _counter(snapshot, "sql_metadata_cache_hits", cache="parse") == 0
+        parse_cache.clear()  # counters below the fork baseline
+        Parser("SELECT a FROM t").tables
+        Parser("SELECT a FROM t").tables
+        snapshot = registry.snapshot()
+        assert _counter(snapshot, "sql_metadata_cache_hits", cache="parse") == 1
+    finally:
+        disable_parse_cache()
+
+
+def test_fork_without_registries(monkeypatch):
+    monkeypatch.setattr(sql_metadata.metrics, "_registries", set())
+    monkeypatch.setattr(sql_metadata.metrics, "_cache_counters", None)
+    sql_metadata.metrics._reset_after_fork()  # does not read the caches
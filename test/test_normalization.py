@@ -1,7 +1,13 @@
 # -*- coding: utf-8 -*-
 from __future__ import unicode_literals
 
+import hashlib
+
+import pytest
+
+from sql_metadata.generalizator import Generalizator
 from sql_metadata.parser import Parser
+from sql_metadata.token_stream import TokenStream
 
 
 def test_generalization_of_sql():
@@ -231,3 +237,144 @@ def test_generalize_insert():
         == "INSERT into notification_stats.request_info "
         "( type, request_id, title, message, details ) values (XYZ)"
     )
+
+
+def test_generalize_collapses_like_runs_per_column():
+    assert (
+        Parser(
+            "SELECT * FROM t WHERE a = 1 or name LIKE 'x%' or name LIKE '%y' "
+            "and title LIKE 'z' and title LIKE 'w' OR name LIKE 'v'"
+        ).generalize
+        == "SELECT * FROM t WHERE a = N or name LIKE X ... "
+        "and title LIKE X ... OR name LIKE X ..."
+    )
+
+
+def test_generalize_collapses_lists_in_one_scan():
+    assert (
+        Parser(
+            "SELECT a FROM t WHERE b IN (1, 2) AND c IN (3) AND d IN ('x', 'y')"
+        ).generalize
+        == "SELECT a FROM t WHERE b IN (XYZ) AND c IN (XYZ)"
+    )
+    assert Parser("SELECT a FROM t WHERE b IN (1)").generalize == (
+        "SELECT a FROM t WHERE b IN (N)"
+    )
+    assert Parser("INSERT INTO t VALUES (1, 2), (3, 4)").generalize == (
+        "INSERT INTO t VALUES (XYZ), (N, N)"
+    )
+    assert Parser("SELECT a FROM t WHERE b IN (1,) OR c IN (,2)").generalize == (
+        "SELECT a FROM t WHERE b IN (N,) OR c IN (,N)"
+    )
+
+
+def test_generalize_does_not_tokenize(monkeypatch):
+    def tokenize(*args, **kwargs):
+        raise AssertionError("tokenized")
+
+    monkeypatch.setattr(TokenStream, "tokenize", tokenize)
+    assert (
+        Parser("SELECT /* a */ `b` FROM c # d\nWHERE e LIKE 'f%'").generalize
+        == "SELECT `b` FROM c WHERE e LIKE X"
+    )
+
+
+@pytest.mark.parametrize(
+    "sql, fingerprint",
+    [
+        ("", "e4a6a0577479b2b4"),
+        ("SELECT /* Test */ foo FROM bar WHERE id in (1, 2, 56)", "3926e700c1bf705f"),
+        # substitution cascade
+        ("SELECT * FROM t WHERE a = 'it\\'s' AND b IN (1, 2)", "49874bd59fbda192"),
+        # non-ASCII text and an undecodable byte (surrogateescape)
+        ("SELECT naïve FROM café WHERE id = 7 \udcff", "0168cb0bafa976e1"),
+    ],
+)
+def test_fingerprint_is_stable(sql, fingerprint):
+    # these values must never change: fingerprints are stored by users
+    parser = Parser(sql)
+    assert parser.fingerprint_hex == fingerprint
+    assert parser.fingerprint == int(fingerprint, 16)
+    expected = hashlib.blake2b(
+        parser.generalize.encode("utf-8", "surrogatepass"), digest_size=8
+    )
+    assert expected.hexdigest() == fingerprint
+
+
+def test_fingerprint_groups_generalized_queries():
+    first = Generalizator("SELECT a FROM t WHERE id IN (1, 2) -- x")
+    second = Generalizator("select a from t where id in (3, 4)")
+    third = Generalizator("SELECT a FROM t WHERE id IN (3, 4)")
+    assert first.fingerprint != second.fingerprint
+    assert first.fingerprint == third.fingerprint
+    assert 0 <= first.fingerprint < 2**64
+    assert len(first.fingerprint_hex) == 16
+
+
+@pytest.mark.parametrize(
+    "sql",
+    [
+        # falls back to the substitution cascade
+        "SELECT 'it\\'s' FROM t",
+        "SELECT 'unterminated FROM t",
+        "SELECT /* a /* nested */ comment */ 1",
+        "SELECT x'1F', b'01' FROM t # mysql",
+        'SELECT "it\'s" FROM t',
+        "SELECT \"a  b\" FROM t WHERE c LIKE 'd'",
+        "SELECT a FROM t WHERE b like x or b like x",
+        "SELECT a FROM t WHERE b LIKE 'LIKE '",
+        "SELECT a FROM t WHERE b LIKE 'c''d'",
+        "SELECT a FROM t WHERE b LIKE ''' d'",
+        "SELECT a FROM t WHERE 'or b' c LIKE 'd'",
+        "SELECT a FROM t WHERE floor b LIKE 'c' floor b LIKE 'c'",
+        # rendered in one pass
+        'SELECT "a  b", "" FROM t',
+        "a LIKE 'b'",
+        '"" IN (1, 2)',
+        "% IN (1, 2) LIKE",
+        "SELECT a % b FROM t WHERE c LIKE %'d' or e LIKE 'f'",
+        "SELECT a FROM t WHERE b = 1 or c LIKE 'd' % or c LIKE 'e'",
+        "SELECT a FROM t WHERE b = 1 or c LIKE 'd'% or c LIKE 'e'",
+        "SELECT a FROM t WHERE b LIKE 'c' or d LIKE 'e' or d LIKE ''",
+        "SELECT a FROM t WHERE b NOT LIKE 'c' LIKE 'd' and e LIKE 'f'",
+        "SELECT a FROM t WHERE b = 'c  d' or e LIKE N'f'",
+        "SELECT a-1, a -1, a - 1, 'b'-2 FROM t",
+        "SELECT a FROM t WHERE b IN (c) OR d IN (e,) OR f IN (g, h)",
+        "SELECT a FROM t WHERE b IN (1,",
+        "SELECT a FROM t WHERE b IN (,1) OR c IN (1,)",
+    ],
+)
+def test_generalize_matches_substitution_cascade(sql):
+    generalizator = Generalizator(sql)
+    assert generalizator.generalize == generalizator._generalize_cascade()
+
+
+def test_normalize_likes_collapses_each_run_of_clauses():
+    sql = "a or b like x or b like x OR b like x or b LIKE X and c LIKE '%d%' x"
+    assert Generalizator._normalize_likes(sql) == (
+        "a or b like x ... OR b like x ... or b LIKE X ... and c LIKE X ... x"
+    )
+    # one scan for any number of distinct clauses (the cascade handles
+    # backslash escapes)
+    sql = "SELECT a FROM t WHERE b = 1" + "".join(
+        f" or c{i} LIKE 'd\\n{i}'" for i in range(8000)
+    )
+    generalized = Generalizator(sql).generalize
+    assert generalized.startswith("SELECT a FROM t WHERE b = N or cN LIKE X ... or")
+    assert generalized.count(" LIKE X") == 8000
+
+
+def test_generalize_many_keeps_input_order():
+    queries = [
+        "SELECT /* a */ b FROM c WHERE d IN (1, 2)",
+        "",
+        "SELECT a FROM t WHERE b = 'it\\'s'",  # substitution cascade
+        "INSERT INTO t VALUES (1, 'x')",
+    ] * 3
+    expected = [Parser(sql).generalize for sql in queries]
+    assert list(Generalizator.generalize_many(iter(queries), chunksize=5)) == expected
+    assert (
+        list(Generalizator.generalize_many(queries, workers=2, chunksize=2)) == expected
+    )
+    with pytest.raises(ValueError, match="positive"):
+        Generalizator.generalize_many(queries, chunksize=0)
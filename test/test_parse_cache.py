@@ -0,0 +1,135 @@
+import pytest
+
+from sql_metadata import (
+    Parser,
+    QueryType,
+    disable_parse_cache,
+    enable_parse_cache,
+    get_parse_cache,
+)
+from sql_metadata.parse_cache import CacheStats, ParseCache, estimate_size
+
+
+@pytest.fixture
+def cache():
+    cache = enable_parse_cache()
+    yield cache
+    disable_parse_cache()
+
+
+def test_parse_cache_disabled_by_default():
+    assert get_parse_cache() is None
+    assert Parser("SELECT a FROM b").tables == ["b"]
+
+
+def test_parse_cache_hit_skips_cleaning_and_parsing(cache, monkeypatch):
+    query = "REPLACE INTO t (a) VALUES (1)"
+    assert Parser(query).query_type == QueryType.REPLACE
+    assert cache.stats() == CacheStats(0, 1, 0, 1, cache.stats().size)
+
+    def fail(*args):
+        raise AssertionError("cached query was parsed again")
+
+    monkeypatch.setattr("sql_metadata.ast_parser.SqlCleaner.clean", fail)
+    monkeypatch.setattr("sql_metadata.ast_parser.DialectParser.parse", fail)
+    parser = Parser(query)
+    assert parser.query_type == QueryType.REPLACE
+    assert parser.values == [1]
+    assert cache.stats().hits == 1
+
+
+def test_parse_cache_shares_dialect_and_cte_names(cache):
+    query = "WITH db.cte AS (SELECT `a` FROM t) SELECT a FROM db.cte"
+    first = Parser(query)
+    second = Parser(query)
+    assert first.tables == second.tables == ["t"]
+    assert first.with_names == second.with_names == ["db.cte"]
+    assert second._ast_parser.dialect == first._ast_parser.dialect
+    # each parser gets its own copy of the placeholder map
+    assert second._ast_parser.cte_name_map is not first._ast_parser.cte_name_map
+
+
+def test_parse_cache_keeps_hinted_parses_apart(cache):
+    query = 'SELECT "a" FROM t'
+    assert Parser(query).columns == ["a"]
+    hinted = Parser(query, dialect_hint="mysql")
+    assert hinted.columns == []
+    assert hinted._ast_parser.dialect == "mysql"
+    assert Parser(query).columns == ["a"]
+    assert Parser(query, dialect_hint="mysql").columns == []
+    assert cache.stats()[:4] == (2, 2, 0, 2)
+
+
+def test_parse_cache_ast_is_not_mutated_by_extraction(cache):
+    query = """
+    WITH x AS (SELECT "a" AS a1, b FROM t1)
+    SELECT s.a1, s.b FROM (SELECT a1, b FROM x) AS s
+    JOIN t2 ON s.b = t2.b WHERE t2.c > 1 LIMIT 10
+    """
+    Parser(query).columns
+    cached = cache.get(query).ast
+    before = cached.sql()
+
+    parser = Parser(query)
+    for attr in (
+        "columns_dict",
+        "columns_aliases",
+        "output_columns",
+        "tables_aliases",
+        "with_queries",
+        "subqueries",
+        "limit_and_offset",
+        "query_type",
+    ):
+        getattr(parser, attr)
+    assert parser._ast_parser.ast is cached
+    assert cached.sql() == before
+
+
+def test_parse_cache_does_not_store_failures(cache):
+    with pytest.raises(ValueError):
+        Parser("SELECT * FROM t WHERE a = 'x").tables
+    with pytest.raises(ValueError):
+        Parser("/* only a comment */").query_type
+    assert len(cache) == 0
+
+
+def test_parse_cache_evicts_least_recently_used():
+    cache = ParseCache(max_entries=2)
+    ast = Parser("SELECT a FROM b")._ast_parser.ast
+    cache.put("q1", ast, None, False, {})
+    cache.put("q2", ast, None, False, {})
+    assert cache.get("q1") is not None
+    cache.put("q3", ast, None, False, {})
+    assert cache.get("q2") is None
+    assert cache.get("q1") is not None
+    assert cache.stats().evictions == 1
+    assert cache.stats().entries == 2
+
+    cache.clear()
+    assert cache.stats() == CacheStats(0, 0, 0, 0, 0)
+
+
+def test_parse_cache_memory_budget():
+    ast = Parser("SELECT a, b, c FROM t WHERE d = 1")._ast_parser.ast
+    size = estimate_size("q1", ast)
+    cache = ParseCache(max_entries=100, max_bytes=2 * size)
+    cache.put("q1", ast, None, False, {})
+    cache.put("q1", ast, None, False, {})
+    assert cache.stats().size == size
+    cache.put("q2", ast, None, False, {})
+    cache.put("q3", ast, None, False, {})
+    assert len(cache) == 2
+    assert cache.stats().size <= cache.max_bytes
+
+    # an entry larger than the whole budget is never stored
+    tiny = ParseCache(max_bytes=10)
+    tiny.put("q1", ast, None, False, {})
+    assert len(tiny) == 0
+
+
+def test_parse_cache_rejects_invalid_limits():
+    with pytest.raises(ValueError):
+        ParseCache(max_entries=0)
+    with pytest.raises(ValueError):
+        ParseCache(max_bytes=0)
@@ -1,6 +1,7 @@
 import pytest
 
 from sql_metadata import InvalidQueryDefinition, Parser, QueryType
+from sql_metadata.query_type_extractor import QueryTypeExtractor
 
 
 def test_insert_query():
@@ -180,3 +181,16 @@ def test_execute_command_not_supported():
     """EXECUTE parses as Command but isn't a known type — raises ValueError."""
     with pytest.raises(InvalidQueryDefinition, match="Not supported query type"):
         Parser("EXECUTE sp_help").query_type
+
+
+def test_query_type_extractor_lazy_raw_query():
+    """The raw query may be passed as a string or as a lazy callable."""
+    with pytest.raises(InvalidQueryDefinition, match="Empty queries"):
+        QueryTypeExtractor(None, "/* only a comment */").extract()
+
+    calls = []
+    extractor = QueryTypeExtractor(
+        Parser("SELECT 1")._ast_parser.ast, lambda: calls.append(1) or ""
+    )
+    assert extractor.extract() == QueryType.SELECT
+    assert calls == []
@@ -0,0 +1,134 @@
+import gc
+import pickle
+import sys
+import weakref
+from types import MappingProxyType
+
+import pytest
+from sqlglot import exp
+
+from sql_metadata import Parser, QueryResult
+from sql_metadata.extraction_plan import FIELDS
+
+QUERY = """
+WITH recent AS (SELECT user_id, MAX(ts) AS last_ts FROM events GROUP BY user_id)
+SELECT u.name, r.last_ts, s.total
+FROM users u
+JOIN recent r ON r.user_id = u.id
+JOIN (SELECT user_id, SUM(amount) AS total FROM orders GROUP BY user_id) s
+  ON s.user_id = u.id
+WHERE u.id IN (1, 2) LIMIT 10
+"""
+
+
+def test_slots_cover_every_field():
+    assert set(QueryResult.__slots__) == FIELDS | {"_fields"}
+    result = Parser("SELECT a FROM t").to_result()
+    assert not hasattr(result, "__dict__")
+
+
+def test_to_result_matches_the_parser():
+    parser = Parser(QUERY)
+    fields = sorted(FIELDS - {"values", "values_dict", "values_columnar"})
+    result = parser.to_result(fields)
+    assert result.fields == tuple(fields)
+    for field in fields:
+        value = getattr(result, field)
+        expected = getattr(parser, field)
+        if isinstance(expected, dict):
+            assert isinstance(value, MappingProxyType)
+            assert dict(value) == {
+                key: tuple(item) if isinstance(item, list) else item
+                for key, item in expected.items()
+            }
+        elif isinstance(expected, list):
+            assert value == tuple(expected)
+        else:
+            assert value == expected
+
+
+def test_default_fields_and_unset_fields():
+    result = Parser("SELECT a FROM t").to_result()
+    assert result.fields == ("query_type", "tables", "columns")
+    assert result.tables == ("t",)
+    assert type(result.tables) is tuple
+    with pytest.raises(AttributeError):
+        _ = result.values
+
+
+def test_values_are_frozen_but_not_interned():
+    result = Parser("INSERT INTO t (a, b) VALUES (1, 'x'), (2, 'y')").to_result(
+        ["values", "values_dict"]
+    )
+    assert result.values == ((1, "x"), (2, "y"))
+    assert result.values_dict == {"a": (1, 2), "b": ("x", "y")}
+
+
+def test_identifiers_are_interned():
+    first = Parser("SELECT some_column FROM some_table").to_result()
+    second = Parser("SELECT some_column FROM some_table WHERE 1 = 1").to_result()
+    assert first.columns[0] is second.columns[0]
+    assert first.tables[0] is sys.intern("some_table")
+
+
+def test_result_is_read_only():
+    result = Parser("SELECT a FROM t").to_result()
+    with pytest.raises(AttributeError, match="read-only"):
+        result.tables = ("u",)
+    with pytest.raises(AttributeError, match="read-only"):
+        del result.tables
+    with pytest.raises(TypeError):
+        hash(result)
+
+
+def test_equality_repr_and_pickle():
+    result = Parser(QUERY).to_result(["tables", "columns_dict", "limit_and_offset"])
+    copy = pickle.loads(pickle.dumps(result))
+    assert copy == result
+    assert copy.as_dict() == {
+        "tables": ("events", "users", "orders"),
+        "columns_dict": result.as_dict()["columns_dict"],
+        "limit_and_offset": (10, 0),
+    }
+    assert type(copy.as_dict()["columns_dict"]) is dict
+    assert result != Parser("SELECT a FROM t").to_result(["tables"])
+    assert result != "tables"
+    assert repr(Parser("SELECT a FROM t").to_result(["tables"])) == (
+        "QueryResult(tables=('t',))"
+    )
+
+
+def test_unknown_field():
+    with pytest.raises(ValueError, match="Unknown fields: nope"):
+        QueryResult({"nope": 1})
+
+
+def test_release_drops_the_ast():
+    parser = Parser(QUERY)
+    ast = weakref.ref(parser._ast_parser.ast)
+    parser.release(["columns", "subqueries_names"])
+    assert parser._resolver is None
+    assert parser._subquery_nodes is None
+    assert not parser._ast_parser.is_parsed
+    gc.collect()
+    assert ast() is None
+    # computed properties are kept, others parse the query again
+    assert parser.columns == Parser(QUERY).columns
+    assert not parser._ast_parser.is_parsed
+    assert parser.subqueries == Parser(QUERY).subqueries
+    assert parser._ast_parser.is_parsed
+
+
+def test_release_of_a_sub_parser_renders_its_body():
+    cte = Parser(QUERY)._ast_parser.ast.find(exp.CTE)
+    sub = Parser._from_subtree(cte.this)
+    sub.release()
+    assert sub._sql_node is None
+    assert sub.tables == ["events"]
+
+
+def test_release_before_parsing_keeps_the_hint():
+    parser = Parser("SELECT [a] FROM [t]", dialect_hint="tsql")
+    parser.release()
+    assert parser._ast_parser._dialect_hint == "tsql"
+    assert parser.columns == ["a"]
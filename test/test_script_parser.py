@@ -0,0 +1,240 @@
+import pytest
+
+from sql_metadata import Parser, QueryType
+from sql_metadata.script_parser import ScriptParser, StatementSplitter
+
+SCRIPT = """-- schema
+CREATE TABLE t (id INT, name VARCHAR(10));
+INSERT INTO t VALUES (1, 'a;b'), (2, "x;y"); /* done; really */
+;;
+DELIMITER //
+CREATE PROCEDURE p()
+BEGIN
+  SELECT 1; SELECT 2;
+END//
+DELIMITER ;
+CREATE TRIGGER trg BEFORE INSERT ON t FOR EACH ROW
+BEGIN
+  IF NEW.id > 0 THEN SET NEW.name = 'z'; END IF;
+  CASE NEW.id WHEN 1 THEN SET NEW.name = 'one'; END CASE;
+  SET @x = CASE WHEN 1 THEN 2 END;
+END;
+BEGIN TRANSACTION;
+UPDATE t SET name = 'q' WHERE id = 1;
+COMMIT;
+SELECT `a;b` FROM t"""
+
+
+def _sql(script, **kwargs):
+    return [s.sql for s in ScriptParser(script, **kwargs).statements()]
+
+
+def test_splits_script():
+    statements = _sql(SCRIPT)
+    assert statements[:3] == [
+        "-- schema\nCREATE TABLE t (id INT, name VARCHAR(10))",
+        "INSERT INTO t VALUES (1, 'a;b'), (2, \"x;y\")",
+        "CREATE PROCEDURE p()\nBEGIN\n  SELECT 1; SELECT 2;\nEND",
+    ]
+    assert statements[3].startswith("CREATE TRIGGER")
+    assert statements[3].endswith("SET @x = CASE WHEN 1 THEN 2 END;\nEND")
+    assert statements[4:] == [
+        "BEGIN TRANSACTION",
+        "UPDATE t SET name = 'q' WHERE id = 1",
+        "COMMIT",
+        "SELECT `a;b` FROM t",
+    ]
+
+
+def test_offsets_point_into_the_script():
+    for statement in ScriptParser(SCRIPT).statements():
+        assert SCRIPT.startswith(statement.sql, statement.offset)
+
+
+@pytest.mark.parametrize(
+    "chunks",
+    [
+        SCRIPT.splitlines(keepends=True),
+        list(SCRIPT),
+        [SCRIPT[i : i + 7] for i in range(0, len(SCRIPT), 7)],
+    ],
+    ids=["lines", "characters", "blocks"],
+)
+def test_chunking_does_not_change_statements(chunks):
+    assert list(ScriptParser(chunks).statements()) == list(
+        ScriptParser(SCRIPT).statements()
+    )
+
+
+def test_buffer_holds_one_statement():
+    splitter = StatementSplitter()
+    longest = 0
+    for row in range(1000):
+        line = f"INSERT INTO t VALUES ({row}, 'row {row}');\n"
+        (statement,) = splitter.feed(line)
+        assert statement.sql == line[:-2]
+        longest = max(longest, len(splitter._buffer))
+    assert longest < 100
+    assert splitter.close() == []
+
+
+def test_custom_delimiter_and_delimiter_inside_token():
+    script = "-- routines\nDELIMITER $$\nCREATE PROCEDURE p() BEGIN SELECT 1; END$$"
+    assert _sql(script) == ["CREATE PROCEDURE p() BEGIN SELECT 1; END"]
+    splitter = StatementSplitter()
+    statements = splitter.feed("SELECT 1;\nDELIMITER //\nSELECT 2; SELECT 3//\n")
+    assert [s.sql for s in statements] == ["SELECT 1", "SELECT 2; SELECT 3"]
+    assert splitter.delimiter == "//"
+    assert _sql("SELECT 1 GO\nSELECT 'GO' GO", delimiter="GO") == [
+        "SELECT 1",
+        "SELECT 'GO'",
+    ]
+
+
+def test_skips_empty_and_comment_only_statements():
+    assert _sql("; -- nothing\n;/* x */;\n-- tail") == []
+    assert _sql("") == []
+
+
+def test_trailing_begin_and_unterminated_string():
+    assert _sql("SELECT 1; BEGIN") == ["SELECT 1", "BEGIN"]
+    assert _sql("SELECT 1;\nSELECT 'abc") == ["SELECT 1", "SELECT 'abc"]
+
+
+def test_splits_before_an_unterminated_token():
+    assert _sql("SELECT 1; SELECT 'unterminated") == [
+        "SELECT 1",
+        "SELECT 'unterminated",
+    ]
+    splitter = StatementSplitter()
+    assert [s.sql for s in splitter.feed("SELECT 1; SELECT 'a;\n")] == ["SELECT 1"]
+    assert [s.sql for s in splitter.feed("b'; SELECT 2;\n")] == [
+        "SELECT 'a;\nb'",
+        "SELECT 2",
+    ]
+
+
+def test_hash_comments_and_dialect_hint():
+    assert _sql("SELECT 1; # a ; comment\nSELECT 2") == [
+        "SELECT 1",
+        "# a ; comment\nSELECT 2",
+    ]
+    # backslash-escaped quotes need the MySQL tokenizer
+    script = "INSERT INTO t VALUES ('it\\'s; fine'); SELECT 1"
+    assert _sql(script, dialect_hint="mysql") == [
+        "INSERT INTO t VALUES ('it\\'s; fine')",
+        "SELECT 1",
+    ]
+
+
+def test_iter_statements_yields_lazy_parsers():
+    parsers = list(Parser.iter_statements(SCRIPT, source="migrations"))
+    assert all(parser._ast_parser._ast is None for parser in parsers)
+    assert [p.query_type for p in parsers[:3]] == [
+        QueryType.CREATE,
+        QueryType.INSERT,
+        QueryType.CREATE,
+    ]
+    assert parsers[1].values[0] == [1, "a;b"]
+    assert parsers[-1].tables == ["t"]
+    assert parsers[-1]._ast_parser._source == "migrations"
+
+
+def test_iter_statements_reads_files(tmp_path):
+    path = tmp_path / "dump.sql"
+    path.write_text("INSERT INTO a VALUES ('it\\'s');\nINSERT INTO b VALUES (2);\n")
+    with path.open() as script:
+        parsers = Parser.iter_statements(script, dialect_hint="mysql")
+        assert [parser.tables for parser in parsers] == [["a"], ["b"]]
+
+
+def _count_tokenized(monkeypatch):
+    tokenized = [0]
+    original = StatementSplitter._tokenizer
+
+    def counting(self, sql):
+        tokenized[0] += len(sql)
+        return original(self, sql)
+
+    monkeypatch.setattr(StatementSplitter, "_tokenizer", counting)
+    return tokenized
+
+
+@pytest.mark.parametrize(
+    "lines, last",
+    [
+        # a pretty-printed multi-row INSERT
+        (
+            ["INSERT INTO t (a, b) VALUES\n"]
+            + [f"  ({row}, 'row {row}'),\n" for row in range(20_000)],
+            "  (0, 'end');\n",
+        ),
+        # a string literal and a block comment spanning many lines
+        (
+            ["INSERT INTO t VALUES ('start\n"]
+            + [f'line {row}; "quoted"\n' for row in range(5000)],
+            "end');\n",
+        ),
+        (
+            ["SELECT 1 /* start\n"] + [f"line {row}; 'x'\n" for row in range(3000)],
+            "*/;\n",
+        ),
+    ],
+    ids=["insert", "string", "comment"],
+)
+def test_long_statements_are_tokenized_once(monkeypatch, lines, last):
+    tokenized = _count_tokenized(monkeypatch)
+    splitter = StatementSplitter()
+    statements = []
+    for line in [*lines, last, "SELECT 2;\n"]:
+        statements += splitter.feed(line)
+    assert [s.sql for s in statements] == ["".join(lines) + last[:-2], "SELECT 2"]
+    assert tokenized[0] < 3 * len("".join(lines))
+    assert len(splitter._buffer) < 100
+
+
+@pytest.mark.parametrize(
+    "dialect, opening, closing",
+    [("postgres", "$body$", "$body$"), ("tsql", "[", "]")],
+    ids=["dollar-quoted", "bracketed"],
+)
+def test_dialect_quotes_spanning_lines_are_tokenized_once(
+    monkeypatch, dialect, opening, closing
+):
+    tokenized = _count_tokenized(monkeypatch)
+    splitter = StatementSplitter(dialect=dialect)
+    lines = [f"SELECT 1; SELECT {opening}start\n"]
+    lines += [f"line {row};\n" for row in range(2000)]
+    statements = []
+    for line in [*lines, f"{closing};\n", "SELECT 2;\n"]:
+        statements += splitter.feed(line)
+    body = "".join(lines)[len("SELECT 1; ") :]
+    assert [s.sql for s in statements] == ["SELECT 1", body + closing, "SELECT 2"]
+    assert tokenized[0] < 3 * len("".join(lines))
+
+
+def test_unterminated_token_is_retried_when_the_text_doubles(monkeypatch):
+    tokenized = _count_tokenized(monkeypatch)
+    splitter = StatementSplitter()
+    # the closing quote of 'b'' is in the text, but the string goes on
+    assert splitter.feed("SELECT 'a'';\n") == []
+    for row in range(2000):
+        assert splitter.feed(f"x{row};\n") == []
+    assert tokenized[0] < 4 * 2000 * len("x1000;\n")
+    assert [s.sql for s in splitter.feed("';\n")][0].endswith("x1999;\n'")
+    statements = StatementSplitter().feed("SELECT 'x\ny';\n")
+    assert [s.sql for s in statements] == ["SELECT 'x\ny'"]
+
+
+def test_unknown_unterminated_token_is_retried_when_the_text_doubles(monkeypatch):
+    tokenized = _count_tokenized(monkeypatch)
+    splitter = StatementSplitter()
+    # the closer of a {# ... #} comment is not known to the splitter
+    assert splitter.feed("SELECT {# a;\n") == []
+    for row in range(2000):
+        assert splitter.feed(f"b{row};\n") == []
+    assert tokenized[0] < 4 * 2000 * len("b1000;\n")
+    # ... so the statement is only split off once the text doubled again
+    assert splitter.feed("#} 1;\nSELECT 2;\n") == []
+    statements = splitter.close()
+    assert [s.sql[-10:] for s in statements] == ["1999;\n#} 1", "SELECT 2"]
@@ -0,0 +1,87 @@
+import logging
+import threading
+
+import pytest
+
+from sql_metadata import Parser, ProbeStrategy, parse_many
+from sql_metadata.dialect_parser import DialectParser, _quiet_sqlglot
+from sql_metadata.extraction_plan import FIELDS
+from sql_metadata.parse_cache import disable_parse_cache, enable_parse_cache
+
+QUERIES = [
+    "SELECT a, b FROM t1 WHERE c = 1",
+    "INSERT IGNORE INTO t2 (x, y) VALUES (1, 'a')",
+    "SELECT UNIQUE col FROM t3",
+    "SELECT `a`.`b` FROM `db`.`t4` AS `a`",
+    "SELECT [a] FROM [dbo].[t5]",
+    "SELECT * FROM #temp WHERE id = 1",
+    "SELECT a, x FROM t6 LATERAL VIEW explode(b) tbl AS x",
+    "WITH c AS (SELECT a FROM t7) SELECT c.a, (SELECT max(b) FROM t8) AS m FROM c",
+    "SELECT s.a FROM (SELECT a FROM t9 JOIN t10 ON t9.id = t10.id) AS s",
+    "UPDATE t11 SET a = 1 WHERE b IN (SELECT b FROM t12)",
+    "ALTER TABLE t13 APPEND FROM t14",
+    "SELECT * FROM t WHERE a = 'x",
+    "SHOW TABLES",
+]
+# every field but the streaming one, which needs VALUES
+_FIELDS = sorted(FIELDS - {"values_columnar"})
+
+
+def test_parse_many_threads_match_sequential():
+    queries = QUERIES * 20
+    expected = list(parse_many(queries, workers=1, fields=_FIELDS))
+    results = list(
+        parse_many(queries, workers=8, fields=_FIELDS, chunksize=1, executor="thread")
+    )
+    assert results == expected
+
+
+@pytest.mark.parametrize("strategy", list(ProbeStrategy))
+@pytest.mark.parametrize("cached", [False, True], ids=["uncached", "parse_cache"])
+def test_concurrent_parsers_are_independent(monkeypatch, strategy, cached):
+    monkeypatch.setattr(DialectParser, "default_strategy", strategy)
+    if cached:
+        enable_parse_cache()
+    try:
+        expected = [Parser(sql).extract(_FIELDS) for sql in QUERIES[:-2]]
+        threads = 8
+        barrier = threading.Barrier(threads)
+        results: list = [None] * threads
+        level = logging.getLogger("sqlglot").level
+
+        def work(slot):
+            barrier.wait()
+            results[slot] = [
+                Parser(sql, disable_logging=slot % 2 == 0).extract(_FIELDS)
+                for _ in range(5)
+                for sql in QUERIES[:-2]
+            ]
+
+        workers = [threading.Thread(target=work, args=(i,)) for i in range(threads)]
+        for worker in workers:
+            worker.start()
+        for worker in workers:
+            worker.join()
+        assert all(result == expected * 5 for result in results)
+        assert logging.getLogger("sqlglot").level == level
+    finally:
+        disable_parse_cache()
+
+
+def test_quiet_sqlglot_only_silences_the_probing_thread(caplog):
+    logger = logging.getLogger("sqlglot")
+    with _quiet_sqlglot():
+        logger.warning("probing")
+        other = threading.Thread(target=logger.warning, args=("elsewhere",))
+        other.start()
+        other.join()
+    logger.warning("after")
+    assert [r.getMessage() for r in caplog.records] == ["elsewhere", "after"]
+
+
+def test_disable_logging_does_not_touch_shared_logger():
+    shared = logging.getLogger("Parser")
+    parser = Parser("SELECT a FROM t", disable_logging=True)
+    assert parser._logger.disabled
+    assert not shared.disabled
+    assert not Parser("SELECT a FROM t")._logger.disabled
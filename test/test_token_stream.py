@@ -0,0 +1,89 @@
+from collections import Counter
+
+import pytest
+from sqlglot.dialects.dialect import Dialect
+from sqlglot.errors import TokenError
+
+from sql_metadata import Parser
+from sql_metadata.token_stream import TokenStream, get_dialect
+
+
+@pytest.fixture
+def tokenize_calls(monkeypatch):
+    calls = Counter()
+    original = Dialect.tokenize
+
+    def counting(self, sql, dialect=None):
+        calls[(type(self).__name__, sql)] += 1
+        return original(self, sql, dialect)
+
+    monkeypatch.setattr(Dialect, "tokenize", counting)
+    return calls
+
+
+def test_token_stream_memoises_per_dialect(tokenize_calls):
+    stream = TokenStream("SELECT a FROM t")
+    assert stream.tokenize() is stream.tokenize(None)
+    assert stream.tokenize("mysql") is stream.tokenize("mysql")
+    assert [t.text for t in stream.tokenize()] == ["SELECT", "a", "FROM", "t"]
+    assert tokenize_calls == {
+        ("Dialect", "SELECT a FROM t"): 1,
+        ("MySQL", "SELECT a FROM t"): 1,
+    }
+
+    assert TokenStream.of("SELECT a FROM t", stream) is stream
+    assert TokenStream.of("SELECT b FROM t", stream) is not stream
+    assert TokenStream.of("SELECT b FROM t").sql == "SELECT b FROM t"
+
+
+def test_token_stream_memoises_errors(tokenize_calls):
+    stream = TokenStream("SELECT 'unterminated")
+    for _ in range(2):
+        with pytest.raises(TokenError):
+            stream.tokenize()
+    assert sum(tokenize_calls.values()) == 1
+
+
+def test_parser_tokenizes_query_once_per_flavour(tokenize_calls):
+    query = "SELECT a, b FROM t WHERE c = 1 # trailing comment"
+    parser = Parser(query)
+    assert parser.tables == ["t"]
+    assert parser.columns == ["a", "b", "c"]
+    assert parser.comments == ["# trailing comment"]
+    assert parser.without_comments == "SELECT a, b FROM t WHERE c = 1"
+    assert parser.generalize == "SELECT a, b FROM t WHERE c = N"
+    assert parser.tokens[:2] == ["SELECT", "a"]
+    assert parser.query == query
+    # the raw query: default tokenizer (for .query) and MySQL (comments,
+    # .tokens, cleaning); the cleaned SQL is parsed by the default dialect
+    assert tokenize_calls == {
+        ("Dialect", query): 1,
+        ("MySQL", query): 1,
+        ("Dialect", "SELECT a, b FROM t WHERE c = 1"): 1,
+    }
+
+
+def test_parser_parses_from_cleaning_tokens(tokenize_calls):
+    query = "SELECT `a` FROM `t`"
+    assert Parser(query).columns == ["a"]
+    # mysql is tried first for back-ticks and reuses the tokens produced
+    # while stripping comments, as cleaning left the query unchanged
+    assert tokenize_calls == {("MySQL", query): 1}
+
+
+def test_subquery_parser_token_stream():
+    parser = Parser("WITH x AS (SELECT a FROM t) SELECT a FROM x")
+    parser.columns
+    sub = parser._get_resolver()._subparser(
+        "x", parser._get_resolver().extract_cte_nodes({}), {}
+    )
+    assert sub._token_stream is None
+    assert sub.tokens == ["SELECT", "a", "FROM", "t"]
+    assert sub._token_stream.sql == "SELECT a FROM t"
+
+
+def test_named_dialects_are_shared():
+    assert get_dialect("mysql") is get_dialect("mysql")
+    assert get_dialect(None) is get_dialect(None)
+    instance = Dialect.get_or_raise("tsql")
+    assert get_dialect(instance) is instance
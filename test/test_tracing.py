@@ -0,0 +1,138 @@
+import json
+import os
+
+import pytest
+
+import sql_metadata.tracing
+from sql_metadata import Parser, parse_many
+from sql_metadata.instrumentation import StageEvent
+from sql_metadata.tracing import (
+    TraceWriter,
+    chrome_event,
+    current_trace_dir,
+    flush_trace,
+    tracing,
+)
+
+QUERY = """
+WITH recent AS (SELECT user_id, MAX(ts) AS last_ts FROM events GROUP BY user_id)
+SELECT u.name, r.last_ts FROM users u JOIN recent r ON r.user_id = u.id
+"""
+
+
+def _events(path):
+    with open(path, encoding="utf-8") as trace:
+        data = json.load(trace)
+    assert data["displayTimeUnit"] == "ms"
+    return data["traceEvents"]
+
+
+def _inside(inner, outer):
+    return (
+        outer["ts"] <= inner["ts"]
+        and inner["ts"] + inner["dur"] <= outer["ts"] + outer["dur"]
+    )
+
+
+def test_trace_of_one_query(tmp_path):
+    path = tmp_path / "trace.json"
+    with tracing(path):
+        assert current_trace_dir() is not None
+        Parser(QUERY).columns
+    assert current_trace_dir() is None
+    assert os.listdir(tmp_path) == ["trace.json"]
+    events = _events(path)
+    names = [event["name"] for event in events]
+    for name in ("parse", "clean", "parse_attempt", "extract_columns", "sub_parser"):
+        assert name in names
+    assert all(event["ph"] == "X" and event["pid"] == os.getpid() for event in events)
+    parse = next(event for event in events if event["name"] == "parse")
+    attempt = next(event for event in events if event["name"] == "parse_attempt")
+    assert _inside(attempt, parse)
+    assert attempt["args"]["dialect"] == "default"
+    assert attempt["args"]["outcome"] == "accepted"
+    resolve = next(event for event in events if event["name"] == "resolve_nested")
+    sub_parser = next(event for event in events if event["name"] == "sub_parser")
+    assert _inside(sub_parser, resolve)
+
+
+def test_stages_outside_the_block_are_not_recorded(tmp_path):
+    path = tmp_path / "trace.json"
+    with tracing(path):
+        pass
+    Parser(QUERY).tables
+    assert _events(path) == []
+
+
+@pytest.mark.parametrize("executor", ["process", "thread"])
+def test_trace_of_parse_many(tmp_path, executor):
+    path = tmp_path / "trace.json"
+    queries = [QUERY, "SELECT a FROM t", "SELECT * FROM `t` WHERE a = 'x"] * 4
+    with tracing(path):
+        results = list(parse_many(queries, workers=2, chunksize=3, executor=executor))
+    assert [result.index for result in results] == list(range(12))
+    events = _events(path)
+    statements = [event for event in events if event["name"] == "statement"]
+    assert sorted(event["args"]["index"] for event in statements) == list(range(12))
+    failed = [event for event in statements if "error" in event["args"]]
+    assert [event["args"]["index"] % 3 for event in failed] == [2] * 4
+    pids = {event["pid"] for event in statements}
+    if executor == "process":
+        assert os.getpid() not in pids
+    else:
+        assert pids == {os.getpid()}
+    for event in events:
+        if event["name"] == "extract_tables":
+            assert any(
+                _inside(event, statement)
+                for statement in statements
+                if statement["pid"] == event["pid"] and statement["tid"] == event["tid"]
+            )
+
+
+def test_nested_traces_are_rejected(tmp_path):
+    with tracing(tmp_path / "outer.json"):
+        with pytest.raises(RuntimeError, match="already being recorded"):
+            with tracing(tmp_path / "inner.json"):
+                pass  # pragma: no cover
+    assert _events(tmp_path / "outer.json") == []
+
+
+def test_trace_is_written_when_the_block_raises(tmp_path):
+    path = tmp_path / "trace.json"
+    with pytest.raises(ZeroDivisionError):
+        with tracing(path):
+            Parser("SELECT a FROM t").tables
+            1 / 0
+    assert "extract_tables" in [event["name"] for event in _events(path)]
+
+
+def test_writer_ignores_events_of_a_forked_child(tmp_path, monkeypatch):
+    path = tmp_path / "part.jsonl"
+    writer = TraceWriter(str(path))
+    event = StageEvent("clean", 2_000, 5_000, 4_000, 1, {"dialect": "mysql"})
+    monkeypatch.setattr(sql_metadata.tracing.os, "getpid", lambda: -1)
+    writer(event)
+    monkeypatch.undo()
+    writer(event)
+    writer.close()
+    [line] = path.read_text().splitlines()
+    assert json.loads(line) == chrome_event(event, os.getpid(), json.loads(line)["tid"])
+    assert json.loads(line)["args"] == {"dialect": "mysql", "cpu_us": 4.0}
+    assert (json.loads(line)["ts"], json.loads(line)["dur"]) == (2.0, 5.0)
+
+
+def test_fork_resets_the_writer(tmp_path):
+    path = tmp_path / "trace.json"
+    with tracing(path):
+        pid = os.fork()
+        if pid == 0:  # pragma: no cover - runs in the child
+            ok = sql_metadata.tracing._writer is None
+            os._exit(0 if ok else 1)
+        _, status = os.waitpid(pid, 0)
+        assert os.waitstatus_to_exitcode(status) == 0
+        writer = sql_metadata.tracing._writer
+        sql_metadata.tracing._reset_after_fork()
+        assert sql_metadata.tracing._writer is None
+        flush_trace()
+        sql_metadata.tracing._writer = writer
@@ -1,4 +1,10 @@
-from sql_metadata import Parser
+from array import array
+
+import pytest
+
+from sql_metadata import InvalidQueryDefinition, Parser
+from sql_metadata.columnar import ColumnBuffer, transpose
+from sql_metadata.values_scanner import ValuesScanner, scan_dialect
 
 
 def test_getting_values():
@@ -155,3 +161,138 @@ def test_insert_with_expression_value():
     """INSERT with a function call in VALUES uses str(val) fallback."""
     p = Parser("INSERT INTO t (a) VALUES (CURRENT_TIMESTAMP)")
     assert len(p.values) == 1
+
+
+def test_iter_values_streams_rows():
+    rows = ", ".join(f"({i}, 'row {i}', -{i}.5, NULL)" for i in range(500))
+    p = Parser(f"INSERT INTO `t` (a, b, c, d) VALUES {rows};")
+    streamed = p.iter_values()
+    assert next(streamed) == [0, "row 0", -0.5, "NULL"]
+    assert list(streamed)[-1] == [499, "row 499", -499.5, "NULL"]
+    assert p.tables == ["t"]
+    assert p.columns == ["a", "b", "c", "d"]
+    # only the head of the statement was parsed
+    assert "row 1'" not in p._ast_parser._raw_sql
+    assert p.values[1] == [1, "row 1", -1.5, "NULL"]
+    assert p.values_dict["b"][-1] == "row 499"
+
+
+def test_iter_values_keeps_rows_referencing_columns():
+    p = Parser(
+        "INSERT INTO t (a, b) VALUES (1, 'x'), (2, 'y'), "
+        "(3, (SELECT max(id) FROM u)) ON DUPLICATE KEY UPDATE b = VALUES(c)"
+    )
+    assert list(p.iter_values()) == [
+        [1, "x"],
+        [2, "y"],
+        [3, "(SELECT MAX(id) FROM u)"],
+    ]
+    assert "'y'" not in p._ast_parser._raw_sql
+    assert p.tables == ["t", "u"]
+    assert p.columns == ["a", "b", "id"]
+
+
+def test_iter_values_literals_match_values():
+    query = (
+        "REPLACE INTO `t` VALUES ('it\\'s', 1e3, - 2, TRUE, NOW(), "
+        "REPLACE('a', 'b', 'c'), 1 + 2), (0, FALSE, 'x', 'y', 'z', 'w', 'v')"
+    )
+    assert list(Parser(query).iter_values()) == Parser(query).values
+    p = Parser(query)
+    scanner = ValuesScanner(query, "mysql", window=8)
+    assert scanner.locate()
+    assert list(scanner.rows()) == p.values
+    assert p.query_type == "REPLACE"
+
+
+def test_binary_and_national_literals():
+    query = "INSERT INTO t (a, b) VALUES (X'AB', N'nat'), (b'01', 0x1F), (x'', 2)"
+    expected = [[171, "nat"], [1, 31], [0, 2]]
+    assert Parser(query).values == expected
+    streamed = Parser(query)
+    assert list(streamed.iter_values()) == expected
+    assert streamed.values == expected
+    assert streamed.columns == ["a", "b"]
+    assert Parser("INSERT INTO t (a) VALUES (X'AB')").values_dict == {"a": 171}
+
+
+def test_escape_string_literals():
+    query = r"INSERT INTO t (a, b) VALUES (E'it\'s\n', 1), (e'x', 2)"
+    expected = [["it's\n", 1], ["x", 2]]
+    assert Parser(query).values == expected
+    streamed = Parser(query)
+    assert list(streamed.iter_values()) == expected
+    assert streamed.values == expected
+    assert scan_dialect(query) == "postgres"
+    assert scan_dialect("INSERT INTO t VALUES ('E''x')") is None
+
+
+def test_binary_literals_in_strings_and_comments_are_text():
+    parser = Parser('SELECT "col" FROM t WHERE note = \'see 0x1F\' /* X\'AB\' */')
+    assert parser.columns == ["col", "note"]
+    assert scan_dialect("INSERT INTO t VALUES ('0x1F', \"b'01'\")") is None
+
+
+def test_iter_values_falls_back_to_the_ast():
+    p = Parser("INSERT INTO t (a) VALUES (1)")
+    assert p.values == [1]
+    assert list(p.iter_values()) == [[1]]
+    p = Parser("INSERT INTO t (a) VALUES (1), (2)")
+    assert p.tables == ["t"]
+    assert list(p.iter_values()) == [[1], [2]]
+    assert list(Parser("INSERT INTO t (a) SELECT b FROM u").iter_values()) == []
+    assert list(Parser("SELECT * FROM (VALUES (1)) AS v").iter_values()) == [[1]]
+    assert list(Parser("").iter_values()) == []
+
+
+def test_iter_values_malformed_rows():
+    assert list(Parser("INSERT INTO t VALUES (1, WHERE), (2").iter_values()) == [
+        [1, "WHERE"]
+    ]
+    with pytest.raises(InvalidQueryDefinition):
+        list(Parser("INSERT INTO t VALUES (1, 'abc").iter_values())
+
+
+def test_iter_values_head_before_rows_are_read():
+    p = Parser("INSERT INTO t (a, b) VALUES (1, 2), (3, 4)", dialect_hint="mysql")
+    assert next(p.iter_values()) == [1, 2]
+    assert p.columns == ["a", "b"]
+    assert p.values_dict == {"a": [1, 3], "b": [2, 4]}
+
+
+def test_values_columnar():
+    p = Parser(
+        "INSERT INTO t (a, b, c, d) VALUES (1, 2.5, 'x', 2), "
+        "(3, 4, NULL, 2.0), (-9223372036854775808, 1, 'y', 'z')"
+    )
+    columns = p.values_columnar
+    assert columns == {
+        "a": array("q", [1, 3, -(2**63)]),
+        "b": array("d", [2.5, 4.0, 1.0]),
+        "c": ["x", "NULL", "y"],
+        "d": [2, 2.0, "z"],
+    }
+    assert type(columns["d"][0]) is int
+    assert p.values_columnar is columns
+    assert p.values_dict["a"] == list(columns["a"])
+
+    p = Parser("INSERT INTO t VALUES (9223372036854775808, 2)")
+    assert p.values == [9223372036854775808, 2]
+    assert p.values_columnar == {
+        "column_1": [9223372036854775808],
+        "column_2": array("q", [2]),
+    }
+    assert Parser("SELECT a FROM t").values_columnar is None
+
+
+def test_column_buffer_widening():
+    buffer = ColumnBuffer()
+    for value in [1.5, 2, 2**60]:
+        buffer.append(value)
+    assert buffer.data == [1.5, 2, 2**60]
+    assert transpose([]) == []
+    assert transpose([[1, "a", 3], [2], [3, "b"]]) == [
+        array("q", [1, 2, 3]),
+        ["a", "b"],
+        array("q", [3]),
+    ]
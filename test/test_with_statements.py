@@ -772,3 +772,25 @@ def test_chained_cte_cross_reference():
     """)
     assert p.tables == ["t1"]
     assert p.columns == ["a", "b"]
+
+
+def test_nested_parsers_reuse_ast_subtrees():
+    """Sub-parsers wrap the parsed CTE/subquery subtrees instead of re-parsing."""
+    p = Parser("""
+    WITH "c1" AS (SELECT a AS x FROM t1)
+    SELECT c1.x, s.b FROM c1 JOIN (SELECT b FROM t2) AS s ON c1.x = s.b
+    """)
+    assert p.columns == ["a", "b"]
+    # resolving columns does not render any nested body back to SQL
+    assert p._with_queries is None
+    assert p._subqueries is None
+
+    cte_parser = p._get_resolver()._with_parsers["c1"]
+    assert cte_parser._sql is None
+    assert cte_parser._ast_parser.dialect == p._ast_parser.dialect
+    assert cte_parser.columns_aliases == {"x": "a"}
+    # the body SQL is rendered lazily, only when it is asked for
+    assert cte_parser._raw_query == "SELECT a AS x FROM t1"
+    assert p.with_queries == {"c1": "SELECT a AS x FROM t1"}
+    assert p.with_queries is p.with_queries
+    assert p.subqueries == {"s": "SELECT b FROM t2"}